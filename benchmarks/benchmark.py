@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+gitdeep のベンチマークを実行します。
+    リポジトリを含むディレクトリツリーを生成し、探索、バイト数の取得、コマンドの実行の時間を計測します。
+    git の代わりに、指定した時間だけ待つスクリプトを使用します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+# Local module
+PATH_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PATH_ROOT)
+from gitdeep import gitdeep
+from gitdeep import discovery
+from gitdeep import dusize
+from gitdeep import repoindex
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 結果を保存するディレクトリ
+PATH_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 既定のリポジトリ数
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+# git の代わりに使用するスクリプト (FAKEGIT_LATENCY 秒待ってから、引数を表示する)
+FAKE_GIT = """#!/bin/sh
+# gitdeep のベンチマーク用の git
+case "${FAKEGIT_LATENCY:-0}" in
+    0|0.0) ;;
+    *) sleep "$FAKEGIT_LATENCY" ;;
+esac
+echo "fake-git $*"
+"""
+
+def make_forest(path_root, count, max_depth=4, decoys=True):
+    """
+    リポジトリを含むディレクトリツリーを生成する。
+        リポジトリは100個毎のグループに分けて、1からmax_depthまでの深さに配置する。
+        decoys の場合は、探索を遅くするディレクトリを加える。
+            * グループ毎の node_modules (探索しないディレクトリ)
+            * グループ毎の、リポジトリを含まない大きなディレクトリ
+            * リポジトリ毎の node_modules (バイト数に含まれる)
+    :param str path_root:   生成するパス
+    :param int count:       リポジトリ数
+    :param int max_depth:   リポジトリを配置する深さ
+    :param bool decoys:     探索を遅くするディレクトリを加える。
+    :rtype:                 list
+    :return:                リポジトリのパスのリスト
+    """
+
+    # 変数を初期化します。
+    results = []
+
+    for i in range(count):
+        group = os.path.join(path_root, "group%03d" % (i // 100))
+        depth = 1 + i % max_depth
+        parts = ["level%d" % level for level in range(1, depth)]
+        path_base = os.path.join(group, *(parts + ["repo%05d" % i]))
+        make_repo(path_base, decoys)
+        results.append(path_base)
+
+        if decoys and i % 100 == 0:
+            make_tree(os.path.join(group, "node_modules"), 3, 4, 2)
+            make_tree(os.path.join(group, "assets"), 3, 4, 2)
+
+    results.sort()
+
+    return results
+
+def make_repo(path_base, decoys=True):
+    """
+    リポジトリの形をしたディレクトリを生成する。
+        探索とバイト数の取得に必要な .git の構成だけを作成する。
+    :param str path_base:   リポジトリのパス
+    :param bool decoys:     リポジトリに node_modules を加える。
+    :rtype:                 None
+    """
+
+    path_git = os.path.join(path_base, ".git")
+    for name in ["objects/pack", "refs/heads", "refs/tags"]:
+        os.makedirs(os.path.join(path_git, name))
+
+    write_file(os.path.join(path_git, "HEAD"), b"ref: refs/heads/master\n")
+    write_file(os.path.join(path_git, "config"),
+               b"[core]\n\trepositoryformatversion = 0\n\tbare = false\n")
+    write_file(os.path.join(path_git, "objects/pack/pack-0.pack"), b"\0" * 4096)
+    write_file(os.path.join(path_base, "README"), b"x" * 1024)
+    write_file(os.path.join(path_base, "src/main.py"), b"print(1)\n" * 64)
+
+    if decoys:
+        make_tree(os.path.join(path_base, "node_modules"), 2, 3, 2)
+
+    return
+
+def make_tree(path, depth, width, files):
+    """
+    ディレクトリツリーを生成する。
+    :param str path:        パス
+    :param int depth:       深さ
+    :param int width:       ディレクトリ毎のサブディレクトリ数
+    :param int files:       ディレクトリ毎のファイル数
+    :rtype:                 None
+    """
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    for i in range(files):
+        write_file(os.path.join(path, "file%d.js" % i), b"y" * 512)
+
+    if depth > 1:
+        for i in range(width):
+            make_tree(os.path.join(path, "dir%d" % i), depth - 1, width, files)
+
+    return
+
+def write_file(path, data):
+    """
+    ファイルを作成する。
+    :param str path:        パス
+    :param bytes data:      内容
+    :rtype:                 None
+    """
+
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(data)
+
+    return
+
+def make_fake_git(path_bin):
+    """
+    git の代わりに使用するスクリプトを作成する。
+    :param str path_bin:    スクリプトを置くディレクトリ
+    :rtype:                 str
+    :return:                スクリプトのパス
+    """
+
+    path = os.path.join(path_bin, "git")
+    write_file(path, FAKE_GIT.encode("utf-8"))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    return path
+
+def measure(func, repeat=3):
+    """
+    関数の実行時間を計測する。
+    :param function func:   関数
+    :param int repeat:      繰り返す回数
+    :rtype:                 float
+    :return:                最も短い実行時間 (秒)
+    """
+
+    results = []
+    for _i in range(repeat):
+        time_start = time.perf_counter()
+        func()
+        results.append(time.perf_counter() - time_start)
+
+    return min(results)
+
+def run_cli(path_root, path_bin, path_cache, args, latency=0.0):
+    """
+    gitdeep をコマンドとして実行する。
+    :param str path_root:   実行するディレクトリ
+    :param str path_bin:    git の代わりのスクリプトを置いたディレクトリ
+    :param str path_cache:  キャッシュディレクトリ
+    :param list args:       引数
+    :param float latency:   git の代わりのスクリプトが待つ時間 (秒)
+    :rtype:                 None
+    """
+
+    env = dict(os.environ)
+    env["PATH"] = path_bin + os.pathsep + env.get("PATH", "")
+    env["PYTHONPATH"] = PATH_ROOT
+    env["GITDEEP_CACHE_DIR"] = path_cache
+    env["FAKEGIT_LATENCY"] = str(latency)
+
+    subprocess.check_call([sys.executable, "-m", "gitdeep"] + list(args), cwd=path_root,
+                          env=env, stdout=subprocess.DEVNULL)
+
+    return
+
+def run_benchmark(count, repeat=3, jobs=8, latency=0.0, decoys=True):
+    """
+    リポジトリ数を指定して、ベンチマークを実行する。
+    :param int count:       リポジトリ数
+    :param int repeat:      繰り返す回数
+    :param int jobs:        並列に実行するジョブ数
+    :param float latency:   git の代わりのスクリプトが待つ時間 (秒)
+    :param bool decoys:     探索を遅くするディレクトリを加える。
+    :rtype:                 dict
+    :return:                計測項目毎の実行時間 (秒)
+    """
+
+    # 変数を初期化します。
+    results = {}
+    path_tmp = tempfile.mkdtemp(prefix="gitdeep-bench-")
+    path_root = os.path.join(path_tmp, "forest")
+    path_bin = os.path.join(path_tmp, "bin")
+    path_cache = os.path.join(path_tmp, "cache")
+    env_cache = os.environ.get("GITDEEP_CACHE_DIR")
+
+    try:
+        os.makedirs(path_bin)
+        make_fake_git(path_bin)
+        time_start = time.perf_counter()
+        paths = make_forest(path_root, count, decoys=decoys)
+        results["generate"] = time.perf_counter() - time_start
+        os.environ["GITDEEP_CACHE_DIR"] = path_cache
+
+        # 探索
+        results["discovery.get_dirs"] = measure(
+            lambda: gitdeep.get_dirs(path_root, r"^\.git$", prune=True), repeat)
+        results["discovery.find_repos"] = measure(
+            lambda: discovery.find_repos(path_root), repeat)
+        repoindex.find_repos(path_root)
+        results["discovery.index"] = measure(
+            lambda: repoindex.find_repos(path_root), repeat)
+
+        # バイト数
+        results["du.cold"] = measure(
+            lambda: [dusize.du(path, cache=False) for path in paths], repeat)
+        for path in paths:
+            dusize.du(path)
+        results["du.cached"] = measure(
+            lambda: [dusize.du(path) for path in paths], repeat)
+
+        # コマンドの実行 (起動を含む)
+        run_cli(path_root, path_bin, path_cache, ["--no-size", "status"], latency)
+        results["call.serial"] = measure(
+            lambda: run_cli(path_root, path_bin, path_cache,
+                            ["-j", "1", "--no-size", "status"], latency), repeat)
+        results["call.parallel"] = measure(
+            lambda: run_cli(path_root, path_bin, path_cache,
+                            ["-j", str(jobs), "--no-size", "status"], latency), repeat)
+
+    finally:
+        if env_cache is None:
+            os.environ.pop("GITDEEP_CACHE_DIR", None)
+        else:
+            os.environ["GITDEEP_CACHE_DIR"] = env_cache
+        shutil.rmtree(path_tmp)
+
+    return results
+
+def get_revision():
+    """
+    作業ツリーのリビジョンを取得する。
+    :rtype:                 str
+    :return:                リビジョン (取得できない場合は、None)
+    """
+
+    try:
+        output = subprocess.check_output(
+            ["git", "-C", PATH_ROOT, "describe", "--always", "--dirty"],
+            stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode("utf-8", "replace").strip()
+
+def load_previous(path_exclude):
+    """
+    前回保存した結果を読み込む。
+    :param str path_exclude: 除外するパス (今回保存するパス)
+    :rtype:                 dict
+    :return:                結果 (無い場合は、None)
+    """
+
+    paths = [path for path in glob.glob(os.path.join(PATH_RESULTS, "*.json"))
+             if os.path.abspath(path) != os.path.abspath(path_exclude)]
+    if not paths:
+        return None
+
+    with open(max(paths, key=os.path.getmtime), "r") as f:
+        return json.load(f)
+
+def format_results(data, previous=None):
+    """
+    結果を表にする。
+    :param dict data:       結果
+    :param dict previous:   比較する結果
+    :rtype:                 str
+    :return:                表
+    """
+
+    lines = []
+    for count, results in sorted(data["results"].items(), key=lambda item: int(item[0])):
+        lines.append("repos: %s" % count)
+        results_old = (previous or {}).get("results", {}).get(count, {})
+        for name in sorted(results):
+            line = "  %-24s %10.4f s" % (name, results[name])
+            if results_old.get(name):
+                line += "  (%s: %.2fx)" % (previous.get("label"), results[name] / results_old[name])
+            lines.append(line)
+
+    return os.linesep.join(lines)
+
+def main():
+    """
+    console_scripts entry point
+    """
+
+    # 引数の処理を行います。
+    parser = argparse.ArgumentParser(description=__doc__.strip(os.linesep))
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="リポジトリ数 (カンマ区切り)")
+    parser.add_argument("--repeat", type=int, default=3, help="繰り返す回数")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="並列に実行するジョブ数")
+    parser.add_argument("--latency", type=float, default=0.0, help="git の代わりのスクリプトが待つ時間 (秒)")
+    parser.add_argument("--no-decoys", action="store_true", default=False,
+                        help="探索を遅くするディレクトリを加えない。")
+    parser.add_argument("--label", default=None, help="結果の名前 (省略時は gitdeep のバージョン)")
+    parser.add_argument("--compare", default=None, help="比較する結果のパス (省略時は前回の結果)")
+    parser.add_argument("--no-save", action="store_true", default=False, help="結果を保存しない。")
+    args = parser.parse_args()
+
+    # 変数を初期化します。
+    label = args.label or gitdeep.__version__
+    path_result = os.path.join(PATH_RESULTS, label + ".json")
+    data = {
+        "label": label,
+        "version": gitdeep.__version__,
+        "revision": get_revision(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": {"repeat": args.repeat, "jobs": args.jobs, "latency": args.latency,
+                    "decoys": not args.no_decoys},
+        "results": {},
+    }
+
+    for size in args.sizes.split(","):
+        count = int(size)
+        sys.stderr.write("repos: %d%s" % (count, os.linesep))
+        data["results"][str(count)] = run_benchmark(
+            count, args.repeat, args.jobs, args.latency, not args.no_decoys)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+    else:
+        previous = load_previous(path_result)
+
+    print(format_results(data, previous))
+
+    if not args.no_save:
+        if not os.path.isdir(PATH_RESULTS):
+            os.makedirs(PATH_RESULTS)
+        with open(path_result, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        sys.stderr.write("保存しました。\t%s%s" % (path_result, os.linesep))
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(main())
@@ -11,6 +11,7 @@ from __future__ import unicode_literals
 
 # Local module
 from gitdeep.gitdeep import *
+from gitdeep.fleet import Fleet, RepoResult
 
 # Global variable
 __author__ = "Kazuyuki OHMI"
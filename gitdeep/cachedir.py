@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ユーザーのキャッシュディレクトリにデータを保存します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import json
+import os
+import sys
+import threading
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キャッシュディレクトリを指定する環境変数
+ENV_CACHE_DIR = "GITDEEP_CACHE_DIR"
+
+def get_cache_dir(*names, **kwargs):
+    """
+    キャッシュディレクトリを取得する。
+        環境変数 GITDEEP_CACHE_DIR、XDG_CACHE_HOME の順に参照する。
+    :param list names:  サブディレクトリ名
+    :param bool create: 無い場合は作成する (既定は True)。
+    :rtype:             str
+    :return:            ディレクトリのパス
+    """
+
+    path = os.environ.get(ENV_CACHE_DIR)
+    if not path:
+        if sys.platform.startswith("win"):
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        elif sys.platform == "darwin":
+            base = os.path.expanduser("~/Library/Caches")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        path = os.path.join(base, "gitdeep")
+
+    path = os.path.join(path, *names)
+    if kwargs.get("create", True) and not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+
+    return path
+
+def get_key(*values):
+    """
+    値からキャッシュのファイル名に使うキーを取得する。
+    :param list values: 値
+    :rtype:             str
+    :return:            キー
+    """
+
+    # hashlib は OpenSSL を読み込むため、起動時間の短い組み込みの _sha1 を優先する。
+    try:
+        from _sha1 import sha1
+    except ImportError:
+        from hashlib import sha1
+
+    text = "\0".join(str(value) for value in values)
+
+    return sha1(text.encode("utf-8", "surrogateescape")).hexdigest()
+
+def load_json(path, default=None):
+    """
+    JSONファイルを読み込む。
+        読み込めない場合は、defaultを返す。
+    :param str path:        ファイルのパス
+    :param object default:  読み込めない場合の値
+    :rtype:                 object
+    :return:                読み込んだ値
+    """
+
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read().decode("utf-8", "surrogateescape"))
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    """
+    JSONファイルに保存する。
+        同時に実行された場合でも壊れないように、一時ファイルから置き換える。
+        (一時ファイル名は、プロセスとスレッド毎に分ける。tempfile は読み込みが遅いため使用しない。)
+    :param str path:        ファイルのパス
+    :param object data:     保存する値
+    :rtype:                 None
+    """
+
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    path_tmp = os.path.join(os.path.dirname(path), ".tmp%d.%d.%s" % (
+        os.getpid(), threading.get_ident(), os.path.basename(path)))
+    fd = os.open(path_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(text.encode("utf-8", "surrogateescape"))
+        os.replace(path_tmp, path)
+    except BaseException:
+        try:
+            os.unlink(path_tmp)
+        except OSError:
+            pass
+        raise
+
+    return
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+git cat-file --batch のプロセスを使い回して、オブジェクトを読み込みます。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import subprocess
+import threading
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# gitdeep のコマンド
+COMMANDS = ("cat", "show-file")
+
+# 同時に起動しておくプロセス数
+MAX_PROCS = 64
+
+# 応答を読まずに送る要求のバイト数 (パイプのバッファより小さくして、書き込みで止まらないようにする)
+PIPELINE_BYTES = 32 * 1024
+
+# 見つからない場合などの応答
+MISSING = ("missing", "ambiguous", "dangling", "loop", "notdir")
+
+Object = collections.namedtuple("Object", "rev oid type size data")
+
+class CatFile(object):
+    """
+    1つのリポジトリの git cat-file --batch (--batch-check) のプロセス
+        * 要求はまとめて送り、応答を順に読みます (パイプライン)。
+        * 複数のスレッドから使用できます (要求毎に排他します)。
+    """
+
+    def __init__(self, path_base, check=False):
+        """
+        初期処理を行い、プロセスを起動します。
+
+        :param str path_base:   リポジトリのパス
+        :param bool check:      種類とバイト数だけを取得する (--batch-check)。
+        """
+
+        self.path_base = path_base
+        self.check = check
+        self.argv = self.get_argv(path_base, check)
+        self._lock = threading.Lock()
+        self._ps = subprocess.Popen(self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def get_argv(path_base, check=False):
+        """
+        起動するプロセスの引数リストを取得する。
+        :param str path_base:   リポジトリのパス
+        :param bool check:      --batch-check を使用する。
+        :rtype:                 list
+        :return:                引数リスト
+        """
+
+        return ["git", "-C", path_base, "cat-file", "--batch-check" if check else "--batch"]
+
+    def query(self, revs):
+        """
+        オブジェクトを取得する。
+        :param list revs:       オブジェクト名 (HEAD:README.md など)
+        :rtype:                 list
+        :return:                revsの順の Object (見つからない場合は、type が missing などで data が None)
+        """
+
+        results = []
+        with self._lock:
+            if self._ps is None:
+                raise OSError("cat-file は終了しています。\t%s" % self.path_base)
+
+            pending = []
+            size = 0
+            for rev in revs:
+                if "\n" in rev:
+                    raise ValueError("オブジェクト名に改行は使用できません。\t%r" % rev)
+                line = rev.encode("utf-8", "surrogateescape") + b"\n"
+                if pending and size + len(line) > PIPELINE_BYTES:
+                    results.extend(self._communicate(pending))
+                    pending = []
+                    size = 0
+                pending.append((rev, line))
+                size += len(line)
+
+            if pending:
+                results.extend(self._communicate(pending))
+
+        return results
+
+    def get(self, rev):
+        """
+        オブジェクトを1つ取得する。
+        :param str rev:         オブジェクト名
+        :rtype:                 Object
+        :return:                オブジェクト
+        """
+
+        return self.query([rev])[0]
+
+    def _communicate(self, pending):
+        """
+        要求をまとめて送り、応答を読む。
+        :param list pending:    (オブジェクト名, 要求の行) のリスト
+        :rtype:                 list
+        :return:                Object のリスト
+        """
+
+        stdin = self._ps.stdin
+        stdout = self._ps.stdout
+        try:
+            stdin.write(b"".join(line for _rev, line in pending))
+            stdin.flush()
+        except (BrokenPipeError, ValueError):
+            self.close()
+            raise OSError("cat-file が終了しました。\t%s" % self.path_base)
+
+        results = []
+        for rev, _line in pending:
+            header = stdout.readline()
+            if not header.endswith(b"\n"):
+                self.close()
+                raise OSError("cat-file が終了しました。\t%s" % self.path_base)
+
+            fields = header[:-1].decode("utf-8", "surrogateescape").rsplit(" ", 2)
+            if len(fields) != 3 or fields[-1] in MISSING:
+                results.append(Object(rev, None, fields[-1], None, None))
+                continue
+
+            oid, kind, size = fields[0], fields[1], int(fields[2])
+            data = None
+            if not self.check:
+                data = stdout.read(size)
+                stdout.read(1)
+            results.append(Object(rev, oid, kind, size, data))
+
+        return results
+
+    def close(self):
+        """
+        プロセスを終了する。
+        :rtype:                 int
+        :return:                戻り値
+        """
+
+        ps, self._ps = self._ps, None
+        if ps is None:
+            return 0
+
+        try:
+            ps.stdin.close()
+        except OSError:
+            pass
+        ps.stdout.close()
+
+        return ps.wait()
+
+class CatFilePool(object):
+    """
+    リポジトリ毎の CatFile を使い回します。
+        * 最後に使用した順に MAX_PROCS 個まで起動しておき、超えた場合は古いものから終了します。
+        * プロセスが終了していた場合は、起動し直して1回だけ再試行します。
+    """
+
+    def __init__(self, max_procs=MAX_PROCS):
+        """
+        初期処理を行います。
+
+        :param int max_procs:   同時に起動しておくプロセス数
+        """
+
+        self.max_procs = max_procs
+        self._procs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, path_base, check=False):
+        """
+        リポジトリの CatFile を取得する。
+        :param str path_base:   リポジトリのパス
+        :param bool check:      --batch-check を使用する。
+        :rtype:                 CatFile
+        :return:                CatFile
+        """
+
+        key = (path_base, bool(check))
+        evicted = []
+        with self._lock:
+            catfile = self._procs.pop(key, None)
+            if catfile is None:
+                catfile = CatFile(path_base, check)
+            self._procs[key] = catfile
+            while len(self._procs) > self.max_procs:
+                evicted.append(self._procs.popitem(last=False)[1])
+
+        # 使用中のプロセスは、要求が終わるのを待ってから終了する。
+        for item in evicted:
+            with item._lock:
+                item.close()
+
+        return catfile
+
+    def query(self, path_base, revs, check=False):
+        """
+        リポジトリのオブジェクトを取得する。
+        :param str path_base:   リポジトリのパス
+        :param list revs:       オブジェクト名
+        :param bool check:      種類とバイト数だけを取得する。
+        :rtype:                 list
+        :return:                revsの順の Object
+        """
+
+        try:
+            return self.get(path_base, check).query(revs)
+        except OSError:
+            self.discard(path_base, check)
+
+        return self.get(path_base, check).query(revs)
+
+    def discard(self, path_base, check=False):
+        """
+        リポジトリの CatFile を終了する。
+        :param str path_base:   リポジトリのパス
+        :param bool check:      --batch-check を使用する。
+        :rtype:                 None
+        """
+
+        with self._lock:
+            catfile = self._procs.pop((path_base, bool(check)), None)
+        if catfile is not None:
+            catfile.close()
+
+        return
+
+    def close(self):
+        """
+        全てのプロセスを終了する。
+        :rtype:                 None
+        """
+
+        with self._lock:
+            procs = list(self._procs.values())
+            self._procs.clear()
+        for catfile in procs:
+            catfile.close()
+
+        return
+
+def format_object(obj):
+    """
+    オブジェクトを表示用のテキストにする。
+        ツリーは git ls-tree と同じ形式にする。
+    :param Object obj:      オブジェクト
+    :rtype:                 str
+    :return:                テキスト
+    """
+
+    if obj.oid is None:
+        return "%s %s\n" % (obj.rev, obj.type)
+    if obj.data is None:
+        return "%s %s %d\n" % (obj.oid, obj.type, obj.size)
+    if obj.type != "tree":
+        return obj.data.decode("utf-8", "replace")
+
+    # ツリーのオブジェクトIDは、16進数の半分のバイト数で格納されている。
+    hash_size = len(obj.oid) // 2
+    lines = []
+    data = obj.data
+    pos = 0
+    while pos < len(data):
+        end = data.index(b"\0", pos)
+        mode, name = data[pos:end].split(b" ", 1)
+        oid = data[end + 1:end + 1 + hash_size].hex()
+        pos = end + 1 + hash_size
+        mode = mode.decode("ascii").zfill(6)
+        kind = "tree" if mode == "040000" else "commit" if mode == "160000" else "blob"
+        lines.append("%s %s %s\t%s\n" % (mode, kind, oid, name.decode("utf-8", "surrogateescape")))
+
+    return "".join(lines)
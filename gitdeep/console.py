@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+コンソールへの出力をまとめて書き込みます。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import os
+import sys
+import threading
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 書き込む間隔 (秒)
+FLUSH_INTERVAL = 0.2
+
+# この文字数を超えたら、間隔によらずに書き込む
+BUFFER_SIZE = 256 * 1024
+
+class ConsoleWriter(object):
+    """
+    出力をバッファに貯めて、まとめて書き込みます。
+        * バッファが BUFFER_SIZE を超えた時と、FLUSH_INTERVAL 毎に書き込みます。
+        * 書き込みが途絶えても、バックグラウンドのスレッドが間隔毎に書き込みます。
+        * 子プロセスが同じ端末に出力する前や、標準エラー出力に書き込む前には flush() を呼び出します。
+    """
+
+    def __init__(self, stream=None, interval=FLUSH_INTERVAL, buffer_size=BUFFER_SIZE):
+        """
+        初期処理を行います。
+
+        :param file stream:     出力先 (None の場合は、sys.stdout)
+        :param float interval:  書き込む間隔 (秒)
+        :param int buffer_size: バッファの文字数
+        """
+
+        self.stream = sys.stdout if stream is None else stream
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, text):
+        """
+        テキストをバッファに追加する。
+        :param str text:        テキスト
+        :rtype:                 None
+        """
+
+        with self._lock:
+            self._buffer.append(text)
+            self._size += len(text)
+            full = self._size >= self.buffer_size
+
+        if full:
+            self.flush()
+        elif self._thread is None and self.interval:
+            self._thread = threading.Thread(target=self._run, name="console", daemon=True)
+            self._thread.start()
+
+        return
+
+    def writeline(self, text=""):
+        """
+        テキストと改行をバッファに追加する。
+        :param str text:        テキスト
+        :rtype:                 None
+        """
+
+        return self.write(text + os.linesep)
+
+    def flush(self):
+        """
+        バッファを書き込む。
+        :rtype:                 None
+        """
+
+        with self._lock:
+            if self._buffer:
+                self.stream.write("".join(self._buffer))
+                self._buffer = []
+                self._size = 0
+            self.stream.flush()
+
+        return
+
+    def close(self):
+        """
+        バッファを書き込み、バックグラウンドのスレッドを終了する。
+        :rtype:                 None
+        """
+
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+        return
+
+    def _run(self):
+        """
+        間隔毎にバッファを書き込む。
+        """
+
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+        return
+
+class Summary(object):
+    """
+    出力が同じリポジトリをまとめます。
+        出力は、前後の空白を除いて比較します。
+    """
+
+    def __init__(self):
+        """
+        初期処理を行います。
+        """
+
+        self.groups = collections.OrderedDict()
+
+    def add(self, path_base, txt, item=None):
+        """
+        リポジトリの出力を追加する。
+        :param str path_base:   リポジトリのパス
+        :param str txt:         出力
+        :param object item:     出力を表示する時に使用する値
+        :rtype:                 None
+        """
+
+        self.groups.setdefault((txt or "").strip(), []).append((path_base, item))
+
+        return
+
+    def get_unique(self):
+        """
+        出力が他と異なるリポジトリを取得する。
+        :rtype:                 list
+        :return:                追加した順の (パス, 値) のリスト
+        """
+
+        return [items[0] for items in self.groups.values() if len(items) == 1]
+
+    def get_groups(self):
+        """
+        出力が同じリポジトリのグループを取得する。
+        :rtype:                 list
+        :return:                リポジトリ数の多い順の (出力, [(パス, 値), ...]) のリスト
+        """
+
+        groups = [(txt, items) for txt, items in self.groups.items() if len(items) > 1]
+        groups.sort(key=lambda group: -len(group[1]))
+
+        return groups
+
+def format_group(txt, count):
+    """
+    出力が同じリポジトリのグループを表示用のテキストにする。
+        1行の出力は、リポジトリ数と同じ行に表示する。
+    :param str txt:         出力 (前後の空白を除いたもの)
+    :param int count:       リポジトリ数
+    :rtype:                 str
+    :return:                テキスト
+    """
+
+    label = "[%d リポジトリ]" % count
+    if not txt:
+        return "%s (出力なし)" % label
+    if "\n" not in txt:
+        return "%s %s" % (label, txt)
+
+    return "%s%s%s" % (label, os.linesep, txt)
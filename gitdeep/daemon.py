@@ -0,0 +1,625 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+リポジトリの一覧をメモリに保持して、ローカルのソケットでコマンドを受け付けます。
+    * gitdeep daemon で起動し、gitdeep daemon stop で終了します。
+    * ディレクトリの追加や削除は inotify で受け取り、変更のあった時だけ探索し直します。
+      (inotify を使用できない場合は、要求毎にインデックスを更新します。)
+    * ソケットはキャッシュディレクトリに作成し、起動したユーザーだけが接続できます。
+    * 通信は1行毎のJSONで、要求を1つ送ると、結果をリポジトリ毎に返します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import errno
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import discovery
+    from . import executor
+    from . import fetchsched
+    from . import repoindex
+else:
+    import cachedir
+    import discovery
+    import executor
+    import fetchsched
+    import repoindex
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# デーモンを使用しない場合に指定する環境変数
+ENV_NO_DAEMON = "GITDEEP_NO_DAEMON"
+
+# イベントを受け取ってから、探索し直すまでの時間 (秒)
+REFRESH_DELAY = 0.1
+
+# inotify の定数 (linux/inotify.h)
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+# 監視するイベント (ファイルの内容の変更は監視しない)
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+# 探索し直すイベント (ディレクトリ以外は .git だけ)
+REFRESH_MASK = IN_ISDIR | IN_DELETE_SELF | IN_MOVE_SELF | IN_Q_OVERFLOW | IN_IGNORED
+
+# inotify_event の固定長部分 (wd, mask, cookie, len)
+EVENT_HEADER = struct.Struct("iIII")
+
+class Inotify(object):
+    """
+    inotify でディレクトリを監視します。
+        ctypes で libc の関数を呼び出します (Linux 以外では、OSError になります)。
+    """
+
+    def __init__(self):
+        """
+        初期処理を行います。
+        """
+
+        import ctypes
+
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._get_errno = ctypes.get_errno
+        try:
+            init = self._libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "inotify はサポートされていません。")
+
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise()
+        self.watches = {}
+        self.paths = {}
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        """
+        ディレクトリの監視を追加する。
+        :param str path:        ディレクトリのパス
+        :param int mask:        監視するイベント
+        :rtype:                 None
+        """
+
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            self._raise(path)
+        self.watches[wd] = path
+        self.paths[path] = wd
+
+        return
+
+    def remove_watch(self, path):
+        """
+        ディレクトリの監視を取り除く。
+        :param str path:        ディレクトリのパス
+        :rtype:                 None
+        """
+
+        wd = self.paths.pop(path, None)
+        if wd is not None:
+            self.watches.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+        return
+
+    def read(self):
+        """
+        受け取ったイベントを取得する。
+        :rtype:                 list
+        :return:                (ディレクトリのパス, マスク, 名前) のリスト
+        """
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        results = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, size = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + size].rstrip(b"\0"))
+            pos += size
+            results.append((self.watches.get(wd), mask, name))
+            if mask & IN_IGNORED:
+                self.paths.pop(self.watches.pop(wd, None), None)
+
+        return results
+
+    def close(self):
+        """
+        監視を終了する。
+        :rtype:                 None
+        """
+
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.watches.clear()
+        self.paths.clear()
+
+        return
+
+    def _raise(self, path=None):
+        code = self._get_errno()
+        raise OSError(code, os.strerror(code), path)
+
+class Daemon(object):
+    """
+    リポジトリの一覧を保持するデーモン
+        * 探索したディレクトリを全て監視し、ディレクトリや .git の追加、削除、移動で探索し直します。
+        * 探索し直す時は、インデックスで更新日時の変わったディレクトリだけを読みます。
+    """
+
+    def __init__(self, root=".", max_depth=None, all_dirs=False):
+        """
+        初期処理を行います。
+
+        :param str root:        探索するパス
+        :param int max_depth:   探索する深さ (None の場合は、制限なし)
+        :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+        """
+
+        self.root = os.path.realpath(root)
+        self.options = {"max_depth": max_depth, "all_dirs": bool(all_dirs)}
+        self.path_socket = get_socket_path(self.root, create=True)
+        self.index = repoindex.RepoIndex(self.root, max_depth,
+                                         () if all_dirs else discovery.SKIP_DIRS)
+        self.index.load()
+        self.paths = []
+        self.stale = True
+        self.closed = threading.Event()
+        self._lock = threading.Lock()
+
+        try:
+            self.inotify = Inotify()
+        except OSError:
+            self.inotify = None
+
+    def refresh(self):
+        """
+        変更があれば探索し直し、リポジトリの一覧を取得する。
+        :rtype:                 list
+        :return:                リポジトリのパス
+        """
+
+        with self._lock:
+            if self.stale or self.inotify is None:
+                # 探索中のイベントで、次回も探索し直すように先に戻す。
+                self.stale = False
+                # CLI と同じく、探索した順にする。
+                dnames = list(self.index.iter_update())
+                self.paths = [os.path.realpath(os.path.join(os.path.realpath(dname), ".."))
+                              for dname in dnames]
+                if self.index.changed:
+                    try:
+                        self.index.save()
+                    except OSError:
+                        pass
+                self.sync_watches()
+
+                # 探索中に更新された可能性のあるディレクトリは、次回も探索し直す。
+                if any(entry[0] == -1 for entry in self.index.dirs.values()):
+                    self.stale = True
+
+            return self.paths
+
+    def sync_watches(self):
+        """
+        探索したディレクトリと、監視するディレクトリを揃える。
+            監視の上限 (fs.inotify.max_user_watches) に達した場合は、監視をやめる。
+        :rtype:                 None
+        """
+
+        if self.inotify is None:
+            return
+
+        dirs = set(self.root if rel == os.curdir else os.path.join(self.root, rel)
+                   for rel in self.index.dirs)
+        for path in set(self.inotify.paths) - dirs:
+            self.inotify.remove_watch(path)
+
+        for path in dirs - set(self.inotify.paths):
+            try:
+                self.inotify.add_watch(path)
+            except OSError as ex:
+                if ex.errno == errno.ENOSPC:
+                    sys.stderr.write("inotify の上限に達したため、要求毎に探索します。%s" % os.linesep)
+                    self.inotify.close()
+                    self.inotify = None
+                    return
+                # 探索後に削除されたディレクトリは、次回に取り除く。
+                self.stale = True
+
+        return
+
+    def watch(self):
+        """
+        イベントを受け取り、変更があれば探索し直す。
+            終了するまで戻らない。
+        :rtype:                 None
+        """
+
+        import selectors
+
+        if self.inotify is None:
+            return
+
+        selector = selectors.DefaultSelector()
+        selector.register(self.inotify.fd, selectors.EVENT_READ)
+        try:
+            while not self.closed.is_set():
+                if not selector.select(timeout=1.0):
+                    if self.stale:
+                        self.refresh()
+                    continue
+
+                for _path, mask, name in self.inotify.read():
+                    if mask & REFRESH_MASK or name == discovery.GIT_DIR:
+                        self.stale = True
+
+                # 続けて届くイベントをまとめてから、探索し直す。
+                if self.stale and not self.closed.wait(REFRESH_DELAY):
+                    self.refresh()
+        finally:
+            selector.close()
+
+        return
+
+    def run(self, request, send):
+        """
+        要求されたコマンドを実行し、結果をリポジトリ毎に送る。
+        :param dict request:    要求
+        :param function send:   メッセージを送る関数
+        :rtype:                 None
+        """
+
+        cwd = request.get("cwd") or self.root
+        options = {"max_depth": request.get("max_depth"), "all_dirs": bool(request.get("all_dirs"))}
+        if options != self.options or (options["max_depth"] is not None and cwd != self.root):
+            send({"error": "探索の条件が異なります。"})
+            return
+
+        if cwd != self.root and not cwd.startswith(self.root + os.sep):
+            send({"error": "探索したパスの外です。"})
+            return
+
+        paths = self.refresh()
+        if cwd != self.root:
+            # 除外ディレクトリの中など、探索していないパスはクライアントで探索する。
+            if os.path.relpath(cwd, self.root) not in self.index.dirs:
+                send({"error": "探索していないパスです。"})
+                return
+            paths = [path for path in paths if path == cwd or path.startswith(cwd + os.sep)]
+
+        cmd = request["cmd"]
+        args = list(request.get("args") or ())
+        jobs = request.get("jobs")
+        per_remote = request.get("per_remote")
+        timeout = request.get("timeout")
+        # コマンドは、クライアントの環境変数とカレントディレクトリで実行する。
+        env = request.get("env")
+
+        if per_remote:
+            pool = fetchsched.FetchScheduler(jobs, per_remote, timeout=timeout, env=env, cwd=cwd)
+            kwargs = {"keys": lambda path_base: fetchsched.get_remote_keys(path_base, cmd, args)}
+        else:
+            pool = executor.Executor(jobs, timeout=timeout, env=env, cwd=cwd)
+            kwargs = {}
+
+        # dusize は concurrent.futures を読み込むため、クライアントでは読み込まない。
+        if "." in __name__:
+            from . import dusize
+        else:
+            import dusize
+
+        sizes = None
+        if request.get("size"):
+            sizes = dusize.SizePrefetcher(pool.jobs, count_objects=request.get("count_objects"))
+            for path_base in paths:
+                sizes.submit(path_base)
+
+        def run(path_base):
+            argv = executor.get_argv(path_base, cmd, args)
+            time_start = time.monotonic()
+            ret, txt, timed_out = pool.popen(argv)
+
+            return (path_base, argv, ret, txt, time.monotonic() - time_start, timed_out)
+
+        send({"repos": len(paths)})
+        try:
+            for path_base, argv, ret, txt, duration, timed_out in pool.map(run, paths, **kwargs):
+                send({
+                    "path": path_base,
+                    "argv": argv,
+                    "returncode": ret,
+                    "output": txt,
+                    "duration": duration,
+                    "timed_out": timed_out,
+                    "size": sizes.get(path_base) if sizes is not None else None,
+                })
+            send({"done": True})
+        finally:
+            if sizes is not None:
+                sizes.close()
+
+        return
+
+    def get_status(self):
+        """
+        デーモンの状態を取得する。
+        :rtype:                 dict
+        :return:                状態
+        """
+
+        return {
+            "pid": os.getpid(),
+            "root": self.root,
+            "repos": len(self.paths),
+            "inotify": self.inotify is not None,
+            "watches": len(self.inotify.paths) if self.inotify is not None else 0,
+        }
+
+    def close(self):
+        """
+        監視を終了する。
+        :rtype:                 None
+        """
+
+        self.closed.set()
+        if self.inotify is not None:
+            self.inotify.close()
+
+        return
+
+def serve(root=".", max_depth=None, all_dirs=False):
+    """
+    デーモンを起動し、終了するまで要求を受け付ける。
+    :param str root:        探索するパス
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+    :rtype:                 int
+    :return:                0:正常終了
+    """
+
+    import socketserver
+
+    daemon = Daemon(root, max_depth, all_dirs)
+    if os.path.exists(daemon.path_socket):
+        if get_status(daemon.path_socket) is not None:
+            sys.stderr.write("既に起動しています。\t%s%s" % (daemon.root, os.linesep))
+            return 1
+        # 異常終了したデーモンのソケットを削除する。
+        os.unlink(daemon.path_socket)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def send(message):
+                self.wfile.write(json.dumps(message, ensure_ascii=False).encode("utf-8", "surrogateescape"))
+                self.wfile.write(b"\n")
+                self.wfile.flush()
+
+            try:
+                request = json.loads(self.rfile.readline().decode("utf-8", "surrogateescape"))
+            except ValueError:
+                return
+
+            op = request.get("op")
+            try:
+                if op == "run":
+                    daemon.run(request, send)
+                elif op == "status":
+                    send(daemon.get_status())
+                elif op == "stop":
+                    send({"done": True})
+                    threading.Thread(target=server.shutdown).start()
+                else:
+                    send({"error": "不明な要求です。\t%s" % op})
+            except (BrokenPipeError, ConnectionResetError):
+                # 接続を切られた場合は、残りのジョブを取り消している。
+                pass
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    daemon.refresh()
+
+    # ソケットは、起動したユーザーだけが接続できるようにする。
+    umask = os.umask(0o177)
+    try:
+        server = Server(daemon.path_socket, Handler)
+    finally:
+        os.umask(umask)
+
+    thread = threading.Thread(target=daemon.watch, name="inotify", daemon=True)
+    thread.start()
+    sys.stderr.write("%d 件のリポジトリを監視しています。\t%s%s"
+                     % (len(daemon.paths), daemon.root, os.linesep))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(daemon.path_socket)
+        except OSError:
+            pass
+        daemon.close()
+        thread.join()
+
+    return 0
+
+def main(args, root=".", max_depth=None, all_dirs=False):
+    """
+    gitdeep daemon [stop|status] を処理する。
+    :param list args:       引数
+    :param str root:        探索するパス
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+    :rtype:                 int
+    :return:                0:正常終了
+    """
+
+    action = args[0] if args else "start"
+    if action == "start":
+        return serve(root, max_depth, all_dirs)
+
+    path_socket = find_socket(root)
+    if action not in ("stop", "status"):
+        sys.stderr.write("不明な引数です。\t%s%s" % (action, os.linesep))
+        return 2
+
+    status = get_status(path_socket) if path_socket is not None else None
+    if status is None:
+        sys.stderr.write("起動していません。%s" % os.linesep)
+        return 1
+
+    if action == "stop":
+        for _message in request(path_socket, {"op": "stop"}):
+            pass
+    else:
+        for key in ("pid", "root", "repos", "inotify", "watches"):
+            sys.stdout.write("%s: %s%s" % (key, status[key], os.linesep))
+
+    return 0
+
+def get_socket_path(root, create=False):
+    """
+    デーモンのソケットのパスを取得する。
+    :param str root:        探索するパス (realpath)
+    :param bool create:     ソケットのディレクトリが無い場合は作成する (デーモンを起動する場合)。
+    :rtype:                 str
+    :return:                ソケットのパス
+    """
+
+    return os.path.join(cachedir.get_cache_dir("daemon", create=create),
+                        cachedir.get_key(root) + ".sock")
+
+def find_socket(path="."):
+    """
+    パスかその上位のディレクトリを探索しているデーモンのソケットを探す。
+        CLI の起動毎に呼ばれるため、存在を確認するだけにする (ディレクトリは作成しない)。
+    :param str path:        パス
+    :rtype:                 str
+    :return:                ソケットのパス (無い場合は、None)
+    """
+
+    if not os.path.isdir(cachedir.get_cache_dir("daemon", create=False)):
+        return None
+
+    path = os.path.realpath(path)
+    while True:
+        path_socket = get_socket_path(path)
+        if os.path.exists(path_socket):
+            return path_socket
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def request(path_socket, message):
+    """
+    デーモンに要求を送り、応答を受け取る。
+    :param str path_socket: ソケットのパス
+    :param dict message:    要求
+    :rtype:                 generator
+    :return:                応答のメッセージ
+    """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path_socket)
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8", "surrogateescape") + b"\n")
+        with sock.makefile("rb") as f:
+            for line in f:
+                yield json.loads(line.decode("utf-8", "surrogateescape"))
+    finally:
+        sock.close()
+
+def get_status(path_socket):
+    """
+    デーモンの状態を取得する。
+    :param str path_socket: ソケットのパス
+    :rtype:                 dict
+    :return:                状態 (応答しない場合は、None)
+    """
+
+    try:
+        for message in request(path_socket, {"op": "status"}):
+            return message
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+def run_remote(path, cmd, args, **kwargs):
+    """
+    デーモンが起動していれば、デーモンでコマンドを実行する。
+        探索の条件が異なる場合などは、None を返す。
+    :param str path:        実行するパス
+    :param str cmd:         コマンド
+    :param list args:       引数
+    :param int jobs:        並列に実行するジョブ数
+    :param int per_remote:  リモート毎に並列に実行するジョブ数 (None の場合は、制限なし)
+    :param float timeout:   リポジトリ毎のタイムアウト (秒)
+    :param bool size:       バイト数を取得する。
+    :param bool count_objects: .git のバイト数を git count-objects で取得する。
+    :param int max_depth:   探索する深さ
+    :param bool all_dirs:   除外ディレクトリも探索する。
+    :rtype:                 generator
+    :return:                リポジトリ毎の結果のメッセージ (デーモンを使用しない場合は、None)
+    """
+
+    if os.environ.get(ENV_NO_DAEMON):
+        return None
+
+    path_socket = find_socket(path)
+    if path_socket is None:
+        return None
+
+    message = dict(kwargs, op="run", cwd=os.path.realpath(path), env=dict(os.environ),
+                   cmd=cmd, args=list(args))
+    messages = request(path_socket, message)
+    try:
+        first = next(messages)
+    except (OSError, ValueError, StopIteration):
+        return None
+
+    if "error" in first:
+        messages.close()
+        return None
+
+    return messages
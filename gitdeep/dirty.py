@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+git を起動せずに、変更のあるリポジトリを判定します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import os
+import stat
+import struct
+import subprocess
+import time
+from concurrent import futures
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import gitindex
+else:
+    import cachedir
+    import gitindex
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キャッシュの形式のバージョン
+CACHE_VERSION = 1
+
+# ファイルの更新日時は粗い時計で記録されるため、確認した時刻からこれだけ遡って比較する (ns)
+CLOCK_SLACK_NS = 1000 * 1000 * 1000
+
+# 判定結果
+CLEAN = "clean"
+DIRTY = "dirty"
+UNKNOWN = "unknown"
+
+# 判定方法
+BY_CACHE = "cache"
+BY_STAT = "stat"
+BY_GIT = "git"
+
+Result = collections.namedtuple("Result", "path dirty by branch")
+
+class DirtyChecker(object):
+    """
+    変更のあるリポジトリを判定します。
+        * 前回 git status で確認した時の .git/index と HEAD を保存します。
+        * index と HEAD が変わっていない場合は、index に記録された stat と作業ツリーを比較します。
+        * 比較で判定できないリポジトリだけ、git status を実行します。
+    """
+
+    def __init__(self, root=".", jobs=1, cache=True):
+        """
+        初期処理を行います。
+
+        :param str root:        探索したパス
+        :param int jobs:        並列に判定するスレッド数
+        :param bool cache:      キャッシュを使用する。
+        """
+
+        self.jobs = jobs or 1
+        self.path = None
+        self.entries = {}
+        self.changed = False
+
+        if cache:
+            self.path = os.path.join(cachedir.get_cache_dir("dirty"),
+                                     cachedir.get_key(os.path.realpath(root)) + ".json")
+            data = cachedir.load_json(self.path, {})
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("repos", {})
+
+    def save(self):
+        """
+        キャッシュを保存する。
+        :rtype:                 None
+        """
+
+        if self.path is None or not self.changed:
+            return
+
+        data = {"version": CACHE_VERSION, "repos": self.entries}
+        try:
+            cachedir.save_json(self.path, data)
+        except OSError:
+            pass
+        self.changed = False
+
+        return
+
+    def check_all(self, paths):
+        """
+        リポジトリを判定する。
+        :param list paths:      リポジトリのパス
+        :rtype:                 list
+        :return:                pathsの順の判定結果
+        """
+
+        if self.jobs > 1:
+            with futures.ThreadPoolExecutor(max_workers=self.jobs,
+                                            thread_name_prefix="dirty") as pool:
+                results = list(pool.map(self.check, paths))
+        else:
+            results = [self.check(path) for path in paths]
+
+        self.save()
+
+        return results
+
+    def check(self, path_base):
+        """
+        リポジトリを判定する。
+        :param str path_base:   リポジトリのパス
+        :rtype:                 Result
+        :return:                判定結果
+        """
+
+        path_git = os.path.join(path_base, ".git")
+        state = get_state(path_git)
+        branch = get_branch(state[1])
+        entry = self.entries.get(path_base)
+
+        if entry is not None and entry["state"] == state:
+            try:
+                index = gitindex.read_index(path_git)
+            except (gitindex.InvalidIndex, OSError, struct.error):
+                index = None
+
+            if index is not None and not (index.extensions & gitindex.EXTENSIONS_UNSUPPORTED):
+                result = check_worktree(path_base, index, entry["time"], state[0][0])
+                if result == DIRTY:
+                    return Result(path_base, True, BY_STAT, branch)
+                if result == CLEAN:
+                    return Result(path_base, entry["dirty"], BY_CACHE, branch)
+
+        return self.verify(path_base)
+
+    def verify(self, path_base):
+        """
+        git status で判定する。
+        :param str path_base:   リポジトリのパス
+        :rtype:                 Result
+        :return:                判定結果
+        """
+
+        path_git = os.path.join(path_base, ".git")
+        time_verified = time.time_ns() - CLOCK_SLACK_NS
+
+        try:
+            output = subprocess.check_output(
+                ["git", "-C", path_base, "status", "--porcelain"],
+                stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.CalledProcessError):
+            return Result(path_base, None, BY_GIT, None)
+
+        # git status が index を更新した場合に備えて、実行後の状態を保存する。
+        dirty = bool(output.strip())
+        state = get_state(path_git)
+        self.entries[path_base] = {"state": state, "time": time_verified, "dirty": dirty}
+        self.changed = True
+
+        return Result(path_base, dirty, BY_GIT, get_branch(state[1]))
+
+def get_state(path_git):
+    """
+    .git/index と HEAD の状態を取得する。
+    :param str path_git:    .git ディレクトリのパス
+    :rtype:                 list
+    :return:                ([更新日時, バイト数, iノード], [参照名, オブジェクトID])
+    """
+
+    try:
+        st = os.stat(os.path.join(path_git, "index"))
+        index = [st.st_mtime_ns, st.st_size, st.st_ino]
+    except OSError:
+        index = [0, 0, 0]
+
+    return [index, list(gitindex.read_head(path_git))]
+
+def get_branch(head):
+    """
+    HEAD からブランチ名を取得する。
+    :param list head:       [参照名, オブジェクトID]
+    :rtype:                 str
+    :return:                ブランチ名 (切り離されている場合は、オブジェクトIDの先頭)
+    """
+
+    ref, oid = head
+    if ref is not None:
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    if oid:
+        return oid[:7]
+
+    return None
+
+def check_worktree(path_base, index, time_verified, time_index):
+    """
+    index に記録された stat と作業ツリーを比較する。
+    :param str path_base:       リポジトリのパス
+    :param Index index:         インデックス
+    :param int time_verified:   前回 git status で確認した時刻 (ns)
+    :param int time_index:      index の更新日時 (ns)
+    :rtype:                     str
+    :return:                    DIRTY: 変更あり、CLEAN: 前回から変更なし、UNKNOWN: 判定できない
+    """
+
+    # 変数を初期化します。
+    result = CLEAN
+    base = os.fsencode(path_base)
+    dirs = set([b""])
+
+    for entry in index.entries:
+        # 競合している。
+        if entry.flags & gitindex.FLAG_STAGE:
+            return DIRTY
+
+        if entry.flags & gitindex.FLAG_ASSUME_VALID:
+            continue
+        if entry.flags_ext & gitindex.FLAG_SKIP_WORKTREE:
+            continue
+        if entry.flags_ext & gitindex.FLAG_INTENT_TO_ADD:
+            return DIRTY
+
+        # サブモジュール
+        if stat.S_IFMT(entry.mode) == 0o160000:
+            continue
+
+        try:
+            st = os.lstat(os.path.join(base, entry.path))
+        except (FileNotFoundError, NotADirectoryError):
+            return DIRTY
+        except OSError:
+            result = UNKNOWN
+            continue
+
+        if stat.S_IFMT(st.st_mode) != stat.S_IFMT(entry.mode):
+            return DIRTY
+        if (st.st_size & 0xffffffff) != entry.size:
+            return DIRTY
+
+        # 内容が同じでも stat が変わることがあるため、git で判定する。
+        mtime = entry.mtime * 1000000000 + entry.mtime_ns
+        ctime = entry.ctime * 1000000000 + entry.ctime_ns
+        if (st.st_mtime_ns != mtime or st.st_ctime_ns != ctime
+                or (st.st_ino & 0xffffffff) != entry.ino
+                or (st.st_mode & 0o100) != (entry.mode & 0o100)):
+            result = UNKNOWN
+            continue
+
+        # index と同時に更新されたファイルは、内容を比較しないと判定できない。
+        if mtime >= time_index:
+            result = UNKNOWN
+            continue
+
+        # 親ディレクトリを記録する。
+        path = os.path.dirname(entry.path)
+        while path not in dirs:
+            dirs.add(path)
+            path = os.path.dirname(path)
+
+    if result != CLEAN:
+        return result
+
+    # 確認後にファイルが追加、削除されたディレクトリがある場合は、判定できない。
+    for path in dirs:
+        try:
+            if os.stat(os.path.join(base, path)).st_mtime_ns >= time_verified:
+                return UNKNOWN
+        except OSError:
+            return UNKNOWN
+
+    return CLEAN
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+下位ディレクトリからリポジトリを探索します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import re
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# リポジトリのディレクトリ名
+GIT_DIR = ".git"
+
+# 探索しないディレクトリ (依存パッケージ、キャッシュ、仮想環境など)
+SKIP_DIRS = frozenset([
+    "node_modules",
+    "bower_components",
+    "__pycache__",
+    ".venv",
+    "venv",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".gradle",
+])
+
+def find_repos(path_search=".", max_depth=None, skip_dirs=SKIP_DIRS):
+    """
+    パス以下の .git ディレクトリを取得する。
+        見つけた .git ディレクトリの中は探索しない。
+        名前順にソートする。
+    :param str path_search: パス名
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param set skip_dirs:   探索しないディレクトリ名
+    :rtype:                 list
+    :return:                .git ディレクトリのリスト
+    """
+
+    results = []
+    skip_dirs = frozenset(skip_dirs).union([GIT_DIR])
+    for path, _depth, entries in walk(path_search, max_depth, skip_dirs):
+        for entry in entries:
+            if entry.name == GIT_DIR and entry.is_dir():
+                results.append(os.path.join(path, entry.name))
+
+    # ソートする。
+    results.sort()
+
+    return results
+
+def iter_dirs(path_search=".", dir_match=".*", max_depth=None, skip_dirs=(), prune=False):
+    """
+    パス以下のディレクトリから、名前がマッチするディレクトリを取得する。
+    :param str path_search: パス名
+    :param str dir_match:   マッチング正規化表現式(ディレクトリ名に対して行います)
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param set skip_dirs:   探索しないディレクトリ名
+    :param bool prune:      マッチしたディレクトリの中は探索しない。
+    :rtype:                 generator
+    :return:                ディレクトリのパス
+    """
+
+    match = re.compile(dir_match).search
+    for path, _depth, entries in walk(path_search, max_depth, skip_dirs,
+                                      prune=match if prune else None):
+        for entry in entries:
+            if entry.is_dir() and match(entry.name):
+                yield os.path.join(path, entry.name)
+
+def walk(path_search=".", max_depth=None, skip_dirs=(), prune=None):
+    """
+    os.scandir でディレクトリを探索する。
+        DirEntry の種別を使用するため、ディレクトリ毎に stat を呼び出さない。
+        シンボリックリンクのディレクトリは、os.walk と同様に探索しない。
+    :param str path_search:     パス名
+    :param int max_depth:       探索する深さ (None の場合は、制限なし)
+    :param set skip_dirs:       探索しないディレクトリ名
+    :param function prune:      ディレクトリ名を渡して、真の場合は探索しない。
+    :rtype:                     generator
+    :return:                    (パス, 深さ, DirEntryのリスト)
+    """
+
+    if path_search.endswith(os.sep):
+        path_search = path_search.rstrip(os.sep) or os.sep
+
+    stack = [(path_search, 0)]
+    while stack:
+        path, depth = stack.pop()
+
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        yield (path, depth, entries)
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        # 名前の逆順に積み、名前順に探索する。
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if name in skip_dirs:
+                continue
+            if prune is not None and prune(name):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(name)
+
+        subdirs.sort(reverse=True)
+        for name in subdirs:
+            stack.append((os.path.join(path, name), depth + 1))
+
+def scan(path, skip_dirs=SKIP_DIRS):
+    """
+    ディレクトリを1階層だけ探索する。
+    :param str path:        パス名
+    :param set skip_dirs:   探索しないディレクトリ名
+    :rtype:                 tuple
+    :return:                (探索するサブディレクトリ名のリスト, .git ディレクトリの有無)
+    """
+
+    subdirs = []
+    has_git = False
+
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            if name == GIT_DIR:
+                has_git = has_git or entry.is_dir()
+            elif name not in skip_dirs and entry.is_dir(follow_symlinks=False):
+                subdirs.append(name)
+
+    subdirs.sort()
+
+    return (subdirs, has_git)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+リポジトリのバイト数を取得します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import subprocess
+import time
+from concurrent import futures
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import tracer
+else:
+    import cachedir
+    import tracer
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キャッシュの形式のバージョン
+CACHE_VERSION = 2
+
+# 探索した時刻との差がこれより小さい更新日時は、次回も探索し直す (ns)
+RACY_NS = 2 * 1000 * 1000 * 1000
+
+# リポジトリのディレクトリ名
+GIT_DIR = ".git"
+
+def du(path, jobs=1, count_objects=False, cache=True):
+    """
+    pathに含まれるファイルのバイト数を取得する。
+        ディレクトリ毎に、直下のファイルとサブディレクトリの一覧を更新日時と共に保存し、
+        更新日時が変わっていないディレクトリは、一覧の取得を省略してファイルの stat だけを取り直す。
+        (追記などでファイルのサイズだけが変わった場合も反映される。)
+    :param str path:            パス
+    :param int jobs:            並列に探索するスレッド数
+    :param bool count_objects:  .git のオブジェクトのバイト数を git count-objects で取得する。
+    :param bool cache:          キャッシュを使用する。
+    :rtype:                     int
+    :return:                    バイト数
+    """
+
+    # 変数を初期化します。
+    root = os.path.realpath(path)
+    path_cache = None
+    dirs_old = {}
+
+    if cache:
+        path_cache = os.path.join(cachedir.get_cache_dir("size"),
+                                  cachedir.get_key(root) + ".json")
+        data = cachedir.load_json(path_cache, {})
+        if data.get("version") == CACHE_VERSION and data.get("count_objects") == count_objects:
+            dirs_old = data.get("dirs", {})
+
+    skip = (GIT_DIR,) if count_objects else ()
+    byte, dirs = walk_size(root, dirs_old, jobs, skip)
+
+    if count_objects:
+        byte += git_dir_size(root)
+
+    # 変更がある場合は、キャッシュを保存する。
+    if path_cache is not None and dirs != dirs_old:
+        data = {"version": CACHE_VERSION, "count_objects": count_objects, "dirs": dirs}
+        try:
+            cachedir.save_json(path_cache, data)
+        except OSError:
+            pass
+
+    return byte
+
+class SizePrefetcher(object):
+    """
+    リポジトリのバイト数を、コマンドの実行と並行して取得します。
+        * 投入したリポジトリのバイト数を、スレッドプールで先に取得します。
+        * 取得した結果は、get() で受け取ると破棄します。
+    """
+
+    def __init__(self, jobs=1, **kwargs):
+        """
+        初期処理を行います。
+
+        :param int jobs:            並列に取得するスレッド数
+        :param bool count_objects:  .git のオブジェクトのバイト数を git count-objects で取得する。
+        :param bool cache:          キャッシュを使用する。
+        """
+
+        self.kwargs = kwargs
+        self._pool = futures.ThreadPoolExecutor(max_workers=jobs or 1, thread_name_prefix="size")
+        self._jobs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, path):
+        """
+        バイト数の取得を投入する。
+        :param str path:        パス
+        :rtype:                 None
+        """
+
+        if path not in self._jobs:
+            self._jobs[path] = self._pool.submit(self._du, path)
+
+        return
+
+    def _du(self, path):
+        """
+        ワーカーでバイト数を取得する。
+        """
+
+        with tracer.span("du", "size", path=path):
+            return du(path, **self.kwargs)
+
+    def get(self, path):
+        """
+        バイト数を取得する。
+        :param str path:        パス
+        :rtype:                 int
+        :return:                バイト数
+        """
+
+        self.submit(path)
+
+        return self._jobs.pop(path).result()
+
+    def close(self):
+        """
+        取得していないジョブを取り消す。
+        :rtype:                 None
+        """
+
+        for job in self._jobs.values():
+            job.cancel()
+        self._jobs.clear()
+        self._pool.shutdown(wait=False)
+
+        return
+
+def walk_size(root, dirs_old=None, jobs=1, skip=()):
+    """
+    ディレクトリ以下のファイルのバイト数を取得する。
+        直下のサブディレクトリ毎に、スレッドプールで探索する。
+    :param str root:        パス
+    :param dict dirs_old:   前回のディレクトリ毎の情報
+    :param int jobs:        並列に探索するスレッド数
+    :param tuple skip:      直下の探索しないディレクトリ名
+    :rtype:                 tuple
+    :return:                (バイト数, ディレクトリ毎の情報)
+    """
+
+    # 変数を初期化します。
+    dirs_old = dirs_old or {}
+    time_racy = time.time_ns() - RACY_NS
+
+    byte, subdirs, dirs = scan_size(root, os.curdir, dirs_old, time_racy)
+    subdirs = [name for name in subdirs if name not in skip]
+
+    if jobs is not None and jobs > 1 and len(subdirs) > 1:
+        with futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="size-walk") as pool:
+            results = pool.map(lambda name: tree_size(root, name, dirs_old, time_racy), subdirs)
+            for sub_byte, sub_dirs in results:
+                byte += sub_byte
+                dirs.update(sub_dirs)
+    else:
+        for name in subdirs:
+            sub_byte, sub_dirs = tree_size(root, name, dirs_old, time_racy)
+            byte += sub_byte
+            dirs.update(sub_dirs)
+
+    return (byte, dirs)
+
+def tree_size(root, rel, dirs_old, time_racy):
+    """
+    サブディレクトリ以下のファイルのバイト数を取得する。
+    :param str root:        パス
+    :param str rel:         rootからの相対パス
+    :param dict dirs_old:   前回のディレクトリ毎の情報
+    :param int time_racy:   これより新しい更新日時は保存しない (ns)
+    :rtype:                 tuple
+    :return:                (バイト数, ディレクトリ毎の情報)
+    """
+
+    byte = 0
+    dirs = {}
+    stack = [rel]
+
+    while stack:
+        rel = stack.pop()
+        dir_byte, subdirs, dir_info = scan_size(root, rel, dirs_old, time_racy)
+        byte += dir_byte
+        dirs.update(dir_info)
+
+        for name in subdirs:
+            stack.append(os.path.join(rel, name))
+
+    return (byte, dirs)
+
+def scan_size(root, rel, dirs_old, time_racy):
+    """
+    ディレクトリ直下のファイルのバイト数を取得する。
+        更新日時が変わっていない場合は、前回のファイルとサブディレクトリの一覧を使用する。
+        ディレクトリの情報は [更新日時, {ファイル名: [バイト数, 更新日時]}, サブディレクトリ名のリスト]
+    :param str root:        パス
+    :param str rel:         rootからの相対パス
+    :param dict dirs_old:   前回のディレクトリ毎の情報
+    :param int time_racy:   これより新しい更新日時は保存しない (ns)
+    :rtype:                 tuple
+    :return:                (バイト数, サブディレクトリ名のリスト, ディレクトリの情報)
+    """
+
+    path = root if rel == os.curdir else os.path.join(root, rel)
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return (0, [], {})
+
+    # 一覧が変わっていない場合も、上書きや追記でサイズが変わるため、ファイルの stat は取り直す。
+    entry = dirs_old.get(rel)
+    if entry is not None and entry[0] == mtime:
+        files = {}
+        try:
+            for name in entry[1]:
+                st = os.stat(os.path.join(path, name))
+                files[name] = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            files = None
+        if files is not None:
+            byte = sum(size for size, _mtime in files.values())
+            return (byte, entry[2], {rel: [mtime, files, entry[2]]})
+
+    files = {}
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        pass
+
+    # 探索中に更新された可能性がある場合は、次回も探索し直す。
+    if mtime >= time_racy:
+        mtime = -1
+
+    byte = sum(size for size, _mtime in files.values())
+
+    return (byte, subdirs, {rel: [mtime, files, subdirs]})
+
+def git_dir_size(path):
+    """
+    .git ディレクトリのバイト数を取得する。
+        オブジェクトは git count-objects -v で取得し、直下のファイルを加える。
+    :param str path:    リポジトリのパス
+    :rtype:             int
+    :return:            バイト数
+    """
+
+    byte = 0
+    path_git = os.path.join(path, GIT_DIR)
+
+    try:
+        with os.scandir(path_git) as it:
+            for entry in it:
+                if entry.is_file():
+                    byte += entry.stat().st_size
+    except OSError:
+        pass
+
+    try:
+        output = subprocess.check_output(["git", "-C", path, "count-objects", "-v"],
+                                         stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return byte
+
+    # size, size-pack, size-garbage は KiB 単位
+    for line in output.decode("utf-8", "replace").splitlines():
+        name, _sep, value = line.partition(":")
+        if name in ("size", "size-pack", "size-garbage"):
+            byte += int(value.strip() or 0) * 1024
+
+    return byte
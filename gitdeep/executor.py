@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+複数のリポジトリでコマンドを並列に実行します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+# (shutil, statistics, concurrent.futures は、起動時間を短くするため使用する時に読み込む。)
+import collections
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+
+# Local module
+if "." in __name__:
+    from . import tracer
+else:
+    import tracer
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 中断されたコマンドの戻り値
+RETURNCODE_CANCELLED = -signal.SIGINT
+
+# タイムアウトしたコマンドの戻り値 (timeout コマンドと同じ)
+RETURNCODE_TIMEOUT = 124
+
+# パイプから一度に読み込むバイト数
+CHUNK_SIZE = 64 * 1024
+
+# 結果を返していないジョブ数の上限 (ジョブ数に対する倍数)
+WINDOW = 4
+
+# 実行結果 (出力は str、時間は秒)
+Result = collections.namedtuple("Result", "returncode stdout stderr wall user sys timed_out")
+
+# 実行ファイルのパス
+_executables = {}
+
+def which(name, env=None):
+    """
+    実行ファイルのパスを取得する。
+        PATH 毎に結果を保存する。
+    :param str name:    コマンド名
+    :param dict env:    環境変数 (None の場合は、os.environ)
+    :rtype:             str
+    :return:            実行ファイルのパス (見つからない場合は、name)
+    """
+
+    key = (name, (os.environ if env is None else env).get("PATH"))
+    path = _executables.get(key)
+    if path is None:
+        import shutil
+        path = shutil.which(name, path=key[1]) or name
+        _executables[key] = path
+
+    return path
+
+def get_argv(path_base, cmd, args):
+    """
+    リポジトリで実行するコマンドの引数リストを取得する。
+        シェルを介さずに実行するため、引数は空白や記号を含んでもそのまま渡される。
+    :param str path_base: リポジトリのパス
+    :param str cmd:       コマンド
+    :param list args:     引数
+    :rtype:               list
+    :return:              引数リスト
+    """
+
+    return ["git", "-C", path_base, cmd] + list(args)
+
+def spawn(argv, isolate=False, **kwargs):
+    """
+    シェルを介さずにコマンドを起動する。
+        プロセスグループを分けない場合は、subprocess が posix_spawn を使用できるように、
+        実行ファイルを絶対パスにして、close_fds を無効にする。
+        (Python が作成するファイル記述子は継承されないため、子プロセスには渡らない。)
+    :param list argv:       引数リスト
+    :param bool isolate:    プロセスグループを分ける。
+    :rtype:                 Popen
+    :return:                プロセス
+    """
+
+    if isolate:
+        kwargs["start_new_session"] = True
+    else:
+        kwargs.setdefault("close_fds", False)
+
+    return subprocess.Popen(argv, executable=which(argv[0], kwargs.get("env")), **kwargs)
+
+def kill(ps, group=False):
+    """
+    プロセスを終了する。
+    :param Popen ps:        プロセス
+    :param bool group:      プロセスグループを終了する。(isolate で起動したプロセス)
+    :rtype:                 None
+    """
+
+    try:
+        if group:
+            os.killpg(ps.pid, signal.SIGKILL)
+        else:
+            ps.kill()
+    except OSError:
+        pass
+
+    return
+
+def communicate(ps, timeout=None):
+    """
+    プロセスの終了を待ち、出力を取得する。
+        タイムアウトした場合は、プロセスグループを終了して、それまでの出力を取得する。
+    :param Popen ps:        プロセス (タイムアウトを指定する場合は、isolate で起動する)
+    :param float timeout:   タイムアウト (秒)
+    :rtype:                 tuple
+    :return:                (戻り値, 標準出力, 標準エラー出力, タイムアウトした場合は True)
+    """
+
+    try:
+        stdout_data, stderr_data = ps.communicate(timeout=timeout)
+
+    except subprocess.TimeoutExpired:
+        kill(ps, group=True)
+        stdout_data, stderr_data = ps.communicate()
+        return (RETURNCODE_TIMEOUT, stdout_data, stderr_data, True)
+
+    except BaseException:
+        # 中断時は、子プロセスを残さない。
+        kill(ps, group=timeout is not None)
+        ps.wait()
+        raise
+
+    return (ps.returncode, stdout_data, stderr_data, False)
+
+def collect(ps, timeout=None, time_start=None):
+    """
+    プロセスの標準出力と標準エラー出力を別々に読み込み、終了を待って CPU 時間を取得する。
+        wait4 で子プロセスを回収するため、ユーザー時間とシステム時間はプロセス毎の値になる。
+        (終了したプロセスの子孫のうち、回収されたものを含む。)
+    :param Popen ps:        プロセス (stdout と stderr は PIPE)
+    :param float timeout:   タイムアウト (秒)。isolate で起動したプロセスのみ。
+    :param float time_start: 起動した時刻 (time.monotonic)
+    :rtype:                 Result
+    :return:                実行結果
+    """
+
+    # 変数を初期化します。
+    time_start = time.monotonic() if time_start is None else time_start
+    deadline = None if timeout is None else time_start + timeout
+    timed_out = False
+    buffers = {}
+
+    with selectors.DefaultSelector() as selector:
+        for stream in (ps.stdout, ps.stderr):
+            selector.register(stream, selectors.EVENT_READ)
+            buffers[stream] = []
+
+        try:
+            while selector.get_map():
+                wait = None if deadline is None else max(0, deadline - time.monotonic())
+                events = selector.select(wait)
+                if not events and deadline is not None and time.monotonic() >= deadline:
+                    # タイムアウトした場合は、終了させてから残りの出力を読み込む。
+                    kill(ps, group=True)
+                    timed_out = True
+                    deadline = None
+                    continue
+
+                for key, _mask in events:
+                    data = os.read(key.fd, CHUNK_SIZE)
+                    if data:
+                        buffers[key.fileobj].append(data)
+                    else:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+
+        except BaseException:
+            # 中断時は、子プロセスを残さない。
+            kill(ps, group=timeout is not None)
+            ps.wait()
+            raise
+
+    try:
+        _pid, status, rusage = os.wait4(ps.pid, 0)
+        ps.returncode = os.waitstatus_to_exitcode(status)
+        user, system = rusage.ru_utime, rusage.ru_stime
+    except ChildProcessError:
+        # 他のスレッドで回収された。
+        ps.wait()
+        user, system = 0.0, 0.0
+
+    wall = time.monotonic() - time_start
+    returncode = RETURNCODE_TIMEOUT if timed_out else ps.returncode
+
+    return Result(returncode,
+                  b"".join(buffers[ps.stdout]).decode("utf-8", "replace"),
+                  b"".join(buffers[ps.stderr]).decode("utf-8", "replace"),
+                  wall, user, system, timed_out)
+
+def find_stragglers(durations, factor):
+    """
+    実行時間が中央値の factor 倍を超えたものを取得する。
+    :param list durations:  (名前, 実行時間) のリスト
+    :param float factor:    中央値に対する倍率
+    :rtype:                 tuple
+    :return:                (中央値, 実行時間の長い順の (名前, 実行時間) のリスト)
+    """
+
+    if not durations:
+        return (0.0, [])
+
+    import statistics
+
+    median = statistics.median(duration for _name, duration in durations)
+    results = [(name, duration) for name, duration in durations if duration > median * factor]
+    results.sort(key=lambda result: -result[1])
+
+    return (median, results)
+
+def pop_results(jobs, ordered=True, limit=0):
+    """
+    終了したジョブを取り出して、結果を返す。
+        ジョブ数が limit を超えている間は、終了を待つ。
+    :param deque jobs:      投入した順の Future
+    :param bool ordered:    False の場合は、終了した順に返す。
+    :param int limit:       待たずに残すジョブ数 (0 の場合は、全て待つ)
+    :rtype:                 generator
+    :return:                ジョブの戻り値
+    """
+
+    from concurrent import futures
+
+    while jobs:
+        if ordered:
+            # 先頭のジョブが終わるまでは、後のジョブの結果を返さない。
+            if not jobs[0].done() and len(jobs) <= limit:
+                break
+            yield jobs.popleft().result()
+            continue
+
+        done = [job for job in jobs if job.done()]
+        if not done:
+            if len(jobs) <= limit:
+                break
+            done, _pending = futures.wait(jobs, return_when=futures.FIRST_COMPLETED)
+        for job in done:
+            jobs.remove(job)
+            yield job.result()
+
+def get_jobs(jobs=None):
+    """
+    並列に実行するジョブ数を取得する。
+    :param int jobs: ジョブ数 (None または 1未満の場合は、CPU数)
+    :rtype:          int
+    :return:         ジョブ数
+    """
+
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+
+    return jobs
+
+class Executor(object):
+    """
+    ワーカープールでコマンドを実行します。
+        * 出力はリポジトリ毎に取得し、投入した順に返します。
+        * items がジェネレーターの場合は、全て受け取る前に実行を始め、終了したものから返します。
+        * 結果を返していないジョブは、ジョブ数の WINDOW 倍までにします (items を先読みしない)。
+        * 中断時は、実行待ちのジョブを取り消し、実行中のプロセスを終了します。
+    """
+
+    def __init__(self, jobs=None, timeout=None, env=None, cwd=None):
+        """
+        初期処理を行います。
+
+        :param int jobs:        並列に実行するジョブ数
+        :param float timeout:   コマンド毎のタイムアウト (秒)
+        :param dict env:        コマンドの環境変数 (None の場合は、このプロセスの環境変数)
+        :param str cwd:         コマンドのカレントディレクトリ (None の場合は、このプロセスの値)
+        """
+
+        self.jobs = get_jobs(jobs)
+        self.timeout = timeout
+        self.env = env
+        self.cwd = cwd
+        self.cancelled = threading.Event()
+        self._procs = set()
+        self._lock = threading.Lock()
+
+    def popen(self, argv):
+        """
+        コマンドを実行し、標準出力と標準エラー出力をまとめて取得する。
+            タイムアウトを指定した場合は、プロセスグループを分けて起動し、
+            タイムアウトしたらグループ毎に終了して RETURNCODE_TIMEOUT を返す。
+            (コマンド自体が同じ値で終了した場合と区別するため、タイムアウトは3番目の値で判定する。)
+        :param list argv:       引数リスト
+        :rtype:                 tuple
+        :return:                戻り値、出力文字列、タイムアウトした場合は True
+        """
+
+        if self.cancelled.is_set():
+            return (RETURNCODE_CANCELLED, "", False)
+
+        with tracer.span("spawn", "process"):
+            ps = spawn(argv, isolate=self.timeout is not None, env=self.env, cwd=self.cwd,
+                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+        with self._lock:
+            self._procs.add(ps)
+
+        # 登録前に中断された場合は、ここで終了する。
+        if self.cancelled.is_set():
+            self._kill(ps)
+
+        try:
+            with tracer.span("wait", "process", pid=ps.pid):
+                ret, stdout_data, _stderr_data, timed_out = communicate(ps, self.timeout)
+        finally:
+            with self._lock:
+                self._procs.discard(ps)
+
+        txt = stdout_data.decode("utf-8", "replace") if stdout_data else ""
+
+        return (ret, txt, timed_out)
+
+    def run(self, argv):
+        """
+        コマンドを実行し、標準出力と標準エラー出力を別々に取得する。
+            タイムアウトは popen と同じ。
+        :param list argv:       引数リスト
+        :rtype:                 Result
+        :return:                実行結果
+        """
+
+        if self.cancelled.is_set():
+            return Result(RETURNCODE_CANCELLED, "", "", 0.0, 0.0, 0.0, False)
+
+        time_start = time.monotonic()
+        with tracer.span("spawn", "process"):
+            ps = spawn(argv, isolate=self.timeout is not None, env=self.env, cwd=self.cwd,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        with self._lock:
+            self._procs.add(ps)
+
+        if self.cancelled.is_set():
+            self._kill(ps)
+
+        try:
+            with tracer.span("wait", "process", pid=ps.pid):
+                return collect(ps, self.timeout, time_start)
+        finally:
+            with self._lock:
+                self._procs.discard(ps)
+
+    def map(self, func, items, ordered=True):
+        """
+        ワーカープールで関数を実行する。
+            結果は、itemsの順に返す。
+        :param function func:   ワーカーで実行する関数
+        :param iterable items:  関数の引数 (ジェネレーターでもよい)
+        :param bool ordered:    False の場合は、終了した順に返す。
+        :rtype:                 generator
+        :return:                関数の戻り値
+        """
+
+        from concurrent import futures
+
+        pool = futures.ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="worker")
+        jobs = collections.deque()
+        limit = self.jobs * WINDOW
+        try:
+            for item in items:
+                jobs.append(pool.submit(func, item))
+                # 終了したジョブは、items を受け取っている間も返す。
+                for result in pop_results(jobs, ordered, limit):
+                    yield result
+
+            for result in pop_results(jobs, ordered):
+                yield result
+
+        except BaseException:
+            # 中断(Ctrl-C)や呼び出し元の終了時は、残りのジョブを取り消す。
+            for job in jobs:
+                job.cancel()
+            self.cancel()
+            raise
+
+        finally:
+            pool.shutdown(wait=True)
+
+    def cancel(self):
+        """
+        実行中のコマンドを終了する。
+        :rtype:                 None
+        """
+
+        self.cancelled.set()
+
+        with self._lock:
+            procs = list(self._procs)
+
+        for ps in procs:
+            self._kill(ps)
+
+        return
+
+    def _kill(self, ps):
+        """
+        プロセスを終了する。
+        :param Popen ps:        プロセス
+        :rtype:                 None
+        """
+
+        kill(ps, group=self.timeout is not None)
+
+        return
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+リモート毎に同時に実行するジョブ数を制限して、fetch などを実行します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import os
+import re
+import threading
+
+# Local module
+if "." in __name__:
+    from . import executor
+    from . import gitindex
+else:
+    import executor
+    import gitindex
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# リモートに接続するコマンド
+COMMANDS = ("fetch", "pull", "push", "ls-remote")
+
+# リモートに接続するコマンドの既定のジョブ数 (ネットワークの待ち時間が主のため、CPU数によらない)
+DEFAULT_JOBS = 16
+
+# リモート毎の既定のジョブ数
+DEFAULT_PER_REMOTE = 4
+
+# URLの形式
+RE_URL = re.compile(r"^([A-Za-z][A-Za-z0-9+.-]*)://(?:[^@/]*@)?(\[[^\]]*\]|[^:/]*)")
+RE_SCP = re.compile(r"^(?:[^@/]*@)?(\[[^\]]*\]|[^:/]+):")
+
+class FetchScheduler(executor.Executor):
+    """
+    リモート毎に同時に実行するジョブ数を制限して、コマンドを実行します。
+        * 全体のジョブ数に加えて、リモートのホスト (ローカルの場合はパス) 毎に制限します。
+        * 制限に達したリモートのジョブは飛ばして、実行できるジョブを先に開始します。
+        * 結果は、投入した順に返します。
+    """
+
+    def __init__(self, jobs=None, per_remote=None, timeout=None, env=None, cwd=None):
+        """
+        初期処理を行います。
+
+        :param int jobs:        並列に実行するジョブ数
+        :param int per_remote:  リモート毎に並列に実行するジョブ数
+        :param float timeout:   コマンド毎のタイムアウト (秒)
+        :param dict env:        コマンドの環境変数 (None の場合は、このプロセスの環境変数)
+        :param str cwd:         コマンドのカレントディレクトリ (None の場合は、このプロセスの値)
+        """
+
+        super(FetchScheduler, self).__init__(jobs, timeout, env, cwd)
+        self.per_remote = per_remote or DEFAULT_PER_REMOTE
+        self._pending = []
+        self._running = collections.Counter()
+        self._active = 0
+        self._closed = False
+        self._dispatch_lock = threading.Lock()
+
+    def map(self, func, items, keys=None, ordered=True):
+        """
+        ワーカープールで関数を実行する。
+            結果は、itemsの順に返す。
+        :param function func:   ワーカーで実行する関数
+        :param iterable items:  関数の引数 (ジェネレーターでもよい)
+        :param function keys:   引数からリモートのキーのリストを取得する関数
+        :param bool ordered:    False の場合は、終了した順に返す。
+        :rtype:                 generator
+        :return:                関数の戻り値
+        """
+
+        from concurrent import futures
+
+        # 前回の map() で閉じた場合も、同じインスタンスで実行できるようにする。
+        with self._dispatch_lock:
+            self._pending = []
+            self._closed = False
+
+        pool = futures.ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="worker")
+        jobs = collections.deque()
+        limit = self.jobs * executor.WINDOW
+        try:
+            for item in items:
+                job = futures.Future()
+                jobs.append(job)
+                with self._dispatch_lock:
+                    self._pending.append((job, func, item, tuple(keys(item)) if keys else ()))
+                self._dispatch(pool)
+                for result in executor.pop_results(jobs, ordered, limit):
+                    yield result
+
+            for result in executor.pop_results(jobs, ordered):
+                yield result
+
+        except BaseException:
+            # 中断(Ctrl-C)や呼び出し元の終了時は、残りのジョブを取り消す。
+            with self._dispatch_lock:
+                self._pending = []
+            for job in jobs:
+                job.cancel()
+            self.cancel()
+            raise
+
+        finally:
+            with self._dispatch_lock:
+                self._closed = True
+            pool.shutdown(wait=True)
+
+    def _dispatch(self, pool):
+        """
+        制限に達していないジョブを開始する。
+        :param ThreadPoolExecutor pool: ワーカープール
+        :rtype:                 None
+        """
+
+        with self._dispatch_lock:
+            if self._closed:
+                return
+
+            pending = []
+            for task in self._pending:
+                keys = task[3]
+                if (self._active < self.jobs
+                        and all(self._running[key] < self.per_remote for key in keys)):
+                    self._active += 1
+                    for key in keys:
+                        self._running[key] += 1
+                    pool.submit(self._run, pool, *task)
+                else:
+                    pending.append(task)
+            self._pending = pending
+
+        return
+
+    def _run(self, pool, job, func, item, keys):
+        """
+        ジョブを実行し、終了後に次のジョブを開始する。
+        """
+
+        try:
+            if job.set_running_or_notify_cancel():
+                try:
+                    job.set_result(func(item))
+                except BaseException as ex:
+                    job.set_exception(ex)
+        finally:
+            with self._dispatch_lock:
+                self._active -= 1
+                for key in keys:
+                    self._running[key] -= 1
+            self._dispatch(pool)
+
+        return
+
+def read_config(path_base):
+    """
+    リポジトリの config を読み込む。
+        値は、小文字のセクション名 (サブセクション名は "." で繋ぐ) と変数名をキーにしたリストで返す。
+    :param str path_base:   リポジトリのパス
+    :rtype:                 dict
+    :return:                {"remote.origin": {"url": [...]}, ...}
+    """
+
+    # 変数を初期化します。
+    results = {}
+    section = None
+
+    try:
+        with open(os.path.join(get_git_dir(path_base), "config"), "rb") as f:
+            data = f.read().decode("utf-8", "surrogateescape")
+    except OSError:
+        return results
+
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        match = re.match(r'^\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]', line)
+        if match:
+            section = match.group(1).lower()
+            if match.group(2) is not None:
+                section += "." + re.sub(r"\\(.)", r"\1", match.group(2))
+            line = line[match.end():].strip()
+            if not line:
+                continue
+
+        if section is None:
+            continue
+
+        name, sep, value = line.partition("=")
+        value = value.strip() if sep else "true"
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        results.setdefault(section, {}).setdefault(name.strip().lower(), []).append(value)
+
+    return results
+
+def get_git_dir(path_base):
+    """
+    .git ディレクトリのパスを取得する。
+        .git がファイルの場合は、gitdir の指すパスを返す。
+    :param str path_base:   リポジトリのパス
+    :rtype:                 str
+    :return:                .git ディレクトリのパス
+    """
+
+    path_git = os.path.join(path_base, ".git")
+    if not os.path.isfile(path_git):
+        return path_git
+
+    try:
+        with open(path_git, "rb") as f:
+            line = f.readline().decode("utf-8", "surrogateescape").strip()
+    except OSError:
+        return path_git
+
+    if line.startswith("gitdir:"):
+        return os.path.join(path_base, line[len("gitdir:"):].strip())
+
+    return path_git
+
+def get_remote_key(url, path_base="."):
+    """
+    リモートのURLから、同時に実行するジョブ数を制限する単位のキーを取得する。
+        ネットワークのURLはホスト名、ローカルのリポジトリはパスをキーにする。
+    :param str url:         URL
+    :param str path_base:   リポジトリのパス (相対パスの基準)
+    :rtype:                 str
+    :return:                キー
+    """
+
+    match = RE_URL.match(url)
+    if match:
+        scheme = match.group(1).lower()
+        if scheme == "file":
+            return "file://" + os.path.normpath(url[len("file://"):])
+        return match.group(2).lower()
+
+    # scp 形式 ([user@]host:path)。ただし、Windows のドライブ名と / を含むパスは除く。
+    match = RE_SCP.match(url)
+    if match and len(match.group(1)) > 1 and "/" not in url[:match.end()]:
+        return match.group(1).lower()
+
+    return "file://" + os.path.normpath(os.path.join(path_base, url))
+
+def get_remote_keys(path_base, cmd="fetch", args=()):
+    """
+    コマンドが接続するリモートのキーを取得する。
+        引数にリモート名やURLが無い場合は、ブランチの上流のリモート (無い場合は origin) とする。
+        (url.<base>.insteadOf による書き換えは考慮しない。)
+    :param str path_base:   リポジトリのパス
+    :param str cmd:         コマンド
+    :param list args:       引数
+    :rtype:                 list
+    :return:                キーのリスト
+    """
+
+    # 変数を初期化します。
+    config = read_config(path_base)
+    remotes = collections.OrderedDict()
+    names = []
+
+    for section, values in config.items():
+        if not section.startswith("remote."):
+            continue
+        urls = values.get("url", [])
+        if cmd == "push" and values.get("pushurl"):
+            urls = values["pushurl"]
+        remotes[section[len("remote."):]] = urls
+
+    if "--all" in args or "--multiple" in args:
+        names = list(remotes)
+    else:
+        for arg in args:
+            if arg.startswith("-"):
+                continue
+            if arg in remotes:
+                names = [arg]
+                break
+            # ローカルのパスは、リポジトリからの相対パスとして確認する。
+            if RE_URL.match(arg) or RE_SCP.match(arg) or os.path.isdir(os.path.join(path_base, arg)):
+                return [get_remote_key(arg, path_base)]
+
+    if not names:
+        ref, _oid = gitindex.read_head(get_git_dir(path_base))
+        branch = ref[len("refs/heads/"):] if ref and ref.startswith("refs/heads/") else None
+        upstream = config.get("branch.%s" % branch, {}).get("remote", [None])[-1]
+        if upstream in remotes:
+            names = [upstream]
+        elif "origin" in remotes:
+            names = ["origin"]
+        elif len(remotes) == 1:
+            names = list(remotes)
+
+    keys = set()
+    for name in names:
+        for url in remotes[name]:
+            keys.add(get_remote_key(url, path_base))
+
+    return sorted(keys)
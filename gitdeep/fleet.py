@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+リポジトリの集合に対してコマンドを実行する、ライブラリ用のインターフェースです。
+    * 探索は1回だけ行い、同じ Fleet で何度でもコマンドを実行できます。
+    * 結果はリポジトリ毎の RepoResult で返し、表示やプロセスの終了は行いません。
+
+    >>> fleet = Fleet("~/src")
+    >>> for result in fleet.run("status", ["--short"]):
+    ...     if not result.ok:
+    ...         print(result.path, result.stderr)
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import os
+
+# Local module
+if "." in __name__:
+    from . import catfile
+    from . import discovery
+    from . import executor
+    from . import fetchsched
+    from . import repoindex
+    from . import tracer
+else:
+    import catfile
+    import discovery
+    import executor
+    import fetchsched
+    import repoindex
+    import tracer
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class RepoResult(collections.namedtuple(
+        "RepoResult", "path argv returncode stdout stderr wall user sys timed_out")):
+    """
+    リポジトリ毎の実行結果
+        path:       リポジトリのパス
+        argv:       実行した引数リスト
+        returncode: 戻り値
+        stdout:     標準出力
+        stderr:     標準エラー出力
+        wall:       実行時間 (秒)
+        user:       ユーザーCPU時間 (秒)
+        sys:        システムCPU時間 (秒)
+        timed_out:  タイムアウトした場合は True
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """
+        成功した場合は True
+        """
+
+        return self.returncode == 0
+
+class Fleet(object):
+    """
+    探索したリポジトリの集合
+        * 長く動くプロセスで使用する場合は、refresh() で探索し直します。
+        * run() はジェネレーターで、途中で止めると残りのコマンドを取り消します。
+        * cat_file() は、リポジトリ毎の git cat-file --batch を使い回します (close() で終了します)。
+    """
+
+    def __init__(self, root=".", max_depth=None, all_dirs=False, rescan=False,
+                 jobs=None, per_remote=None, timeout=None):
+        """
+        初期処理を行い、リポジトリを探索します。
+
+        :param str root:        探索するパス
+        :param int max_depth:   探索する深さ (None の場合は、制限なし)
+        :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+        :param bool rescan:     保存したリポジトリの一覧を使用せずに、全て探索し直す。
+        :param int jobs:        並列に実行するジョブ数 (省略時はCPU数、fetch などは16)
+        :param int per_remote:  fetch などを、リモート毎に並列に実行するジョブ数 (省略時は4)
+        :param float timeout:   リポジトリ毎のタイムアウト (秒)
+        """
+
+        self.root = os.path.realpath(os.path.expanduser(root))
+        self.max_depth = max_depth
+        self.all_dirs = all_dirs
+        self.jobs = jobs
+        self.per_remote = per_remote
+        self.timeout = timeout
+        self.paths = []
+        self._catfiles = None
+        self.refresh(rescan)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def refresh(self, rescan=False):
+        """
+        リポジトリを探索し直す。
+        :param bool rescan:     保存したリポジトリの一覧を使用せずに、全て探索し直す。
+        :rtype:                 list
+        :return:                リポジトリのパス
+        """
+
+        self.paths = discover(self.root, self.max_depth, self.all_dirs, rescan)
+
+        return self.paths
+
+    def run(self, cmd, args=(), ordered=True, paths=None, timeout=None):
+        """
+        各リポジトリでコマンドを実行する。
+            失敗したコマンドがあっても、中断せずに全て実行する。
+        :param str cmd:         コマンド
+        :param list args:       引数
+        :param bool ordered:    False の場合は、終了した順に返す。
+        :param list paths:      実行するリポジトリのパス (None の場合は、全てのリポジトリ)
+        :param float timeout:   リポジトリ毎のタイムアウト (None の場合は、Fleet の値)
+        :rtype:                 generator
+        :return:                RepoResult
+        """
+
+        paths = list(self.paths if paths is None else paths)
+        args = list(args)
+        timeout = self.timeout if timeout is None else timeout
+
+        # リモートに接続するコマンドは、CPU数によらずに並列に実行し、リモート毎に制限する。
+        jobs = self.jobs
+        if cmd in fetchsched.COMMANDS:
+            if jobs is None:
+                jobs = fetchsched.DEFAULT_JOBS
+            pool = fetchsched.FetchScheduler(jobs, self.per_remote or fetchsched.DEFAULT_PER_REMOTE,
+                                             timeout=timeout)
+            kwargs = {"keys": lambda path_base: fetchsched.get_remote_keys(path_base, cmd, args)}
+        else:
+            pool = executor.Executor(jobs, timeout=timeout)
+            kwargs = {}
+
+        def run(path_base):
+            argv = executor.get_argv(path_base, cmd, args)
+            with tracer.span("repo", "repo", path=path_base):
+                return RepoResult(path_base, argv, *pool.run(argv))
+
+        return pool.map(run, paths, ordered=ordered, **kwargs)
+
+    def cat_file(self, revs, check=False, ordered=True, paths=None):
+        """
+        各リポジトリのオブジェクトを取得する。
+            リポジトリ毎に起動した git cat-file --batch に、要求をまとめて送る。
+        :param list revs:       オブジェクト名 (HEAD:README.md など)
+        :param bool check:      種類とバイト数だけを取得する (--batch-check)。
+        :param bool ordered:    False の場合は、終了した順に返す。
+        :param list paths:      実行するリポジトリのパス (None の場合は、全てのリポジトリ)
+        :rtype:                 generator
+        :return:                (リポジトリのパス, revsの順の catfile.Object のリスト)
+        """
+
+        if self._catfiles is None:
+            self._catfiles = catfile.CatFilePool()
+        pool = self._catfiles
+        revs = list(revs)
+
+        def run(path_base):
+            with tracer.span("repo", "repo", path=path_base):
+                return (path_base, pool.query(path_base, revs, check))
+
+        return executor.Executor(self.jobs).map(run, list(self.paths if paths is None else paths),
+                                                ordered=ordered)
+
+    def close(self):
+        """
+        cat_file() で起動したプロセスを終了する。
+        :rtype:                 None
+        """
+
+        if self._catfiles is not None:
+            self._catfiles.close()
+            self._catfiles = None
+
+        return
+
+def discover(path_search=".", max_depth=None, all_dirs=False, rescan=False):
+    """
+    パス以下のリポジトリを取得する。
+        名前順にソートする。
+    :param str path_search: 探索するパス
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+    :param bool rescan:     保存したリポジトリの一覧を使用せずに、全て探索し直す。
+    :rtype:                 list
+    :return:                リポジトリのパス
+    """
+
+    skip_dirs = () if all_dirs else discovery.SKIP_DIRS
+    dnames = repoindex.find_repos(path_search, max_depth, skip_dirs, rescan=rescan)
+
+    return [os.path.realpath(os.path.join(os.path.realpath(dname), "..")) for dname in dnames]
+
+def iter_discover(path_search=".", max_depth=None, all_dirs=False, rescan=False):
+    """
+    パス以下のリポジトリを、見つけた順に返す。
+        探索し終える前に、見つけたリポジトリから実行を始めるために使用する。
+    :param str path_search: 探索するパス
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param bool all_dirs:   node_modules などの除外ディレクトリも探索する。
+    :param bool rescan:     保存したリポジトリの一覧を使用せずに、全て探索し直す。
+    :rtype:                 generator
+    :return:                リポジトリのパス
+    """
+
+    skip_dirs = () if all_dirs else discovery.SKIP_DIRS
+    for dname in repoindex.iter_repos(path_search, max_depth, skip_dirs, rescan=rescan):
+        yield os.path.realpath(os.path.join(os.path.realpath(dname), ".."))
+
+def get_sort_key(path_base):
+    """
+    discover() と同じ順に並べるためのキーを取得する。
+        .git ディレクトリのパスの順にする。
+    :param str path_base:   リポジトリのパス
+    :rtype:                 str
+    :return:                キー
+    """
+
+    return os.path.join(path_base, discovery.GIT_DIR)
@@ -11,19 +11,31 @@ from __future__ import unicode_literals
 
 # Buitin module
 import argparse
-import logging
+import collections
+import importlib.util
+import json
 import os
 import re
+import shlex
 import sys
 import subprocess
+import time
 
 # Local module
 if "." in __name__:
-    from . import logwriter
-    from . import cmdparser
+    from . import console
+    from . import discovery
+    from . import executor
+    from . import fetchsched
+    from . import fleet
+    from . import tracer
 else:
-    import logwriter
-    import cmdparser
+    import console
+    import discovery
+    import executor
+    import fetchsched
+    import fleet
+    import tracer
 
 # Global variable
 __author__ = "Kazuyuki OHMI"
@@ -31,93 +43,868 @@ __version__ = "1.0.8"
 __date__    = "2016/12/12"
 __license__ = 'MIT'
 
+def import_lazy(name):
+    """
+    ローカルモジュールを、最初に属性を参照した時に読み込む。
+        起動時間を短くするため、一部のコマンドやオプションだけで使用するモジュールに使う。
+    :param str name:    モジュール名
+    :rtype:             module
+    :return:            モジュール
+    """
+
+    if "." in __name__:
+        name = __name__.rpartition(".")[0] + "." + name
+
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
+
+# 必要になった時に読み込むモジュール
+catfile = import_lazy("catfile")
+daemon = import_lazy("daemon")
+dirty = import_lazy("dirty")
+dusize = import_lazy("dusize")
+linereader = import_lazy("linereader")
+resultcache = import_lazy("resultcache")
+snapshot = import_lazy("snapshot")
+logwriter = import_lazy("logwriter")
+streamer = import_lazy("streamer")
+
 def call(cmd, args, **kwargs):
     """
     下位ディレクトリを含めて、コマンドを実行する。
+        コマンドが dirty の場合は、変更のあるリポジトリを表示する。
+        コマンドが daemon の場合は、デーモンを起動する (引数が stop、status の場合は、終了、状態の表示)。
+        デーモンが起動している場合は、探索せずにデーモンで実行する。
+        コマンドが cat、show-file の場合は、git cat-file --batch でオブジェクトを表示する。
+        見つけたリポジトリから実行を始め、出力は探索した順 (名前順の深さ優先) に表示する。
     :param str cmd:      コマンド
     :param list args:    引数
+    :param int jobs:     並列に実行するジョブ数 (省略時はCPU数、fetch などは16)
+    :param int per_remote: fetch などを、リモート毎に並列に実行するジョブ数 (省略時は4)
+    :param bool live:    出力をリポジトリのパスを付けて到着順に表示する。
+    :param str format:   出力形式 (jsonl の場合は、リポジトリ毎の結果をJSONで1行ずつ終了した順に出力する。)
+    :param float timeout: リポジトリ毎のタイムアウト (秒)。タイムアウトしたリポジトリは飛ばして続ける。
+    :param float stragglers: 実行時間が中央値のこの倍数を超えたリポジトリを表示する。
+    :param str trace:    処理の時間を Chrome のトレースイベント形式で保存するパス
+    :param int max_depth: リポジトリを探索する深さ
+    :param bool all_dirs: node_modules などの除外ディレクトリも探索する。
+    :param bool rescan:  保存したリポジトリの一覧を使用せずに、全て探索し直す。
+    :param bool count_objects: .git のバイト数を git count-objects で取得する。
+    :param bool no_size: バイト数を表示しない。
+    :param bool summary: 出力が同じリポジトリをまとめて、リポジトリ数を表示する。
+    :param bool only_changed: 前回の実行から .git や作業ツリーの最上位の更新日時が変わったリポジトリだけ実行する (fetch などは除く)。
+    :param bool cache:   status や log など読み取りだけのコマンドの結果を、リポジトリの状態が変わるまで再利用する。
+    :param bool sorted:  出力をパスの順に表示する (実行は探索と並行して行い、出力だけを全て終わるまで貯める)。
     :param bool verbose: コンソールで実行時にメッセージを表示する。
     :param bool debug:   デバッグオプション
     :rtype:              int
     :return:             0:正常終了
     """
 
+    # 計測する場合は、全体を計測して保存する。
+    if kwargs.get("trace"):
+        tracer.start()
+        try:
+            with tracer.span("call", "phase", cmd=cmd):
+                return call(cmd, args, **dict(kwargs, trace=None))
+        finally:
+            tracer.stop(kwargs["trace"])
+
     # 変数を初期化します。
-    ret = 0
     verbose = kwargs.get("verbose")
     _debug = kwargs.get("debug")
+    jobs = kwargs.pop("jobs", None)
+    per_remote = kwargs.pop("per_remote", None)
+
+    # リモートに接続するコマンドは、CPU数によらずに並列に実行し、リモート毎に制限する。
+    if cmd not in fetchsched.COMMANDS:
+        per_remote = None
+    else:
+        if jobs is None:
+            jobs = fetchsched.DEFAULT_JOBS
+        if per_remote is None:
+            per_remote = fetchsched.DEFAULT_PER_REMOTE
+    jobs = executor.get_jobs(jobs)
+
+    # リモートの変更は記録した更新日時に現れないため、fetch などは飛ばせない。
+    if kwargs.get("only_changed") and cmd in fetchsched.COMMANDS:
+        sys.stderr.write("--only-changed は %s には使用できません (リモートの変更を検出できません)。%s"
+                         % (cmd, os.linesep))
+        return 2
+
+    if cmd == "daemon":
+        return daemon.main(args, ".", kwargs.get("max_depth"), kwargs.get("all_dirs"))
+
+    # デーモンが起動している場合は、探索せずにデーモンで実行する。
+    if is_daemon_usable(cmd, jobs, **kwargs):
+        messages = daemon.run_remote(".", cmd, args, jobs=jobs, per_remote=per_remote,
+                                     timeout=kwargs.get("timeout"),
+                                     size=bool(verbose and not kwargs.get("no_size")),
+                                     count_objects=kwargs.get("count_objects"),
+                                     max_depth=kwargs.get("max_depth"),
+                                     all_dirs=kwargs.get("all_dirs"))
+        if messages is not None:
+            return call_daemon(messages, **kwargs)
+
+    # 下位ディレクトリは、探索しながら実行に渡す。
+    paths = fleet.iter_discover(".", kwargs.get("max_depth"), kwargs.get("all_dirs"),
+                                kwargs.get("rescan"))
+
+    if cmd == "dirty":
+        with tracer.span("dirty", "phase"):
+            return call_dirty(paths, jobs)
+
+    if cmd in catfile.COMMANDS:
+        with tracer.span("execute", "phase"):
+            return call_cat(cmd, args, paths, jobs, **kwargs)
+
+    if not kwargs.get("only_changed"):
+        return call_repos(cmd, args, paths, jobs, per_remote=per_remote, **kwargs)
+
+    # 前回から変更の無いリポジトリは、実行しない。
+    snapshots = snapshot.Snapshots(".", cmd, args)
+    skipped = []
+
+    def iter_changed():
+        for path_base in paths:
+            if snapshots.is_changed(path_base):
+                yield path_base
+            else:
+                skipped.append(path_base)
+
+    # 成功したリポジトリだけを記録する。
+    succeeded = []
+    try:
+        return call_repos(cmd, args, iter_changed(), jobs, per_remote=per_remote,
+                          succeeded=succeeded, **kwargs)
+    finally:
+        snapshots.update(succeeded)
+        snapshots.save()
+        if verbose and skipped:
+            sys.stderr.write("変更の無い %d 件のリポジトリを飛ばしました。%s"
+                             % (len(skipped), os.linesep))
+
+def call_repos(cmd, args, paths, jobs, **kwargs):
+    """
+    リポジトリ毎のコマンドを実行する。
+        その他の引数は、call() と同じです。
+    :param str cmd:      コマンド
+    :param list args:    引数
+    :param iterable paths: リポジトリのパス (探索中のジェネレーターでもよい)
+    :param int jobs:     並列に実行するジョブ数
+    :param list succeeded: 成功したリポジトリのパスを追加するリスト
+    :rtype:              int
+    :return:             0:正常終了
+    """
+
+    # 変数を初期化します。
+    ret = 0
+    verbose = kwargs.get("verbose")
+    per_remote = kwargs.get("per_remote")
+    timeout = kwargs.get("timeout")
+    succeeded = kwargs.get("succeeded")
+    durations = []
+
+    if kwargs.get("format") == "jsonl":
+        with tracer.span("execute", "phase"):
+            ret = call_jsonl(cmd, args, paths, jobs, per_remote=per_remote, timeout=timeout,
+                             durations=durations, succeeded=succeeded)
+        print_stragglers(durations, kwargs.get("stragglers"))
+        return ret
+
+    if kwargs.get("live"):
+        with tracer.span("execute", "phase"):
+            ret = call_live(cmd, args, paths, jobs, per_remote=per_remote, timeout=timeout,
+                            durations=durations, succeeded=succeeded)
+        print_stragglers(durations, kwargs.get("stragglers"))
+        return ret
+
+    # バイト数は、コマンドの実行と並行して取得する。
+    sizes = None
+    if verbose and not kwargs.get("no_size"):
+        sizes = dusize.SizePrefetcher(jobs, count_objects=kwargs.get("count_objects"))
+        paths = iter_submit(sizes, paths)
+
+    # 読み取りだけのコマンドは、リポジトリの状態が変わっていなければ前回の結果を使用する。
+    cache = None
+    if kwargs.get("cache") and resultcache.is_cacheable(cmd, args):
+        cache = resultcache.ResultCache(cmd, args)
+
+    # 出力は、まとめて書き込む。
+    out = console.ConsoleWriter(sys.stdout)
+    try:
+        if jobs > 1 or kwargs.get("summary") or cache is not None:
+            with tracer.span("execute", "phase"):
+                ret = call_parallel(cmd, args, paths, jobs, verbose=verbose, sizes=sizes,
+                                    per_remote=per_remote, timeout=timeout, durations=durations,
+                                    summary=kwargs.get("summary"), out=out,
+                                    succeeded=succeeded, cache=cache, sorted=kwargs.get("sorted"))
+
+        else:
+            # 子プロセスは端末に直接出力するため、出力を貯めずにパスを並べてから実行する。
+            if kwargs.get("sorted"):
+                paths = sorted(paths, key=fleet.get_sort_key)
+
+            for path_base in paths:
+                with tracer.span("repo", "repo", path=path_base):
+                    if verbose:
+                        out.writeline(get_header(path_base, get_size(sizes, path_base)))
+
+                    argv = get_argv(path_base, cmd, args)
+                    time_start = time.monotonic()
+                    # 子プロセスは端末に直接出力するため、先に書き込む。
+                    out.flush()
+                    result, _txt, timed_out = popen(argv, echo=True, abort=True, timeout=timeout)
+                    durations.append((path_base, time.monotonic() - time_start))
+                    out.writeline()
+
+                if timed_out:
+                    out.flush()
+                    sys.stderr.write(get_timeout_message(format_cmdline(argv), timeout))
+                    sys.stderr.write(os.linesep)
+                    ret = 1
+                elif result !=0:
+                    out.flush()
+                    sys.exit(result)
+                elif succeeded is not None:
+                    succeeded.append(path_base)
+
+    finally:
+        out.close()
+        if sizes is not None:
+            sizes.close()
+        if cache is not None:
+            cache.close()
+
+    print_stragglers(durations, kwargs.get("stragglers"))
+
+    return ret
+
+def iter_submit(sizes, paths):
+    """
+    リポジトリを受け取った順に、バイト数の取得を開始する。
+        直列に実行する場合もコマンドの実行と重なるように、1つ先のリポジトリまで開始してから返す。
+    :param SizePrefetcher sizes: バイト数の取得
+    :param iterable paths: リポジトリのパス
+    :rtype:              generator
+    :return:             リポジトリのパス
+    """
+
+    path_prev = None
+    for path_base in paths:
+        sizes.submit(path_base)
+        if path_prev is not None:
+            yield path_prev
+        path_prev = path_base
+
+    if path_prev is not None:
+        yield path_prev
+
+def call_parallel(cmd, args, paths, jobs, **kwargs):
+    """
+    リポジトリ毎のコマンドを並列に実行する。
+        出力はリポジトリ毎にまとめて、paths の順に表示する。
+    :param str cmd:      コマンド
+    :param list args:    引数
+    :param iterable paths: リポジトリのパス (探索中のジェネレーターでもよい)
+    :param int jobs:     並列に実行するジョブ数
+    :param bool verbose: コンソールで実行時にメッセージを表示する。
+    :param SizePrefetcher sizes: バイト数の取得 (None の場合は、表示しない)
+    :param int per_remote: リモート毎に並列に実行するジョブ数 (None の場合は、制限なし)
+    :param float timeout: リポジトリ毎のタイムアウト (秒)
+    :param list durations: リポジトリ毎の (パス, 実行時間) を追加するリスト
+    :param bool summary: 出力が同じリポジトリをまとめて、リポジトリ数を表示する。
+    :param ConsoleWriter out: 出力先 (None の場合は、標準出力)
+    :param list succeeded: 成功したリポジトリのパスを追加するリスト
+    :param ResultCache cache: 結果のキャッシュ (None の場合は、使用しない)
+    :param bool sorted:  出力を全て貯めて、パスの順に表示する。
+    :rtype:              int
+    :return:             0:正常終了
+    """
 
-    # 下位ディレクトリを取得する。
-    dnames = get_dirs(".", "^.git$")
-    paths = map(lambda dname: os.path.realpath(dname), dnames)
-    for path in paths:
-        path_base = os.path.realpath(os.path.join(path, ".."))
-        dname = os.path.basename(path_base)
+    # 変数を初期化します。
+    per_remote = kwargs.get("per_remote")
+    timeout = kwargs.get("timeout")
+    cache = kwargs.get("cache")
+    keys = None
+
+    if per_remote:
+        pool = fetchsched.FetchScheduler(jobs, per_remote, timeout=timeout)
+        keys = lambda path_base: fetchsched.get_remote_keys(path_base, cmd, args)
+    else:
+        pool = executor.Executor(jobs, timeout=timeout)
+
+    def run(path_base):
+        argv = get_argv(path_base, cmd, args)
+        time_start = time.monotonic()
+        with tracer.span("repo", "repo", path=path_base):
+            result = cache.get(path_base) if cache is not None else None
+            if result is not None:
+                ret, txt = result
+                timed_out = False
+            else:
+                time_start_ns = time.time_ns()
+                ret, txt, timed_out = pool.popen(argv)
+                if cache is not None:
+                    cache.put(path_base, ret, txt, time_start_ns)
+
+        return (path_base, ret, format_cmdline(argv), txt, time.monotonic() - time_start, timed_out)
+
+    if keys is not None:
+        results = pool.map(run, paths, keys=keys)
+    else:
+        results = pool.map(run, paths)
+
+    return write_results(results, **kwargs)
+
+def write_results(results, **kwargs):
+    """
+    リポジトリ毎の結果を、受け取った順に表示する。
+        失敗したコマンドがあれば、残りのジョブを取り消して終了する。
+        sorted の場合は、全て受け取ってからパスの順に表示する (失敗しても、全て実行する)。
+    :param generator results: (パス, 戻り値, コマンドライン, 出力, 実行時間, タイムアウト) を返すジェネレーター
+    :param bool verbose: コンソールで実行時にメッセージを表示する。
+    :param SizePrefetcher sizes: バイト数の取得 (None の場合は、表示しない)
+    :param float timeout: リポジトリ毎のタイムアウト (秒)
+    :param list durations: リポジトリ毎の (パス, 実行時間) を追加するリスト
+    :param bool summary: 出力が同じリポジトリをまとめて、リポジトリ数を表示する。
+    :param ConsoleWriter out: 出力先 (None の場合は、標準出力)
+    :param list succeeded: 成功したリポジトリのパスを追加するリスト
+    :param bool sorted:  全て受け取ってから、パスの順に表示する。
+    :rtype:              int
+    :return:             0:正常終了
+    """
+
+    # 変数を初期化します。
+    ret = 0
+    verbose = kwargs.get("verbose")
+    sizes = kwargs.get("sizes")
+    timeout = kwargs.get("timeout")
+    durations = kwargs.get("durations")
+    summary = console.Summary() if kwargs.get("summary") else None
+    out = kwargs.get("out") or console.ConsoleWriter(sys.stdout)
+    succeeded = kwargs.get("succeeded")
 
+    def write(path_base, line, txt):
         if verbose:
-            print("----- %s -----" % dname)
-            print("path: %s" % path_base)
-            print("size: %s" % bytes2str(du(path_base)))
-            print("")
+            out.writeline(get_header(path_base, get_size(sizes, path_base)))
+        out.writeline("$ %s" % line)
+        out.write(txt)
+        out.writeline()
+
+    if kwargs.get("sorted"):
+        results = sort_results(results)
+
+    try:
+        for path_base, result, line, txt, duration, timed_out in results:
+            if durations is not None:
+                durations.append((path_base, duration))
+
+            if summary is not None and result == 0:
+                summary.add(path_base, txt, (line, txt))
+            else:
+                write(path_base, line, txt)
+
+            if timed_out:
+                out.flush()
+                sys.stderr.write(get_timeout_message(line, timeout))
+                sys.stderr.write(os.linesep)
+                ret = 1
+
+            elif result != 0:
+                # 残りのジョブを取り消して終了する。
+                results.close()
+                out.flush()
+                sys.exit(get_abort_message(line, result))
+
+            elif succeeded is not None:
+                succeeded.append(path_base)
+
+        if summary is not None:
+            # 出力が他と異なるリポジトリは通常通りに、同じリポジトリはまとめて表示する。
+            for path_base, (line, txt) in summary.get_unique():
+                write(path_base, line, txt)
+            for txt, items in summary.get_groups():
+                out.writeline(console.format_group(txt, len(items)))
+
+    finally:
+        out.flush()
+
+    return ret
+
+def sort_results(results):
+    """
+    リポジトリ毎の結果を全て受け取り、パスの順に返す。
+        実行は止めずに、出力だけを貯める。
+    :param generator results: (パス, 戻り値, コマンドライン, 出力, 実行時間, タイムアウト) を返すジェネレーター
+    :rtype:              generator
+    :return:             (パス, 戻り値, コマンドライン, 出力, 実行時間, タイムアウト)
+    """
+
+    try:
+        buffered = list(results)
+    finally:
+        results.close()
+    buffered.sort(key=lambda result: fleet.get_sort_key(result[0]))
+
+    for result in buffered:
+        yield result
+
+def is_daemon_usable(cmd, jobs, **kwargs):
+    """
+    デーモンで実行できるかを判定する。
+        端末に直接出力する直列の実行や、終了した順の出力、前回の結果を使用する場合は、デーモンを使用しない。
+    :param str cmd:      コマンド
+    :param int jobs:     並列に実行するジョブ数
+    :rtype:              bool
+    :return:             デーモンで実行できる場合は True
+    """
+
+    if cmd == "dirty" or cmd in catfile.COMMANDS:
+        return False
+    # 認証の入力を求める場合があるため、リモートに接続するコマンドは端末のあるプロセスで実行する。
+    if cmd in fetchsched.COMMANDS:
+        return False
+    if kwargs.get("format") == "jsonl" or kwargs.get("live"):
+        return False
+    if kwargs.get("only_changed") or kwargs.get("rescan") or kwargs.get("cache"):
+        return False
+
+    return jobs > 1 or bool(kwargs.get("summary"))
+
+def call_daemon(messages, **kwargs):
+    """
+    デーモンから受け取った結果を、call_parallel と同じ形式で表示する。
+    :param generator messages: デーモンから受け取るリポジトリ毎の結果
+    :param bool verbose: コンソールで実行時にメッセージを表示する。
+    :param float timeout: リポジトリ毎のタイムアウト (秒)
+    :param float stragglers: 実行時間が中央値のこの倍数を超えたリポジトリを表示する。
+    :param bool summary: 出力が同じリポジトリをまとめて、リポジトリ数を表示する。
+    :param bool sorted:  出力を全て貯めて、パスの順に表示する。
+    :rtype:              int
+    :return:             0:正常終了
+    """
 
-        line = 'cd "{dir}" && git {cmd} {args}'.format(
-                    dir=path_base, cmd=cmd, args=" ".join(args))
-        ret, _txt = popen(line, echo=True, abort=True)
-        print("")
+    # 変数を初期化します。
+    ret = 0
+    durations = []
+    sizes = {}
+
+    def iter_results():
+        try:
+            for message in messages:
+                if message.get("done"):
+                    break
+                path_base = message["path"]
+                sizes[path_base] = message.get("size")
+                yield (path_base, message["returncode"], format_cmdline(message["argv"]),
+                       message["output"], message["duration"], message.get("timed_out", False))
+        finally:
+            # 途中で終了した場合は、接続を切って残りのジョブを取り消す。
+            messages.close()
 
-        if ret !=0:
-            sys.exit(ret)
+    out = console.ConsoleWriter(sys.stdout)
+    try:
+        with tracer.span("execute", "phase"):
+            ret = write_results(iter_results(), verbose=kwargs.get("verbose"),
+                                sizes=sizes if kwargs.get("verbose") else None,
+                                timeout=kwargs.get("timeout"), durations=durations,
+                                summary=kwargs.get("summary"), out=out,
+                                sorted=kwargs.get("sorted"))
+    finally:
+        out.close()
+
+    print_stragglers(durations, kwargs.get("stragglers"))
 
     return ret
 
-def get_dirs(path_search="", dir_match=".*"):
+def call_live(cmd, args, paths, jobs, **kwargs):
+    """
+    リポジトリ毎のコマンドを並列に実行する。
+        出力は行毎にリポジトリのパス (探索したパスからの相対パス) を付けて、到着順に表示する。
+    :param str cmd:      コマンド
+    :param list args:    引数
+    :param iterable paths: リポジトリのパス (探索中のジェネレーターでもよい)
+    :param int jobs:     並列に実行するジョブ数
+    :param int per_remote: リモート毎に並列に実行するジョブ数 (None の場合は、制限なし)
+    :param float timeout: リポジトリ毎のタイムアウト (秒)
+    :param list durations: リポジトリ毎の (パス, 実行時間) を追加するリスト
+    :param list succeeded: 成功したリポジトリのパスを追加するリスト
+    :rtype:              int
+    :return:             0:正常終了
+    """
+
+    # 変数を初期化します。
+    ret = 0
+    tasks = []
+    per_remote = kwargs.get("per_remote")
+    timeout = kwargs.get("timeout")
+    durations = kwargs.get("durations")
+    succeeded = kwargs.get("succeeded")
+
+    # 探索しながら、見つけたリポジトリから実行を始める。
+    def iter_tasks():
+        for path_base in paths:
+            # 同じ名前のリポジトリを区別できるように、探索したパスからの相対パスを付ける。
+            task = (os.path.relpath(path_base), get_argv(path_base, cmd, args),
+                    fetchsched.get_remote_keys(path_base, cmd, args) if per_remote else ())
+            tasks.append((path_base, task[1]))
+            yield task
+
+    runner = streamer.Streamer(jobs, per_key=per_remote, timeout=timeout)
+    results = runner.run(iter_tasks())
+
+    if durations is not None:
+        durations.extend(zip([path_base for path_base, _argv in tasks], runner.durations))
+
+    # 失敗したコマンドを表示する。
+    for (path_base, argv), result, timed_out in zip(tasks, results, runner.timed_out):
+        if timed_out:
+            sys.stderr.write(get_timeout_message(format_cmdline(argv), timeout))
+            sys.stderr.write(os.linesep)
+            ret = ret or 1
+        elif result == 0:
+            if succeeded is not None:
+                succeeded.append(path_base)
+        else:
+            sys.stderr.write(get_abort_message(format_cmdline(argv), result))
+            sys.stderr.write(os.linesep)
+            ret = ret or 1
+
+    return ret
+
+def call_jsonl(cmd, args, paths, jobs, **kwargs):
+    """
+    リポジトリ毎のコマンドを並列に実行する。
+        結果はリポジトリ毎に1行のJSONにして、終了した順に出力する。
+        失敗したコマンドがあっても、中断せずに全て実行する。
+    :param str cmd:      コマンド
+    :param list args:    引数
+    :param list paths:   リポジトリのパス
+    :param int jobs:     並列に実行するジョブ数
+    :param int per_remote: リモート毎に並列に実行するジョブ数 (None の場合は、制限なし)
+    :param float timeout: リポジトリ毎のタイムアウト (秒)
+    :param list durations: リポジトリ毎の (パス, 実行時間) を追加するリスト
+    :param list succeeded: 成功したリポジトリのパスを追加するリスト
+    :param file stream:  出力先
+    :rtype:              int
+    :return:             0:正常終了、1:失敗したコマンドがある
+    """
+
+    # 変数を初期化します。
+    ret = 0
+    per_remote = kwargs.get("per_remote")
+    timeout = kwargs.get("timeout")
+    durations = kwargs.get("durations")
+    succeeded = kwargs.get("succeeded")
+    stream = kwargs.get("stream") or sys.stdout
+
+    def run(path_base):
+        with tracer.span("repo", "repo", path=path_base):
+            return (path_base, pool.run(get_argv(path_base, cmd, args)))
+
+    if per_remote:
+        pool = fetchsched.FetchScheduler(jobs, per_remote, timeout=timeout)
+        results = pool.map(run, paths, ordered=False,
+                           keys=lambda path_base: fetchsched.get_remote_keys(path_base, cmd, args))
+    else:
+        pool = executor.Executor(jobs, timeout=timeout)
+        results = pool.map(run, paths, ordered=False)
+
+    for path_base, result in results:
+        argv = get_argv(path_base, cmd, args)
+        record = collections.OrderedDict([
+            ("path", path_base),
+            ("command", format_cmdline(argv)),
+            ("argv", argv),
+            ("exit_code", result.returncode),
+            ("timed_out", result.timed_out),
+            ("wall", round(result.wall, 6)),
+            ("user", round(result.user, 6)),
+            ("sys", round(result.sys, 6)),
+            ("stdout", result.stdout),
+            ("stderr", result.stderr),
+        ])
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write("\n")
+        stream.flush()
+
+        if durations is not None:
+            durations.append((path_base, result.wall))
+        if result.returncode != 0:
+            ret = 1
+        elif succeeded is not None:
+            succeeded.append(path_base)
+
+    return ret
+
+def call_cat(cmd, args, paths, jobs, **kwargs):
+    """
+    リポジトリ毎に git cat-file --batch を1つ起動し、オブジェクトをまとめて表示する。
+        cat REV... は、オブジェクトの内容を表示する (--batch-check を指定した場合は、種類とバイト数)。
+        show-file PATH [REV] は、REV (省略時は HEAD) のファイルの内容を表示する。
+        見つからないオブジェクトは、"REV missing" と表示する。
+    :param str cmd:      コマンド (cat、show-file)
+    :param list args:    引数
+    :param list paths:   リポジトリのパス
+    :param int jobs:     並列に実行するジョブ数
+    :param bool verbose: コンソールで実行時にメッセージを表示する。
+    :param bool summary: 出力が同じリポジトリをまとめて、リポジトリ数を表示する。
+    :param bool sorted:  出力を全て貯めて、パスの順に表示する。
+    :rtype:              int
+    :return:             0:正常終了
+    """
+
+    # 変数を初期化します。
+    args = list(args)
+    check = "--batch-check" in args
+    revs = [arg for arg in args if arg != "--batch-check"]
+
+    if cmd == "show-file":
+        if len(revs) not in (1, 2):
+            sys.stderr.write("gitdeep show-file PATH [REV]%s" % os.linesep)
+            return 2
+        revs = ["%s:%s" % (revs[1] if len(revs) > 1 else "HEAD", revs[0])]
+    elif not revs:
+        sys.stderr.write("gitdeep cat [--batch-check] REV...%s" % os.linesep)
+        return 2
+
+    # cat-file --batch は1行を1つの要求とするため、改行を含む名前は渡せない。
+    if any("\n" in rev for rev in revs):
+        sys.stderr.write("オブジェクト名に改行は使用できません。%s" % os.linesep)
+        return 2
+
+    # CLI では各リポジトリに1回だけ要求するため、プロセスは使い回さずにリポジトリ毎に閉じる。
+    # (使い回すのは、Fleet.cat_file() で何度も要求する場合。)
+    def run(path_base):
+        time_start = time.monotonic()
+        argv = catfile.CatFile.get_argv(path_base, check)
+        with tracer.span("repo", "repo", path=path_base):
+            try:
+                with catfile.CatFile(path_base, check) as proc:
+                    objects = proc.query(revs)
+            except OSError as ex:
+                return (path_base, 1, format_cmdline(argv), "%s\n" % ex, 0.0, False)
+
+        txt = "".join(catfile.format_object(obj) for obj in objects)
+
+        return (path_base, 0, format_cmdline(argv), txt, time.monotonic() - time_start, False)
+
+    out = console.ConsoleWriter(sys.stdout)
+    try:
+        ret = write_results(executor.Executor(jobs).map(run, paths), verbose=kwargs.get("verbose"),
+                            summary=kwargs.get("summary"), out=out, sorted=kwargs.get("sorted"))
+    finally:
+        out.close()
+
+    return ret
+
+def call_dirty(paths, jobs):
+    """
+    変更のあるリポジトリを表示する。
+        .git/index に記録された stat で判定し、判定できないリポジトリだけ git status を実行する。
+    :param list paths:   リポジトリのパス
+    :param int jobs:     並列に判定するスレッド数
+    :rtype:              int
+    :return:             0:正常終了
+    """
+
+    # 変数を初期化します。
+    ret = 0
+    checker = dirty.DirtyChecker(".", jobs)
+
+    for result in checker.check_all(paths):
+        if result.dirty is None:
+            sys.stderr.write("判定できませんでした。\t%s%s" % (result.path, os.linesep))
+            ret = 1
+        elif result.dirty:
+            sys.stdout.write("%s\t%s%s" % (os.path.relpath(result.path), result.branch, os.linesep))
+
+    return ret
+
+def get_size(sizes, path_base):
+    """
+    並行して取得したバイト数を受け取る。
+    :param SizePrefetcher sizes: バイト数の取得 (None の場合は、取得しない)
+    :param str path_base: リポジトリのパス
+    :rtype:               int
+    :return:              バイト数 (取得しない場合は、None)
+    """
+
+    if sizes is None:
+        return None
+
+    with tracer.span("size.wait", "size", path=path_base):
+        return sizes.get(path_base)
+
+def get_header(path_base, byte=None):
+    """
+    リポジトリの見出しを取得する。
+    :param str path_base: リポジトリのパス
+    :param int byte:      バイト数 (None の場合は、表示しない)
+    :rtype:               str
+    :return:              見出し
+    """
+
+    dname = os.path.basename(path_base)
+    lines = [
+        "----- %s -----" % dname,
+        "path: %s" % path_base,
+    ]
+    if byte is not None:
+        lines.append("size: %s" % bytes2str(byte))
+    lines.append("")
+
+    return os.linesep.join(lines)
+
+def get_argv(path_base, cmd, args):
+    """
+    リポジトリで実行するコマンドの引数リストを取得する。
+        シェルを介さずに実行するため、引数は空白や記号を含んでもそのまま渡される。
+    :param str path_base: リポジトリのパス
+    :param str cmd:       コマンド
+    :param list args:     引数
+    :rtype:               list
+    :return:              引数リスト
+    """
+
+    return executor.get_argv(path_base, cmd, args)
+
+def iter_lines(path_base, cmd, args=(), timeout=None):
+    """
+    リポジトリでコマンドを実行し、標準出力を1行ずつ返す。
+        出力全体を保持しないため、git log などの大きな出力でもメモリの使用量は一定になる。
+        戻り値と標準エラー出力 (末尾) は、読み込んだ後に returncode と stderr で参照する。
+    :param str path_base: リポジトリのパス
+    :param str cmd:       コマンド
+    :param list args:     引数
+    :param float timeout: タイムアウト (秒)
+    :rtype:               LineReader
+    :return:              行のイテレータ
+    """
+
+    return linereader.LineReader(get_argv(path_base, cmd, args), timeout=timeout)
+
+def format_cmdline(argv):
+    """
+    引数リストを表示用のコマンドラインにする。
+    :param list argv:     引数リスト
+    :rtype:               str
+    :return:              コマンドライン
+    """
+
+    return " ".join(shlex.quote(arg) for arg in argv)
+
+def get_abort_message(cmd, ret, stderr_data=None):
+    """
+    コマンドの失敗時に表示するメッセージを取得する。
+    :param unicode cmd:     コマンド
+    :param int ret:         戻り値
+    :rtype:                 str
+    :return:                メッセージ
+    """
+
+    return "コマンドの実行に失敗しました。\n\t%s\n\t%d\n\t%s" % (cmd, ret, stderr_data)
+
+def get_timeout_message(cmd, timeout):
+    """
+    コマンドのタイムアウト時に表示するメッセージを取得する。
+    :param unicode cmd:     コマンド
+    :param float timeout:   タイムアウト (秒)
+    :rtype:                 str
+    :return:                メッセージ
+    """
+
+    return "タイムアウトしました。\n\t%s\n\t%s 秒" % (cmd, timeout)
+
+def print_stragglers(durations, factor):
+    """
+    実行時間が中央値の factor 倍を超えたリポジトリを、標準エラー出力に表示する。
+    :param list durations:  (パス, 実行時間) のリスト
+    :param float factor:    中央値に対する倍率 (None の場合は、表示しない)
+    :rtype:                 None
+    """
+
+    if not factor:
+        return
+
+    median, results = executor.find_stragglers(durations, factor)
+    sys.stderr.write("時間のかかったリポジトリ (中央値 %.2f 秒の %s 倍を超えたもの): %d%s"
+                     % (median, factor, len(results), os.linesep))
+    for path_base, duration in results:
+        sys.stderr.write("\t%.2f 秒\t%s%s" % (duration, path_base, os.linesep))
+    sys.stderr.flush()
+
+    return
+
+def get_dirs(path_search="", dir_match=".*", **kwargs):
     """
     パス以下のファイルを取得する。
         名前順にソートする。
     :param str path_search: パス名
     :param str dir_match:   マッチング正規化表現式(ディレクトリ名に対して行います)
+    :param int max_depth:   探索する深さ
+    :param bool prune:      マッチしたディレクトリの中は探索しない。
     :rtype:                 list
     :return:                ファイルのリスト
     """
 
     # 変数を初期化します。
-    results = []
-    if path_search.endswith(os.sep):
-        path_search = path_search.rstrip(os.sep)
-
-    for root, dirs, _files in os.walk(path_search):
-
-        # ディレクトリ毎の処理を行います。
-        for dname in dirs:
-            match = re.search(dir_match, dname)
-            if match != None:
-                results.append(os.path.join(root, dname))
+    results = list(discovery.iter_dirs(path_search or os.curdir, dir_match,
+                                       max_depth=kwargs.get("max_depth"),
+                                       prune=kwargs.get("prune", False)))
 
     # ソートする。
     results.sort()
 
     return results
 
-def popen(cmd, echo=True, abort=False):
+def popen(cmd, echo=True, abort=False, timeout=None):
     """
     コマンドを実行する。
-    :param unicode cmd:     コマンド
+        引数リストの場合は、シェルを介さずに実行する。
+    :param unicode cmd:     コマンド (コマンドラインまたは引数リスト)
     :param bool echo:       コマンドを表示する。戻り値の出力文字列はNoneになる。
-    :param bool abort:      戻り値が0でない場合終了する。
+    :param bool abort:      戻り値が0でない場合終了する。(タイムアウトした場合は終了しない。)
+    :param float timeout:   タイムアウト (秒)。プロセスグループ毎に終了し、戻り値は RETURNCODE_TIMEOUT になる。
     :rtype:                 tuple
-    :return:                戻り値、出力文字列
+    :return:                戻り値、出力文字列、タイムアウトした場合は True
     """
 
+    if isinstance(cmd, list):
+        line = format_cmdline(cmd)
+    else:
+        line = cmd
+
     if echo:
-        sys.stdout.write("$ %s%s"  % (cmd, os.linesep))
+        sys.stdout.write("$ %s%s"  % (line, os.linesep))
+        sys.stdout.flush()
 
     if echo:
-        ps = subprocess.Popen(cmd, shell=True, stdout=sys.stdout)
+        stdout = None
     else:
-        ps = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
+        stdout = subprocess.PIPE
+
+    isolate = timeout is not None
+    with tracer.span("spawn", "process"):
+        if isinstance(cmd, list):
+            ps = executor.spawn(cmd, isolate=isolate, stdout=stdout)
+        else:
+            ps = subprocess.Popen(cmd, shell=True, stdout=stdout, start_new_session=isolate)
     _ps_pid = ps.pid
 
-    stdout_data, stderr_data = ps.communicate()
+    with tracer.span("wait", "process", pid=ps.pid):
+        ret, stdout_data, stderr_data, timed_out = executor.communicate(ps, timeout)
 
     # パイプを閉じる。
     if echo:
@@ -125,7 +912,8 @@ def popen(cmd, echo=True, abort=False):
     else:
         ps.stdout.close()
 
-    ret = ps.wait()
+    if timed_out:
+        abort = False
 
     if stdout_data:
         txt = stdout_data.decode('utf-8')
@@ -133,34 +921,24 @@ def popen(cmd, echo=True, abort=False):
         txt = None
 
     if abort and ret!=0:
-        sys.exit("コマンドの実行に失敗しました。\n\t%s\n\t%d\n\t%s" % (cmd, ret, stderr_data))
+        sys.exit(get_abort_message(line, ret, stderr_data))
 
-    return (ret, txt)
+    return (ret, txt, timed_out)
 
 def du(path, *args, **kwargs):
     """
     pathに含まれるファイルのバイト数を取得する。
-    :param str path: パス
-    :rtype:          int
+    :param str path:            パス
+    :param int jobs:            並列に探索するスレッド数
+    :param bool count_objects:  .git のオブジェクトのバイト数を git count-objects で取得する。
+    :param bool cache:          キャッシュを使用する。
+    :rtype:                     int
     :return:
     """
 
-    # 変数を初期化します。
-    _debug = kwargs.get("debug")
-    logger = kwargs.get("logger")
-    if not logger:
-        logger = logging.getLogger(__file__)
-
-    byte = 0
-
-    for root, _dirs, files in os.walk(path):
-
-        for fname in files:
-            path = os.path.join(root, fname)
-            if os.path.isfile(path):
-                byte += os.path.getsize(path)
-
-    return byte
+    return dusize.du(path, jobs=kwargs.get("jobs", 1),
+                     count_objects=kwargs.get("count_objects", False),
+                     cache=kwargs.get("cache", True))
 
 def bytes2str(byte, fmt='%(value).0f %(symbol)sB', symbol_type='short'):
     """
@@ -225,6 +1003,8 @@ def parse_docstring(func):
 
             if txt_type == "int":
                 typ = int
+            elif txt_type == "float":
+                typ = float
             elif txt_type == "str":
                 typ = str
             elif txt_type == "list":
@@ -247,7 +1027,6 @@ def main():
 
     # 変数を初期化します。
     result = 0
-    logger = logwriter.LogWriter("gitdeep")
 
     # 引数の処理を行います。
     parser = argparse.ArgumentParser(
@@ -258,12 +1037,57 @@ def main():
         '--debug', action='store_true', default=False, **values["debug"])
     parser.add_argument(
         '--version', action='version', version=__version__)
+    parser.add_argument(
+        '-j', '--jobs', default=None, **values["jobs"])
+    parser.add_argument(
+        '--per-remote', default=None, **values["per_remote"])
+    parser.add_argument(
+        '--format', default="text", choices=["text", "jsonl"], **values["format"])
+    parser.add_argument(
+        '--timeout', default=None, metavar="SECONDS", **values["timeout"])
+    parser.add_argument(
+        '--stragglers', default=None, metavar="K", **values["stragglers"])
+    parser.add_argument(
+        '--trace', default=None, metavar="OUT.json", **values["trace"])
+    values["live"].pop("type")
+    parser.add_argument(
+        '--live', action='store_true', default=False, **values["live"])
+    parser.add_argument(
+        '--max-depth', default=None, **values["max_depth"])
+    values["all_dirs"].pop("type")
+    parser.add_argument(
+        '--all-dirs', action='store_true', default=False, **values["all_dirs"])
+    values["rescan"].pop("type")
+    parser.add_argument(
+        '--rescan', action='store_true', default=False, **values["rescan"])
+    values["count_objects"].pop("type")
+    parser.add_argument(
+        '--count-objects', action='store_true', default=False, **values["count_objects"])
+    values["no_size"].pop("type")
+    parser.add_argument(
+        '--no-size', action='store_true', default=False, **values["no_size"])
+    values["summary"].pop("type")
+    parser.add_argument(
+        '--summary', action='store_true', default=False, **values["summary"])
+    values["only_changed"].pop("type")
+    parser.add_argument(
+        '--only-changed', action='store_true', default=False, **values["only_changed"])
+    values["cache"].pop("type")
+    parser.add_argument(
+        '--cache', action='store_true', default=False, **values["cache"])
+    values["sorted"].pop("type")
+    parser.add_argument(
+        '--sorted', action='store_true', default=False, **values["sorted"])
     parser.add_argument('cmd', **values["cmd"])
     values["args"]["type"] = str
     parser.add_argument('args', nargs="*", **values["args"])
 
     # コマンドを処理する。
     args = parser.parse_args()
+    if args.debug:
+        # ロガーは、デバッグ時だけ作成する。
+        logwriter.LogWriter("gitdeep", level=logwriter.DEBUG)
+
     if not hasattr(args, 'cmd'):
         parser.error(u'引数が不足しています。')
         sys.exit(-1)
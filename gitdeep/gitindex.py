@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.git/index と .git/HEAD を読み込みます。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import mmap
+import os
+import re
+import struct
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# エントリのフラグ
+FLAG_ASSUME_VALID = 0x8000
+FLAG_EXTENDED = 0x4000
+FLAG_STAGE = 0x3000
+FLAG_NAME = 0x0fff
+FLAG_SKIP_WORKTREE = 0x4000
+FLAG_INTENT_TO_ADD = 0x2000
+
+# エントリの固定長部分 (ctime, mtime, dev, ino, mode, uid, gid, size)
+ENTRY_STAT = struct.Struct(">10I")
+
+# エントリを全て読み込めない拡張 (分割インデックス、スパースインデックス)
+EXTENSIONS_UNSUPPORTED = frozenset([b"link", b"sdir"])
+
+IndexEntry = collections.namedtuple(
+    "IndexEntry", "path ctime ctime_ns mtime mtime_ns dev ino mode size flags flags_ext")
+
+Index = collections.namedtuple("Index", "version entries extensions")
+
+class InvalidIndex(ValueError):
+    """
+    読み込めないインデックス
+    """
+
+def get_hash_size(path_git):
+    """
+    オブジェクトIDのバイト数を取得する。
+    :param str path_git:    .git ディレクトリのパス
+    :rtype:                 int
+    :return:                バイト数 (SHA-1: 20, SHA-256: 32)
+    """
+
+    try:
+        with open(os.path.join(path_git, "config"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return 20
+
+    if re.search(br"^\s*objectformat\s*=\s*sha256\s*$", data, re.I | re.M):
+        return 32
+
+    return 20
+
+def read_index(path_git):
+    """
+    .git/index を読み込む。
+        バージョン2から4に対応する。
+    :param str path_git:    .git ディレクトリのパス
+    :rtype:                 Index
+    :return:                インデックス (index が無い場合は、エントリが空)
+    """
+
+    path = os.path.join(path_git, "index")
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return Index(2, [], frozenset())
+
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise InvalidIndex("empty index: %s" % path)
+
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return parse_index(data, get_hash_size(path_git))
+        finally:
+            data.close()
+
+def parse_index(data, hash_size=20):
+    """
+    インデックスを解析する。
+    :param bytes data:      インデックスの内容
+    :param int hash_size:   オブジェクトIDのバイト数
+    :rtype:                 Index
+    :return:                インデックス
+    """
+
+    if len(data) < 12 + hash_size or data[:4] != b"DIRC":
+        raise InvalidIndex("invalid index signature")
+
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise InvalidIndex("unsupported index version: %d" % version)
+
+    # 変数を初期化します。
+    entries = []
+    offset = 12
+    path_prev = b""
+    unpack_stat = ENTRY_STAT.unpack_from
+    unpack_flags = struct.Struct(">H").unpack_from
+    size_fixed = ENTRY_STAT.size + hash_size
+
+    for _i in range(count):
+        (ctime, ctime_ns, mtime, mtime_ns, dev, ino, mode, _uid, _gid, size
+         ) = unpack_stat(data, offset)
+        pos = offset + size_fixed
+        flags = unpack_flags(data, pos)[0]
+        pos += 2
+
+        flags_ext = 0
+        if flags & FLAG_EXTENDED:
+            flags_ext = unpack_flags(data, pos)[0]
+            pos += 2
+
+        if version == 4:
+            # 前のエントリのパスの末尾を取り除いた長さと、続くパスの組み合わせ
+            strip, pos = read_varint(data, pos)
+            end = data.find(b"\0", pos)
+            path = path_prev[:len(path_prev) - strip] + data[pos:end]
+            offset = end + 1
+        else:
+            end = data.find(b"\0", pos)
+            path = data[pos:end]
+            # 8バイト境界までNULで埋められる。
+            offset += ((end - offset) // 8 + 1) * 8
+
+        entries.append(IndexEntry(path, ctime, ctime_ns, mtime, mtime_ns, dev, ino,
+                                  mode, size, flags, flags_ext))
+        path_prev = path
+
+    # 拡張の種類を取得する。
+    extensions = set()
+    end = len(data) - hash_size
+    while offset + 8 <= end:
+        signature = bytes(data[offset:offset + 4])
+        size = struct.unpack_from(">I", data, offset + 4)[0]
+        extensions.add(signature)
+        offset += 8 + size
+
+    return Index(version, entries, frozenset(extensions))
+
+def read_varint(data, pos):
+    """
+    インデックスバージョン4の可変長整数を読み込む。
+    :param bytes data:      インデックスの内容
+    :param int pos:         位置
+    :rtype:                 tuple
+    :return:                (値, 次の位置)
+    """
+
+    c = data[pos]
+    pos += 1
+    value = c & 0x7f
+    while c & 0x80:
+        value += 1
+        c = data[pos]
+        pos += 1
+        value = (value << 7) + (c & 0x7f)
+
+    return (value, pos)
+
+def read_head(path_git):
+    """
+    .git/HEAD を読み込む。
+    :param str path_git:    .git ディレクトリのパス
+    :rtype:                 tuple
+    :return:                (参照名 (HEAD が切り離されている場合は、None), オブジェクトID (無い場合は、None))
+    """
+
+    try:
+        with open(os.path.join(path_git, "HEAD"), "rb") as f:
+            head = f.read().strip().decode("utf-8", "surrogateescape")
+    except OSError:
+        return (None, None)
+
+    if not head.startswith("ref:"):
+        return (None, head)
+
+    ref = head[4:].strip()
+
+    return (ref, resolve_ref(path_git, ref))
+
+def resolve_ref(path_git, ref, depth=5):
+    """
+    参照のオブジェクトIDを取得する。
+        ファイルの参照、packed-refs の順に探す。
+    :param str path_git:    .git ディレクトリのパス
+    :param str ref:         参照名 (refs/heads/master など)
+    :rtype:                 str
+    :return:                オブジェクトID (無い場合は、None)
+    """
+
+    try:
+        with open(os.path.join(path_git, ref), "rb") as f:
+            value = f.read().strip().decode("utf-8", "surrogateescape")
+    except OSError:
+        value = None
+
+    if value is not None:
+        # シンボリック参照
+        if value.startswith("ref:"):
+            if depth <= 0:
+                return None
+            return resolve_ref(path_git, value[4:].strip(), depth - 1)
+        return value
+
+    try:
+        with open(os.path.join(path_git, "packed-refs"), "rb") as f:
+            for line in f:
+                if line[:1] in (b"#", b"^"):
+                    continue
+                oid, _sep, name = line.rstrip(b"\r\n").partition(b" ")
+                if name.decode("utf-8", "surrogateescape") == ref:
+                    return oid.decode("ascii")
+    except OSError:
+        pass
+
+    return None
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+コマンドの標準出力を、少しずつ読み込んで1行ずつ返します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import codecs
+import os
+import selectors
+import subprocess
+import time
+
+# Local module
+if "." in __name__:
+    from . import executor
+else:
+    import executor
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 1行の文字数の上限 (超えた場合は、分割して返す)
+MAX_LINE = 1024 * 1024
+
+# 保存する標準エラー出力のバイト数 (末尾を残す)
+STDERR_LIMIT = 64 * 1024
+
+class LineReader(object):
+    """
+    コマンドの標準出力を、1行ずつ返します。
+        * パイプから CHUNK_SIZE ずつ読み込み、インクリメンタルデコーダで UTF-8 から変換します。
+        * 出力全体を保持しないため、出力が大きくてもメモリの使用量は一定です。
+        * 行末の改行 (\\n、\\r\\n) は除きます。
+        * 標準エラー出力は、末尾の STDERR_LIMIT バイトだけを保存します。
+        * 途中で読み込みをやめた場合 (close() や with を抜けた場合) は、コマンドを終了します。
+    """
+
+    def __init__(self, argv, cwd=None, timeout=None, errors="replace", max_line=MAX_LINE):
+        """
+        初期処理を行います。
+
+        :param list argv:       引数リスト
+        :param str cwd:         作業ディレクトリ
+        :param float timeout:   タイムアウト (秒)。プロセスグループ毎に終了する。
+        :param str errors:      UTF-8 として変換できない場合の処理 (replace, surrogateescape など)
+        :param int max_line:    1行の文字数の上限
+        """
+
+        self.argv = argv
+        self.timeout = timeout
+        self.max_line = max_line
+        self.returncode = None
+        self.timed_out = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors)
+        self._errors = errors
+        self._stderr = bytearray()
+        self._time_start = time.monotonic()
+        self._ps = executor.spawn(argv, isolate=timeout is not None, cwd=cwd,
+                                  stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._lines = self._read_lines()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def stderr(self):
+        """
+        標準エラー出力 (末尾の STDERR_LIMIT バイト)
+        :rtype:                 str
+        """
+
+        return bytes(self._stderr).decode("utf-8", self._errors)
+
+    def close(self):
+        """
+        読み込みを終了する。
+            コマンドが終了していない場合は、終了させる。
+        :rtype:                 int
+        :return:                戻り値
+        """
+
+        self._lines.close()
+        if self.returncode is None:
+            # 読み込みを開始していない場合
+            executor.kill(self._ps, group=self.timeout is not None)
+            for stream in (self._ps.stdout, self._ps.stderr):
+                stream.close()
+            self.returncode = self._ps.wait()
+
+        return self.returncode
+
+    def _read_lines(self):
+        """
+        標準出力を1行ずつ返す。
+        :rtype:                 generator
+        :return:                行
+        """
+
+        # 変数を初期化します。
+        ps = self._ps
+        deadline = None if self.timeout is None else self._time_start + self.timeout
+        pending = ""
+        finished = False
+
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(ps.stdout, selectors.EVENT_READ)
+                selector.register(ps.stderr, selectors.EVENT_READ)
+
+                while selector.get_map():
+                    wait = None if deadline is None else max(0, deadline - time.monotonic())
+                    events = selector.select(wait)
+                    if not events and deadline is not None and time.monotonic() >= deadline:
+                        # タイムアウトした場合は、終了させてから残りの出力を読み込む。
+                        executor.kill(ps, group=True)
+                        self.timed_out = True
+                        deadline = None
+                        continue
+
+                    for key, _mask in events:
+                        data = os.read(key.fd, executor.CHUNK_SIZE)
+                        if not data:
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()
+                        elif key.fileobj is ps.stderr:
+                            self._stderr += data
+                            del self._stderr[:-STDERR_LIMIT]
+                        else:
+                            lines = (pending + self._decoder.decode(data)).split("\n")
+                            pending = lines.pop()
+                            for line in lines:
+                                if line.endswith("\r"):
+                                    line = line[:-1]
+                                while len(line) > self.max_line:
+                                    yield line[:self.max_line]
+                                    line = line[self.max_line:]
+                                yield line
+                            while len(pending) > self.max_line:
+                                yield pending[:self.max_line]
+                                pending = pending[self.max_line:]
+
+            pending += self._decoder.decode(b"", final=True)
+            if pending:
+                yield pending[:-1] if pending.endswith("\r") else pending
+            finished = True
+
+        finally:
+            if not finished:
+                # 中断時や読み込みをやめた場合は、子プロセスを残さない。
+                executor.kill(ps, group=self.timeout is not None)
+                for stream in (ps.stdout, ps.stderr):
+                    stream.close()
+            ps.wait()
+            self.returncode = executor.RETURNCODE_TIMEOUT if self.timed_out else ps.returncode
+
+        return
@@ -7,21 +7,19 @@
 # Compatible module
 from __future__ import absolute_import
 from __future__ import unicode_literals
-import six
 
 # Buitin module
+# (logging.handlers, cProfile, pstats は、起動時間を短くするため使用する時に読み込む。)
+import atexit
+import codecs
 import collections
 import datetime
 import functools
-import inspect
-import logging.handlers
+import logging
 import os
+import re
 import stat
 import sys
-import unittest
-import cProfile
-import pstats
-import io
 
 # Global variable
 __author__ = "Kazuyuki OHMI"
@@ -36,6 +34,54 @@ INFO = logging.INFO
 DEBUG = logging.DEBUG
 NOTSET = logging.NOTSET
 
+# 呼び出し元の位置 (inspect.Traceback と同じ属性を持つ)
+Frame = collections.namedtuple("Frame", "filename lineno function code_context index")
+
+# ファイルのパスから拡張子を除いたファイル名へのキャッシュ
+_file_bases = {}
+
+# decode() の結果
+Decoded = collections.namedtuple("result", "text encoding")
+
+# decode() で試すエンコーディング (先頭から順に試す)
+ENCODINGS = ['utf_8',
+             'euc_jp',
+             'euc_jis_2004',
+             'euc_jisx0213',
+             'shift_jis',
+             'shift_jis_2004',
+             'shift_jisx0213',
+             'iso2022jp',
+             'iso2022_jp_1',
+             'iso2022_jp_2',
+             'iso2022_jp_3',
+             'iso2022_jp_ext', 'latin_1',
+             'cp923',
+             'cp437',
+             'ascii',
+             ]
+
+# 日本語のエンコーディングの文字 (完全な文字の並び、文字の途中)
+RE_JAPANESE = collections.OrderedDict([
+    ("euc_jp", (re.compile(b"(?:[\x00-\x7f]|[\xa1-\xfe][\xa1-\xfe]|\x8e[\xa1-\xdf]"
+                           b"|\x8f[\xa1-\xfe][\xa1-\xfe])*"),
+                re.compile(b"[\xa1-\xfe]|\x8e|\x8f[\xa1-\xfe]?"))),
+    ("shift_jis", (re.compile(b"(?:[\x00-\x7f\xa1-\xdf]|[\x81-\x9f\xe0-\xfc][\x40-\x7e\x80-\xfc])*"),
+                   re.compile(b"[\x81-\x9f\xe0-\xfc]"))),
+    ])
+
+# 8ビットの文字
+RE_8BIT = re.compile(b"[\\x80-\\xff]")
+
+# detect() で調べるバイト数
+DETECT_WINDOW = 64
+
+# decode() でソース毎に記録するエンコーディングの数の上限
+MEMO_SIZE = 1024
+
+# ソース毎に検出したエンコーディング
+_encodings = {}
+
 class LogWriter(logging.Logger):
     """
     ロガー
@@ -67,6 +113,7 @@ class LogWriter(logging.Logger):
         }
 
     path_main = ""                  # main mulude path
+    _queue = None                   # 非同期に出力する場合の (QueueHandler, QueueListener)
 
     @property
     def version(self):
@@ -93,8 +140,14 @@ class LogWriter(logging.Logger):
         :param str name:        ログ名称
         :param int level:       ログレベル
         :param bool stdout:     標準出力に出力する。
+        :param int queue_size:  0 より大きい場合は、この容量のキューを介して非同期に出力する。
+        :param str overflow:    キューが一杯の場合の処理 (block, drop, drop_oldest)
         """
 
+        # 非同期の設定は、他のロガーに引き継がないように conf に入れない。
+        queue_size = kwargs.pop("queue_size", 0)
+        overflow = kwargs.pop("overflow", "drop")
+
         # 引数を取り込みます。
         self.conf.update({"name": name})
         self.conf.update({"level": level})
@@ -140,6 +193,10 @@ class LogWriter(logging.Logger):
 
             self.addRotateFileHandler(filename,maxBytes,backupCount)
 
+        # 非同期の出力を開始します。
+        if queue_size:
+            self.start_queue(queue_size, overflow)
+
         # ロガー配列に登録します。
         import __main__
         self.path_main = __main__.__file__
@@ -166,11 +223,92 @@ class LogWriter(logging.Logger):
 
         self.conf["level"] = level
         logging.Logger.setLevel(self, level)
-        for handler in self.handlers:
+        for handler in self.get_handlers():
             handler.setLevel(level)
 
         return
 
+    def addHandler(self, hdlr):
+        """
+        ハンドラを登録します。
+        非同期に出力している場合は、バックグラウンドのスレッドから出力します。
+
+        :param Handler hdlr:    ハンドラ
+        :rtype:                 None
+        """
+
+        if self._queue is not None:
+            self._queue[1].add_handler(hdlr)
+        else:
+            logging.Logger.addHandler(self, hdlr)
+
+        return
+
+    def get_handlers(self):
+        """
+        出力先のハンドラを取得します。
+        非同期に出力している場合は、バックグラウンドのスレッドのハンドラを返します。
+
+        :rtype:                 list
+        :return:                ハンドラのリスト
+        """
+
+        if self._queue is not None:
+            return list(self._queue[1].handlers)
+
+        return list(self.handlers)
+
+    def start_queue(self, size=None, overflow="drop"):
+        """
+        ハンドラの出力を、キューを介してバックグラウンドのスレッドで行います。
+        呼び出し元のスレッドは、ファイルやソケットへの書き込みを待ちません。
+        終了時には、キューに残ったレコードを全て出力します。
+
+        :param int size:        キューの容量 (None の場合は、queued.QUEUE_SIZE)
+        :param str overflow:    キューが一杯の場合の処理 (block, drop, drop_oldest)
+        :rtype:                 None
+        """
+
+        if self._queue is not None:
+            return
+
+        # 非同期に出力する場合だけ使用するため、ここで読み込む。
+        if "." in __name__:
+            from . import queued
+        else:
+            import queued
+
+        self._queue = queued.start(self, size or queued.QUEUE_SIZE, overflow)
+        atexit.register(self.stop_queue)
+
+        return
+
+    def stop_queue(self):
+        """
+        キューに残ったレコードを全て出力して、非同期の出力を終了します。
+        捨てたレコードがある場合は、その件数を警告します。
+
+        :rtype:                 int
+        :return:                捨てたレコード数
+        """
+
+        if self._queue is None:
+            return 0
+
+        if "." in __name__:
+            from . import queued
+        else:
+            import queued
+
+        handler, listener = self._queue
+        self._queue = None
+        atexit.unregister(self.stop_queue)
+        dropped = queued.stop(self, handler, listener)
+        if dropped:
+            self.warning("キューが一杯のため、%d 件のログを捨てました。", dropped)
+
+        return dropped
+
     def add_stdout_handler(self, dest=sys.stdout):
         """
         標準出力のハンドラを登録します。
@@ -196,6 +334,8 @@ class LogWriter(logging.Logger):
         :rtype:                 None
         """
 
+        import logging.handlers
+
         # 送信先を設定する。
         if not dest:
             path_list = ["/dev/log", "/var/run/syslog"]
@@ -223,6 +363,8 @@ class LogWriter(logging.Logger):
         :return:                追加したハンドラ
         """
 
+        import logging.handlers
+
         # 変数を初期化します。
         if sys.version_info >= (3, 0):
             encoding = sys.getdefaultencoding()
@@ -244,7 +386,7 @@ class LogWriter(logging.Logger):
         行番号付きでデバッグログを出力します。
 
         :param u message:       出力するテキスト
-        :param Traceback frame: 呼び出し元のフレーム
+        :param Frame frame:     呼び出し元のフレーム (Frame または inspect.Traceback)
         :rtype:                 None
         """
 
@@ -253,12 +395,15 @@ class LogWriter(logging.Logger):
 
         # 変数を初期化します。
         msg = message
-        if frame is None or not isinstance(frame, inspect.Traceback):
+        if frame is None or not hasattr(frame, "lineno"):
             frame = stack_frame(2)
 
         if frame is not None:
             path = frame.filename
-            file_base, _file_ext = os.path.splitext(os.path.basename(path))
+            file_base = _file_bases.get(path)
+            if file_base is None:
+                file_base = os.path.splitext(os.path.basename(path))[0]
+                _file_bases[path] = file_base
             msg = "%s (%05d) %s" % (file_base, frame.lineno, msg)
 
         # logging 出力を行う。
@@ -358,7 +503,7 @@ class LogWriter(logging.Logger):
 
             if args_txt != u"":
                 args_txt += u", "
-            args_txt += u"%s=%s" % (decode(key).text, decode(value).text)
+            args_txt += u"%s=%s" % (decode(key).text, decode(value, (self.name, key)).text)
 
         return args_txt
 
@@ -414,18 +559,29 @@ def getLogger(name=None, *args, **kwargs):
 def stack_frame(context=2):
     """
     スタックフレームを取得します。
+        必要な数のフレームだけを辿り、ソースコードは読み込みません。
+        (inspect.stack() は全てのフレームのソースを読み込むため、スタックが深いと遅くなる。)
 
-    :param int stackIndex:      スタック番号
-    :rtype:                     Taceback
-    :return:                    スタックの内容
+    :param int context:         スタック番号 (0 は stack_frame 自身)
+    :rtype:                     Frame
+    :return:                    スタックの内容 (無い場合は、None)
     """
-    stacks = inspect.stack()
-    if context >= len(stacks):
+
+    try:
+        framerecord = sys._getframe(context)
+    except ValueError:
         return None
+    except AttributeError:
+        # sys._getframe の無い実装
+        import inspect
+
+        stacks = inspect.stack(0)
+        if context >= len(stacks):
+            return None
+        framerecord = stacks[context][0]
 
-    callerframerecord = stacks[context]
-    framerecord = callerframerecord[0]
-    frameinfo = inspect.getframeinfo(framerecord)
+    code = framerecord.f_code
+    frameinfo = Frame(code.co_filename, framerecord.f_lineno, code.co_name, None, None)
 
     return frameinfo
 
@@ -461,6 +617,10 @@ def print_profile(command, max_ratio=1.0, filter_text=None):
     :rtype:                 None
     """
 
+    import cProfile
+    import io
+    import pstats
+
     # 変数を初期化します。
     logger = getLogger()
     prof = cProfile.Profile()
@@ -487,57 +647,185 @@ def print_profile(command, max_ratio=1.0, filter_text=None):
 
     return
 
-def decode(raw):
+class EncodingDetector(object):
+    """
+    データを少しずつ読み込んで、日本語のエンコーディングを判定します。
+        * UTF-8、EUC-JP、Shift_JIS は、文字として正しくないバイト列を見つけた時点で候補から外します。
+        * エスケープシーケンスを含む7ビットのデータは、ISO-2022-JP とします。
+        * 複数の候補が残った場合は、ENCODINGS の順で先のものを選びます。
+        * 候補が1つになった後のデータは調べません。
+    """
+
+    def __init__(self):
+        """
+        初期処理を行います。
+        """
+
+        self.utf_8 = codecs.getincrementaldecoder("utf_8")()
+        self.candidates = collections.OrderedDict((name, b"") for name in RE_JAPANESE)
+        self.has_8bit = False
+        self.has_escape = False
+        self.decided = None
+
+    def feed(self, data):
+        """
+        データを読み込む。
+        :param bytes data:      データ
+        :rtype:                 None
+        """
+
+        if not data:
+            return
+
+        if not self.has_8bit:
+            if data.isascii():
+                self.has_escape = self.has_escape or b"\x1b" in data
+                return
+            self.has_8bit = True
+
+        if self.decided is not None:
+            return
+
+        if self.utf_8 is not None:
+            try:
+                self.utf_8.decode(data)
+            except UnicodeDecodeError:
+                self.utf_8 = None
+
+        for name, tail in list(self.candidates.items()):
+            chars, prefix = RE_JAPANESE[name]
+            data_name = tail + data
+            rest = data_name[chars.match(data_name).end():]
+            if not rest:
+                self.candidates[name] = b""
+            elif prefix.fullmatch(rest):
+                # 文字の途中で区切られた場合は、次のデータに繋げる。
+                self.candidates[name] = rest
+            else:
+                del self.candidates[name]
+
+        names = list(self.candidates)
+        if self.utf_8 is not None:
+            names.insert(0, "utf_8")
+        if len(names) == 1:
+            self.decided = names[0]
+
+        return
+
+    def close(self, final=True):
+        """
+        判定したエンコーディングを取得する。
+        :param bool final:      False の場合は、文字の途中で終わっていても候補に残す。
+        :rtype:                 str
+        :return:                エンコーディング (判定できない場合は、None)
+        """
+
+        if not self.has_8bit:
+            return "iso2022jp" if self.has_escape else "utf_8"
+
+        if self.decided is not None:
+            return self.decided
+
+        if self.utf_8 is not None:
+            try:
+                self.utf_8.decode(b"", final=final)
+                return "utf_8"
+            except UnicodeDecodeError:
+                self.utf_8 = None
+
+        for name, tail in self.candidates.items():
+            if not tail or not final:
+                return name
+
+        return None
+
+def detect(raw):
+    """
+    日本語のエンコーディングを判定します。
+    最初の8ビットの文字から DETECT_WINDOW バイトだけを調べます。
+
+    :param b raw:           データ
+    :rtype:                 str
+    :return:                エンコーディング (判定できない場合は、None)
+    """
+
+    match = RE_8BIT.search(raw)
+    if match is None:
+        return "iso2022jp" if b"\x1b" in raw else "utf_8"
+
+    window = raw[match.start():match.start() + DETECT_WINDOW]
+    final = len(raw) <= match.start() + DETECT_WINDOW
+    try:
+        codecs.utf_8_decode(window, "strict", final)
+        return "utf_8"
+    except UnicodeDecodeError:
+        pass
+
+    for name, (chars, prefix) in RE_JAPANESE.items():
+        rest = window[chars.match(window).end():]
+        if not rest or (not final and prefix.fullmatch(rest)):
+            return name
+
+    return None
+
+def decode(raw, source=None):
     """
     ユニコードに変換します。
+    ASCII と UTF-8 を先に試し、それ以外はエンコーディングを判定してから変換します。
+    source を指定すると、判定したエンコーディングを記録し、次からは UTF-8 の次に試します。
 
     :param b raw:           データ
+    :param object source:   データの出所 (リポジトリのパス、ストリーム名など)
     :rtype:                 named tuple
     :return:                (text, encoding)
     """
 
-    # 変数を初期化します。
-    text = None
-    encoding_result = collections.namedtuple("result", "text encoding")
-    encodings = ['utf_8',
-                 'euc_jp',
-                 'euc_jis_2004',
-                 'euc_jisx0213',
-                'shift_jis',
-                'shift_jis_2004',
-                'shift_jisx0213',
-                'iso2022jp',
-                'iso2022_jp_1',
-                'iso2022_jp_2',
-                'iso2022_jp_3',
-                'iso2022_jp_ext', 'latin_1',
-                'cp923',
-                'cp437',
-                'ascii',
-                ]
-
-    if not hasattr(raw, "decode"):
-        result = encoding_result(raw, None)
-        return result
-
-    # 文字のエンコーディングを取得します。
-    if six.PY2:
-        if isinstance(raw, unicode):
-            return encoding_result(raw, None)
-    else:
-        if isinstance(raw, str):
-            raw = raw.encode("cp437")
+    if not isinstance(raw, (bytes, bytearray)):
+        # テキストやバイト列以外は、そのまま返します。
+        return Decoded(raw, None)
+
+    if raw.isascii() and b"\x1b" not in raw:
+        return Decoded(raw.decode("ascii"), "utf_8")
 
-    for encoding in encodings:
+    # UTF-8 (エスケープシーケンスを含む7ビットの場合は ISO-2022-JP) を先に試します。
+    encoding = detect(raw) if raw.isascii() else "utf_8"
+    if encoding is not None:
         try:
-            text = raw.decode(encoding)
-            break
-        except Exception as _ex:
+            return Decoded(raw.decode(encoding), encoding)
+        except UnicodeDecodeError:
+            pass
+
+    # UTF-8 以外は、ソース毎に記録したエンコーディングを試します。
+    encoding = _encodings.get(source) if source is not None else None
+    if encoding is not None:
+        try:
+            return Decoded(raw.decode(encoding), encoding)
+        except UnicodeDecodeError:
             pass
 
-    result = encoding_result(text, encoding)
+    # 判定したエンコーディングで変換できた場合は、ソース毎に記録します。
+    encoding = detect(raw)
+    if encoding is not None:
+        try:
+            text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+        else:
+            if source is not None:
+                if len(_encodings) >= MEMO_SIZE:
+                    _encodings.clear()
+                _encodings[source] = encoding
+            return Decoded(text, encoding)
+
+    # 変換できない場合は、ENCODINGS の順に試します。
+    # (latin_1 などは何でも変換できるため、記録しません。)
+    for encoding in ENCODINGS:
+        try:
+            return Decoded(raw.decode(encoding), encoding)
+        except UnicodeDecodeError:
+            pass
 
-    return result
+    return Decoded(None, None)
 
 def basename(path):
     """
@@ -577,117 +865,3 @@ def parse_second(second, *args, **kwargs):
     result["seconds"] = time_sec
  
     return result
-
-class TestLogWriter(unittest.TestCase):
-    """
-    テストケース
-    """
-
-    filename = "LogWriter.log"
-    logger_conf = {
-        "name": os.path.splitext("TestLogWriter"),
-        "level": logging.DEBUG,
-        }
-    logger = None
-
-    def setUp(self):
-
-        # 変数を初期化します。
-        self.logger = LogWriter(**self.logger_conf)
-
-    def tearDown(self):
-        self.logger = None
-
-    def test_debug(self):
-        sys.stdout.write(os.linesep)
-
-        result = self.logger.debug("デバッグ")
-        self.assertEqual(result, None)
-
-    def test_debug_anchor_start(self):
-        sys.stdout.write(os.linesep)
-
-        # 変数を初期化します。
-        arg = "test"
-
-        result = self.logger.debug_anchor_begin(arg=arg)
-        self.assertEqual(result, None)
-
-    def test_debug_anchor_end(self):
-        sys.stdout.write(os.linesep)
-
-        result = self.logger.debug_anchor_end()
-        self.assertEqual(result, None)
-
-@obsolete
-def test_dummy(*args, **kwargs):
-    return 0
-
-class Test(unittest.TestCase):
-    """
-    テストケース
-    """
-
-    logger_conf = {
-        "name": os.path.splitext(os.path.basename(__file__))[0],
-        "level": logging.DEBUG,
-        }
-
-    def setUp(self):
-
-        # 変数を初期化します。
-        global logger
-        logger = LogWriter(**self.logger_conf)
-
-    def tearDown(self):
-        self.logger = None
-
-    def test_getLogger(self):
-        sys.stdout.write(os.linesep)
-        logger = LogWriter(__file__)
-
-        result = getLogger()
-        self.assertTrue(isinstance(result, LogWriter))
-
-        result = getLogger(__file__)
-        self.assertEqual(result.name, __file__)
-
-    def test_obsolete(self):
-        sys.stdout.write(os.linesep)
-
-        result = test_dummy()
-        self.assertEqual(result, 0)
-
-    def test_decode(self):
-        sys.stdout.write(os.linesep)
-
-        result = decode(b"\xE2\x98\x85")
-        self.assertEqual(result.text, u"★")
- 
-def test(*args, **kwargs):
-    """
-    test entry point
-    """
-    # 単体テストを実行します。
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestLogWriter)
-    unittest.TextTestRunner(verbosity=2).run(suite)
-
-    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
-    unittest.TextTestRunner(verbosity=2).run(suite)
-
-    return 0
-
-if __name__ == "__main__":
-    """
-    self entry point
-    """
-
-    # logger for test
-    _logger = logging.getLogger(__name__)
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.DEBUG)
-    handler.setFormatter(logging.Formatter("%(asctime)s\t%(name)s\t%(levelname)s\t%(message)s"))
-    _logger.setLevel(logging.DEBUG)
-    _logger.addHandler(handler)
-
-    sys.exit(test())
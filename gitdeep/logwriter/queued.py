@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ログの出力をキューに入れて、バックグラウンドのスレッドで行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import logging.handlers
+import queue
+import threading
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キューの既定の容量 (レコード数)
+QUEUE_SIZE = 10000
+
+# キューが一杯の場合の処理
+#   block:          空くまで待つ。(ログは失われないが、呼び出し元が止まる。)
+#   drop:           新しいレコードを捨てる。
+#   drop_oldest:    最も古いレコードを捨てて、新しいレコードを入れる。
+OVERFLOW_POLICIES = ("block", "drop", "drop_oldest")
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    容量を超えた場合の処理を指定できる QueueHandler
+    """
+
+    def __init__(self, records, overflow="drop"):
+        """
+        初期処理を行います。
+
+        :param Queue records:   キュー
+        :param str overflow:    キューが一杯の場合の処理 (OVERFLOW_POLICIES)
+        """
+
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("overflow must be one of %s: %r" % (", ".join(OVERFLOW_POLICIES), overflow))
+
+        logging.handlers.QueueHandler.__init__(self, records)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        """
+        レコードをキューに入れる。
+        :param LogRecord record:    レコード
+        :rtype:                     None
+        """
+
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+
+        with self._dropped_lock:
+            self.dropped += 1
+
+        return
+
+class QueueListener(logging.handlers.QueueListener):
+    """
+    終了時に、キューが一杯でも全てのレコードを出力してから終了する QueueListener
+    """
+
+    def enqueue_sentinel(self):
+        """
+        終了の印をキューに入れる。
+            (既定の put_nowait は、キューが一杯の場合に失敗する。)
+        :rtype:                     None
+        """
+
+        self.queue.put(self._sentinel)
+
+        return
+
+    def add_handler(self, handler):
+        """
+        出力先のハンドラを追加する。
+        :param Handler handler:     ハンドラ
+        :rtype:                     None
+        """
+
+        # タプルの置き換えは不可分のため、出力中のスレッドはロックしない。
+        self.handlers = self.handlers + (handler,)
+
+        return
+
+def start(logger, size=QUEUE_SIZE, overflow="drop"):
+    """
+    ロガーのハンドラを、キューとバックグラウンドのスレッドの後ろに移す。
+    :param Logger logger:   ロガー
+    :param int size:        キューの容量
+    :param str overflow:    キューが一杯の場合の処理
+    :rtype:                 tuple
+    :return:                (QueueHandler, QueueListener)
+    """
+
+    records = queue.Queue(size)
+    handler = QueueHandler(records, overflow)
+    listener = QueueListener(records, *logger.handlers, respect_handler_level=True)
+
+    for target in listener.handlers:
+        logging.Logger.removeHandler(logger, target)
+    logging.Logger.addHandler(logger, handler)
+    listener.start()
+
+    return (handler, listener)
+
+def stop(logger, handler, listener):
+    """
+    キューのレコードを全て出力して、ハンドラをロガーに戻す。
+    :param Logger logger:           ロガー
+    :param QueueHandler handler:    start() で追加したハンドラ
+    :param QueueListener listener:  start() で開始したリスナー
+    :rtype:                         int
+    :return:                        捨てたレコード数
+    """
+
+    # 先にハンドラを戻して、停止中のレコードも失われないようにする。
+    logging.Logger.removeHandler(logger, handler)
+    for target in listener.handlers:
+        logging.Logger.addHandler(logger, target)
+    listener.stop()
+    for target in listener.handlers:
+        target.flush()
+
+    return handler.dropped
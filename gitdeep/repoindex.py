@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+探索したリポジトリを、キャッシュディレクトリに保存します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import time
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import discovery
+    from . import tracer
+else:
+    import cachedir
+    import discovery
+    import tracer
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# インデックスの形式のバージョン
+INDEX_VERSION = 1
+
+# 探索した時刻との差がこれより小さい更新日時は、次回も探索し直す (ns)
+RACY_NS = 2 * 1000 * 1000 * 1000
+
+class RepoIndex(object):
+    """
+    リポジトリのインデックス
+        * 探索したディレクトリ毎に、更新日時、サブディレクトリ、.git の有無を保存します。
+        * 更新日時が変わっていないディレクトリは、一覧を取得せずに保存した内容を使用します。
+        * 更新日時が変わったディレクトリだけを、探索し直します。
+    """
+
+    def __init__(self, path_search=".", max_depth=None, skip_dirs=discovery.SKIP_DIRS):
+        """
+        初期処理を行います。
+
+        :param str path_search: パス名
+        :param int max_depth:   探索する深さ (None の場合は、制限なし)
+        :param set skip_dirs:   探索しないディレクトリ名
+        """
+
+        self.path_search = path_search
+        self.max_depth = max_depth
+        self.skip_dirs = frozenset(skip_dirs)
+        self.root = os.path.realpath(path_search)
+        self.path = os.path.join(cachedir.get_cache_dir("index"),
+                                 cachedir.get_key(self.root) + ".json")
+        self.dirs = {}
+        self.changed = False
+
+    @property
+    def options(self):
+        return {"max_depth": self.max_depth, "skip_dirs": sorted(self.skip_dirs)}
+
+    def load(self):
+        """
+        インデックスを読み込む。
+            形式や探索の条件が異なる場合は、空にする。
+        :rtype:                 None
+        """
+
+        data = cachedir.load_json(self.path, {})
+        if (data.get("version") == INDEX_VERSION and data.get("root") == self.root
+                and data.get("options") == self.options):
+            self.dirs = data.get("dirs", {})
+        else:
+            self.dirs = {}
+
+        return
+
+    def save(self):
+        """
+        インデックスを保存する。
+        :rtype:                 None
+        """
+
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "options": self.options,
+            "dirs": self.dirs,
+        }
+        cachedir.save_json(self.path, data)
+        self.changed = False
+
+        return
+
+    def update(self):
+        """
+        インデックスを更新し、.git ディレクトリを取得する。
+        :rtype:                 list
+        :return:                名前順の .git ディレクトリのリスト
+        """
+
+        results = list(self.iter_update())
+        results.sort()
+
+        return results
+
+    def iter_update(self):
+        """
+        インデックスを更新しながら、見つけた .git ディレクトリを返す。
+            名前順の深さ優先で探索した順に返す。
+            削除されたディレクトリは、全て返した後に取り除く (途中で止めた場合は、更新しない)。
+        :rtype:                 generator
+        :return:                .git ディレクトリ
+        """
+
+        dirs = {}
+        stack = [(os.curdir, 0)]
+        time_racy = time.time_ns() - RACY_NS
+
+        while stack:
+            rel, depth = stack.pop()
+            path = self.path_search if rel == os.curdir else os.path.join(self.path_search, rel)
+
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self.changed = True
+                continue
+
+            # 更新日時が変わったディレクトリだけを探索する。
+            entry = self.dirs.get(rel)
+            if entry is None or entry[0] != mtime:
+                try:
+                    subdirs, has_git = discovery.scan(path, self.skip_dirs)
+                except OSError:
+                    self.changed = True
+                    continue
+                # 探索中に更新された可能性がある場合は、次回も探索し直す。
+                if mtime >= time_racy:
+                    mtime = -1
+                entry = [mtime, subdirs, has_git]
+                self.changed = True
+
+            dirs[rel] = entry
+            _mtime, subdirs, has_git = entry
+
+            if has_git:
+                yield os.path.join(path, discovery.GIT_DIR)
+
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+
+            for name in reversed(subdirs):
+                stack.append((name if rel == os.curdir else os.path.join(rel, name), depth + 1))
+
+        # 削除されたディレクトリを取り除く。
+        if len(dirs) != len(self.dirs):
+            self.changed = True
+        self.dirs = dirs
+
+def find_repos(path_search=".", max_depth=None, skip_dirs=discovery.SKIP_DIRS, rescan=False):
+    """
+    インデックスを使用して、パス以下の .git ディレクトリを取得する。
+        名前順にソートする。
+    :param str path_search: パス名
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param set skip_dirs:   探索しないディレクトリ名
+    :param bool rescan:     インデックスを使用せずに、全て探索し直す。
+    :rtype:                 list
+    :return:                .git ディレクトリのリスト
+    """
+
+    index = RepoIndex(path_search, max_depth, skip_dirs)
+    if not rescan:
+        with tracer.span("index.load", "discovery"):
+            index.load()
+
+    with tracer.span("index.update", "discovery"):
+        results = index.update()
+
+    if index.changed:
+        try:
+            with tracer.span("index.save", "discovery"):
+                index.save()
+        except OSError:
+            pass
+
+    return results
+
+def iter_repos(path_search=".", max_depth=None, skip_dirs=discovery.SKIP_DIRS, rescan=False):
+    """
+    インデックスを使用して、パス以下の .git ディレクトリを見つけた順に返す。
+        探索し終えた時に、インデックスを保存する。
+    :param str path_search: パス名
+    :param int max_depth:   探索する深さ (None の場合は、制限なし)
+    :param set skip_dirs:   探索しないディレクトリ名
+    :param bool rescan:     インデックスを使用せずに、全て探索し直す。
+    :rtype:                 generator
+    :return:                .git ディレクトリ
+    """
+
+    # 実行と並行するため、探索は専用のレーンに記録する。
+    with tracer.span("discovery", "phase", lane="discovery"):
+        index = RepoIndex(path_search, max_depth, skip_dirs)
+        if not rescan:
+            with tracer.span("index.load", "discovery", lane="discovery"):
+                index.load()
+
+        dnames = index.iter_update()
+        while True:
+            # 探索している区間だけを計測する (見つけたリポジトリを渡している間は含めない)。
+            with tracer.span("index.update", "discovery", lane="discovery"):
+                dname = next(dnames, None)
+            if dname is None:
+                break
+            yield dname
+
+        if index.changed:
+            try:
+                with tracer.span("index.save", "discovery", lane="discovery"):
+                    index.save()
+            except OSError:
+                pass
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+読み取りだけのコマンドの結果を、リポジトリの状態と共にキャッシュします。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import re
+import struct
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import dirty
+    from . import fetchsched
+    from . import gitindex
+    from . import snapshot
+else:
+    import cachedir
+    import dirty
+    import fetchsched
+    import gitindex
+    import snapshot
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キャッシュの形式のバージョン
+CACHE_VERSION = 1
+
+# キャッシュの上限 (エントリ数、バイト数)
+MAX_ENTRIES = 4096
+MAX_BYTES = 64 * 1024 * 1024
+
+# キャッシュするコマンドと、作業ツリーの変更を確認するか
+COMMANDS = {
+    "status": True,
+    "diff": True,
+    "describe": True,
+    "ls-files": True,
+    "log": False,
+    "shortlog": False,
+    "branch": False,
+    "tag": False,
+    "remote": False,
+    "rev-parse": False,
+    "show-ref": False,
+}
+
+# 一覧を表示するオプションだけの場合にキャッシュするコマンド (引数は、ブランチの作成などになる)
+LIST_OPTIONS = {
+    "branch": frozenset(["-v", "-vv", "--verbose", "-a", "--all", "-r", "--remotes",
+                         "-l", "--list", "--merged", "--no-merged", "--contains", "--no-contains",
+                         "--points-at", "--sort", "--format", "--show-current",
+                         "--color", "--no-color", "--column", "--no-column", "--abbrev", "--no-abbrev"]),
+    "tag": frozenset(["-l", "--list", "-n", "--sort", "--format", "--merged", "--no-merged",
+                      "--contains", "--no-contains", "--points-at", "--color", "--no-color",
+                      "--column", "--no-column"]),
+    "remote": frozenset(["-v", "--verbose"]),
+}
+
+# キャッシュしないオプション (ファイルに書き込む、リポジトリの外を読む)
+UNSAFE_OPTIONS = ("--output", "--no-index")
+
+# 現在の時刻によって結果が変わるオプション
+TIME_OPTIONS = ("--since", "--until", "--after", "--before", "--max-age", "--min-age",
+                "--since-as-filter", "--relative-date")
+
+# 現在の時刻からの相対的な日時 (--date=relative, --format=%ar, %(committerdate:relative) など)
+RE_RELATIVE_DATE = re.compile(r"^(?:--date=)?(?:relative|human|auto:human)$|%[ac][rh]|:relative\)")
+
+def is_cacheable(cmd, args):
+    """
+    結果をキャッシュできるコマンドかを判定する。
+    :param str cmd:         コマンド
+    :param list args:       引数
+    :rtype:                 bool
+    :return:                キャッシュできる場合は True
+    """
+
+    if cmd not in COMMANDS:
+        return False
+
+    for arg in args:
+        name = arg.split("=", 1)[0]
+        if name in UNSAFE_OPTIONS or name in TIME_OPTIONS or RE_RELATIVE_DATE.search(arg):
+            return False
+        # -n5 などの値を続けた短いオプションは、先頭の2文字で判定する。
+        if cmd in LIST_OPTIONS and name not in LIST_OPTIONS[cmd] and name[:2] not in LIST_OPTIONS[cmd]:
+            return False
+
+    return True
+
+class ResultCache(object):
+    """
+    コマンドの結果のキャッシュ
+        * リポジトリ、コマンド、引数毎に、成功した結果と実行後のリポジトリの状態を1ファイルに保存します。
+        * 状態は HEAD、refs、packed-refs、index、config、作業ツリーの最上位の更新日時です。
+        * status などは、index に記録された stat と作業ツリーも比較します (dirty と同じ判定)。
+        * 上限を超えた場合は、最後に使用した日時の古いものから削除します。
+    """
+
+    def __init__(self, cmd, args=(), max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """
+        初期処理を行います。
+
+        :param str cmd:         コマンド
+        :param list args:       引数
+        :param int max_entries: エントリ数の上限
+        :param int max_bytes:   バイト数の上限
+        """
+
+        self.cmd = cmd
+        self.args = list(args)
+        self.worktree = COMMANDS.get(cmd, True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dir = cachedir.get_cache_dir("results")
+        self.hits = 0
+        self.stored = 0
+
+    def get_path(self, path_base):
+        """
+        エントリのファイルのパスを取得する。
+        :param str path_base:   リポジトリのパス
+        :rtype:                 str
+        :return:                ファイルのパス
+        """
+
+        return os.path.join(self.dir, cachedir.get_key(path_base, self.cmd, *self.args) + ".json")
+
+    def get(self, path_base):
+        """
+        状態が変わっていなければ、キャッシュした結果を取得する。
+        :param str path_base:   リポジトリのパス
+        :rtype:                 tuple
+        :return:                (戻り値, 出力) (無い場合は、None)
+        """
+
+        path = self.get_path(path_base)
+        entry = cachedir.load_json(path)
+        if not entry or entry.get("version") != CACHE_VERSION:
+            return None
+
+        if entry["state"] != get_state(path_base):
+            return None
+
+        if self.worktree:
+            path_git = fetchsched.get_git_dir(path_base)
+            try:
+                index = gitindex.read_index(path_git)
+            except (gitindex.InvalidIndex, OSError, struct.error):
+                return None
+            if index.extensions & gitindex.EXTENSIONS_UNSUPPORTED:
+                return None
+            if dirty.check_worktree(path_base, index, entry["time"], entry["state"][1]) != dirty.CLEAN:
+                return None
+
+        # 最後に使用した日時を、削除する順に使用する。
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+
+        return (entry["returncode"], entry["output"])
+
+    def put(self, path_base, ret, txt, time_start):
+        """
+        結果を保存する。
+            失敗した結果と、実行中や直前に状態が変わった場合は保存しない。
+        :param str path_base:   リポジトリのパス
+        :param int ret:         戻り値
+        :param str txt:         出力
+        :param int time_start:  実行を開始した時刻 (ns)
+        :rtype:                 None
+        """
+
+        if ret != 0:
+            return
+
+        state = get_state(path_base)
+        time_verified = time_start - dirty.CLOCK_SLACK_NS
+        if max(state) >= time_start - snapshot.RACY_NS:
+            return
+
+        entry = {
+            "version": CACHE_VERSION,
+            "state": state,
+            "time": time_verified,
+            "returncode": ret,
+            "output": txt,
+        }
+        try:
+            cachedir.save_json(self.get_path(path_base), entry)
+        except OSError:
+            return
+        self.stored += 1
+
+        return
+
+    def evict(self):
+        """
+        上限を超えた場合は、最後に使用した日時の古いエントリから削除する。
+        :rtype:                 None
+        """
+
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.dir) as it:
+                for item in it:
+                    if not item.name.endswith(".json"):
+                        continue
+                    try:
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, item.path))
+                    total += st.st_size
+        except OSError:
+            return
+
+        entries.sort()
+        count = len(entries)
+        for _mtime, size, path in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            count -= 1
+            total -= size
+
+        return
+
+    def close(self):
+        """
+        保存した場合は、上限を超えたエントリを削除する。
+        :rtype:                 None
+        """
+
+        if self.stored:
+            self.evict()
+
+        return
+
+def get_state(path_base):
+    """
+    リポジトリの状態を取得する。
+    :param str path_base:   リポジトリのパス
+    :rtype:                 list
+    :return:                [作業ツリー, index, HEAD, packed-refs, refs, config] の更新日時 (ns)
+    """
+
+    state = snapshot.get_fingerprint(path_base)
+    state.append(snapshot.get_mtime(os.path.join(fetchsched.get_git_dir(path_base), "config")))
+
+    return state
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+リポジトリの更新日時を保存し、前回から変更の無いリポジトリを判定します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import time
+
+# Local module
+if "." in __name__:
+    from . import cachedir
+    from . import fetchsched
+else:
+    import cachedir
+    import fetchsched
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# キャッシュの形式のバージョン
+CACHE_VERSION = 1
+
+# 記録した時刻との差がこれより小さい更新日時は、次回も変更ありとする (ns)
+RACY_NS = 2 * 1000 * 1000 * 1000
+
+# 更新日時を取得する .git のファイル
+GIT_FILES = ("index", "HEAD")
+
+class Snapshots(object):
+    """
+    コマンドを実行した時のリポジトリの更新日時
+        * .git/index、HEAD、packed-refs、refs 以下のディレクトリ、作業ツリーの最上位の更新日時を記録します。
+        * コマンドと引数毎に、成功したリポジトリだけを記録します。
+        * 記録した更新日時と同じリポジトリは、変更が無いとします。
+          (作業ツリーのサブディレクトリのファイルの変更や、既存のファイルの内容の変更は検出しません。)
+    """
+
+    def __init__(self, root, cmd, args=()):
+        """
+        初期処理を行います。
+
+        :param str root:        探索したパス
+        :param str cmd:         コマンド
+        :param list args:       引数
+        """
+
+        self.path = os.path.join(cachedir.get_cache_dir("snapshot"),
+                                 cachedir.get_key(os.path.realpath(root), cmd, *args) + ".json")
+        self.entries = {}
+        self.changed = False
+
+        data = cachedir.load_json(self.path, {})
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("repos", {})
+
+    def filter(self, paths):
+        """
+        前回から変更のあるリポジトリを取得する。
+        :param list paths:      リポジトリのパス
+        :rtype:                 list
+        :return:                pathsの順の変更のあるリポジトリのパス
+        """
+
+        return [path_base for path_base in paths if self.is_changed(path_base)]
+
+    def is_changed(self, path_base):
+        """
+        前回から変更のあるリポジトリかを判定する。
+        :param str path_base:   リポジトリのパス
+        :rtype:                 bool
+        :return:                記録が無いか、更新日時が異なる場合は True
+        """
+
+        entry = self.entries.get(path_base)
+
+        return entry is None or entry != get_fingerprint(path_base)
+
+    def update(self, paths):
+        """
+        リポジトリの現在の更新日時を記録する。
+            記録した時刻に近い更新日時を含む場合は、次回も変更ありとする。
+        :param list paths:      コマンドが成功したリポジトリのパス
+        :rtype:                 None
+        """
+
+        time_racy = time.time_ns() - RACY_NS
+        for path_base in paths:
+            fingerprint = get_fingerprint(path_base)
+            if max(fingerprint) >= time_racy:
+                self.entries.pop(path_base, None)
+            else:
+                self.entries[path_base] = fingerprint
+            self.changed = True
+
+        return
+
+    def save(self):
+        """
+        キャッシュを保存する。
+        :rtype:                 None
+        """
+
+        if not self.changed:
+            return
+
+        data = {"version": CACHE_VERSION, "repos": self.entries}
+        try:
+            cachedir.save_json(self.path, data)
+        except OSError:
+            pass
+        self.changed = False
+
+        return
+
+def get_fingerprint(path_base):
+    """
+    リポジトリの更新日時を取得する。
+    :param str path_base:   リポジトリのパス
+    :rtype:                 list
+    :return:                [作業ツリー, index, HEAD, packed-refs, refs] の更新日時 (ns、無い場合は0)
+    """
+
+    path_git = fetchsched.get_git_dir(path_base)
+    results = [get_mtime(path_base)]
+    for name in GIT_FILES:
+        results.append(get_mtime(os.path.join(path_git, name)))
+
+    # 作業ツリーを追加したリポジトリ (git worktree) の refs は、共通のディレクトリにある。
+    path_common = path_git
+    try:
+        with open(os.path.join(path_git, "commondir"), "rb") as f:
+            path_common = os.path.join(path_git, f.read().decode("utf-8", "surrogateescape").strip())
+    except OSError:
+        pass
+    results.append(get_mtime(os.path.join(path_common, "packed-refs")))
+
+    # ブランチやタグの更新は、refs 以下のディレクトリの更新日時に現れる。
+    mtime_refs = 0
+    stack = [os.path.join(path_common, "refs")]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime_refs = max(mtime_refs, os.stat(path).st_mtime_ns)
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+    results.append(mtime_refs)
+
+    return results
+
+def get_mtime(path):
+    """
+    更新日時を取得する。
+    :param str path:        パス
+    :rtype:                 int
+    :return:                更新日時 (ns、無い場合は0)
+    """
+
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
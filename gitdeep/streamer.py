@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+複数のリポジトリのコマンド出力を、到着順に行単位で表示します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import asyncio
+import os
+import shlex
+import sys
+import time
+
+# Local module
+if "." in __name__:
+    from . import executor
+    from . import tracer
+else:
+    import executor
+    import tracer
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# パイプから一度に読み込むバイト数
+CHUNK_SIZE = 64 * 1024
+
+class Streamer(object):
+    """
+    asyncio のイベントループで、複数のプロセスを実行します。
+        * 標準出力と標準エラー出力は、行毎にリポジトリ名を付けて表示します。
+        * 1つのスレッドで多数のパイプを扱います。
+    """
+
+    def __init__(self, jobs=None, stdout=None, stderr=None, per_key=None, timeout=None):
+        """
+        初期処理を行います。
+
+        :param int jobs:        同時に実行するプロセス数 (None の場合は、制限なし)
+        :param int per_key:     キー毎に同時に実行するプロセス数
+        :param float timeout:   プロセス毎のタイムアウト (秒)
+        :param file stdout:     標準出力の出力先
+        :param file stderr:     標準エラー出力の出力先
+        """
+
+        self.jobs = jobs
+        self.per_key = per_key
+        self.timeout = timeout
+        self.durations = []
+        self.timed_out = []
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+        self.cancelled = False
+        self._procs = set()
+        self._lanes = []
+
+    def run(self, tasks):
+        """
+        コマンドを実行する。
+            tasks がジェネレーターの場合は、受け取ったものから実行を始める。
+        :param iterable tasks:  (名前, 引数リスト, 同時に実行するプロセス数を制限するキーのリスト) のリスト
+                                (キーは省略できる)
+        :rtype:                 list
+        :return:                tasksの順の戻り値
+        """
+
+        set_child_watcher()
+
+        try:
+            return asyncio.run(self._run_all(tasks))
+
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+
+    def cancel(self):
+        """
+        実行中のプロセスを終了する。
+        :rtype:                 None
+        """
+
+        for proc in list(self._procs):
+            executor.kill(proc, group=self.timeout is not None)
+
+        return
+
+    async def _run_all(self, tasks):
+        """
+        全てのコマンドを実行する。
+            tasks は別のスレッドで1つずつ取り出し、探索中も出力の表示を止めない。
+        """
+
+        if self.jobs:
+            sem = asyncio.Semaphore(self.jobs)
+        else:
+            sem = None
+
+        # キー毎のセマフォ
+        sems_key = {}
+        loop = asyncio.get_running_loop()
+        tasks = iter(tasks)
+        jobs = []
+        self.durations = []
+        self.timed_out = []
+
+        try:
+            while not self.cancelled:
+                task = await loop.run_in_executor(None, next, tasks, None)
+                if task is None:
+                    break
+
+                name, cmd = task[:2]
+                task_keys = task[2] if len(task) > 2 and self.per_key else ()
+                for key in task_keys:
+                    sems_key.setdefault(key, asyncio.Semaphore(self.per_key))
+
+                self.durations.append(None)
+                self.timed_out.append(False)
+                jobs.append(asyncio.ensure_future(self._run_one(
+                    sem, len(jobs), name, cmd, [sems_key[key] for key in sorted(set(task_keys))])))
+
+            if jobs:
+                await asyncio.wait(jobs)
+
+        except asyncio.CancelledError:
+            # 中断時は、プロセスグループを終了してから、パイプを読み終えるまで待つ。
+            self.cancelled = True
+            self.cancel()
+            if jobs:
+                await asyncio.wait(jobs)
+            raise
+
+        # 全ての例外を取得してから、最初の例外を送出する。
+        errors = [job.exception() for job in jobs if job.exception() is not None]
+        if errors:
+            raise errors[0]
+
+        return [job.result() for job in jobs]
+
+    async def _run_one(self, sem, index, name, cmd, sems_key=()):
+        """
+        コマンドを1つ実行する。
+            キーのセマフォを先に獲得し、全体のセマフォを待つ間に他のキーのコマンドを止めない。
+        """
+
+        if sems_key:
+            async with sems_key[0]:
+                return await self._run_one(sem, index, name, cmd, sems_key[1:])
+
+        if sem is not None:
+            async with sem:
+                return await self._exec(index, name, cmd)
+
+        return await self._exec(index, name, cmd)
+
+    async def _exec(self, index, name, argv):
+        """
+        プロセスを起動し、出力を表示する。
+            シェルを介さずに、posix_spawn を使用できる引数で起動する。
+            タイムアウトを指定した場合は、プロセスグループを分けて起動し、
+            タイムアウトしたらグループ毎に終了して RETURNCODE_TIMEOUT を返し、timed_out に記録する。
+        """
+
+        if self.cancelled:
+            return None
+
+        # 空いているレーンのうち、番号の最も小さいものを使う。
+        lane = 0
+        while lane in self._lanes:
+            lane += 1
+        self._lanes.append(lane)
+
+        try:
+            with tracer.span("repo", "repo", lane="live-%d" % lane, repo=name):
+                return await self._exec_one(index, name, argv)
+        finally:
+            self._lanes.remove(lane)
+
+    async def _exec_one(self, index, name, argv):
+        """
+        プロセスを起動し、出力を表示する。
+        """
+
+        prefix = "[%s] " % name
+        self._write(self.stdout, prefix, "$ %s" % " ".join(shlex.quote(arg) for arg in argv))
+
+        time_start = time.monotonic()
+        proc = await asyncio.create_subprocess_exec(
+            *argv, executable=executor.which(argv[0]), stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            close_fds=False, start_new_session=self.timeout is not None)
+        self._procs.add(proc)
+
+        try:
+            ret = await asyncio.wait_for(self._communicate(proc, prefix), self.timeout)
+
+        except asyncio.TimeoutError:
+            executor.kill(proc, group=True)
+            await proc.wait()
+            self._write(self.stderr, prefix, "タイムアウトしました。(%s 秒)" % self.timeout)
+            ret = executor.RETURNCODE_TIMEOUT
+            self.timed_out[index] = True
+
+        finally:
+            self._procs.discard(proc)
+            self.durations[index] = time.monotonic() - time_start
+
+        return ret
+
+    async def _communicate(self, proc, prefix):
+        """
+        出力を表示し、プロセスの終了を待つ。
+        """
+
+        await asyncio.gather(
+            self._pump(proc.stdout, self.stdout, prefix),
+            self._pump(proc.stderr, self.stderr, prefix))
+
+        return await proc.wait()
+
+    async def _pump(self, reader, stream, prefix):
+        """
+        パイプから読み込んだ出力を行単位で表示する。
+        """
+
+        rest = b""
+        while True:
+            chunk = await reader.read(CHUNK_SIZE)
+            if not chunk:
+                break
+
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                self._write(stream, prefix, line.decode("utf-8", "replace").rstrip("\r"))
+
+        if rest:
+            self._write(stream, prefix, rest.decode("utf-8", "replace").rstrip("\r"))
+
+        return
+
+    @staticmethod
+    def _write(stream, prefix, line):
+        """
+        1行を表示する。
+        """
+
+        stream.write(prefix + line + os.linesep)
+        stream.flush()
+
+        return
+
+def set_child_watcher():
+    """
+    子プロセスの終了を pidfd で監視する。
+        Python 3.12 より前の既定の監視方法は、子プロセス毎にスレッドを作成するため、
+        pidfd が使える場合はそちらを使用する。
+    :rtype:                 None
+    """
+
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return
+
+    asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
+
+    return
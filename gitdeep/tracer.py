@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+処理の時間を計測し、Chrome のトレースイベント形式で保存します。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 計測していない場合の span
+_NULL_SPAN = contextlib.nullcontext()
+
+# 計測中の Tracer
+_tracer = None
+
+class Tracer(object):
+    """
+    処理の時間を計測します。
+        * 計測した区間は、Complete イベント (ph: X) として記録します。
+        * スレッド毎にレーン (tid) を割り当て、ワーカーの実行状況を表示できるようにします。
+        * asyncio のように1つのスレッドで並行に実行する場合は、レーンの名前を指定します。
+    """
+
+    def __init__(self):
+        """
+        初期処理を行います。
+        """
+
+        self.pid = os.getpid()
+        self.events = []
+        self._time_origin = time.perf_counter_ns()
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def now(self):
+        """
+        計測開始からの時間を取得する。
+        :rtype:                 float
+        :return:                時間 (マイクロ秒)
+        """
+
+        return (time.perf_counter_ns() - self._time_origin) / 1000.0
+
+    def get_lane(self, lane=None):
+        """
+        レーンの番号を取得する。
+        :param str lane:        レーンの名前 (None の場合は、スレッド名)
+        :rtype:                 int
+        :return:                レーンの番号 (tid)
+        """
+
+        if lane is None:
+            thread = threading.current_thread()
+            key = ("thread", thread.ident)
+            name = "main" if thread is threading.main_thread() else thread.name
+        else:
+            key = ("lane", lane)
+            name = lane
+
+        tid = self._lanes.get(key)
+        if tid is None:
+            with self._lock:
+                tid = self._lanes.get(key)
+                if tid is None:
+                    tid = len(self._lanes) + 1
+                    self._lanes[key] = tid
+                    self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid,
+                                        "tid": tid, "args": {"name": name}})
+                    self.events.append({"name": "thread_sort_index", "ph": "M", "pid": self.pid,
+                                        "tid": tid, "args": {"sort_index": tid}})
+
+        return tid
+
+    @contextlib.contextmanager
+    def span(self, name, cat="", lane=None, **args):
+        """
+        区間の時間を計測する。
+        :param str name:        名前
+        :param str cat:         分類 (phase, repo, process など)
+        :param str lane:        レーンの名前 (None の場合は、スレッド毎)
+        :param dict args:       イベントに付ける値
+        :rtype:                 contextmanager
+        """
+
+        tid = self.get_lane(lane)
+        time_start = self.now()
+        try:
+            yield
+        finally:
+            event = {"name": name, "cat": cat, "ph": "X", "ts": time_start,
+                     "dur": self.now() - time_start, "pid": self.pid, "tid": tid}
+            if args:
+                event["args"] = args
+            # list.append はスレッドセーフ
+            self.events.append(event)
+
+    def save(self, path):
+        """
+        トレースイベントのJSONを保存する。
+        :param str path:        パス
+        :rtype:                 None
+        """
+
+        data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+        return
+
+def start():
+    """
+    計測を開始する。
+    :rtype:                 Tracer
+    :return:                計測中の Tracer
+    """
+
+    global _tracer
+    _tracer = Tracer()
+
+    return _tracer
+
+def stop(path=None):
+    """
+    計測を終了し、トレースイベントのJSONを保存する。
+    :param str path:        パス (None の場合は、保存しない)
+    :rtype:                 Tracer
+    :return:                計測した Tracer (計測していない場合は、None)
+    """
+
+    global _tracer
+    tracer, _tracer = _tracer, None
+
+    if tracer is not None and path:
+        tracer.save(path)
+
+    return tracer
+
+def span(name, cat="", lane=None, **args):
+    """
+    計測中の場合は、区間の時間を計測する。
+        計測していない場合は、何もしないコンテキストマネージャを返す。
+    :param str name:        名前
+    :param str cat:         分類
+    :param str lane:        レーンの名前 (None の場合は、スレッド毎)
+    :param dict args:       イベントに付ける値
+    :rtype:                 contextmanager
+    """
+
+    if _tracer is None:
+        return _NULL_SPAN
+
+    return _tracer.span(name, cat, lane, **args)
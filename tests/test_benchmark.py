@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks/benchmark.py のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from benchmark import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path_root)
+
+    def test_make_forest(self):
+        paths = make_forest(self.path_root, 12)
+        self.assertEqual(len(paths), 12)
+        self.assertEqual([os.path.dirname(dname) for dname in discovery.find_repos(self.path_root)],
+                         paths)
+
+    def test_fake_git(self):
+        path = make_fake_git(self.path_root)
+        env = dict(os.environ, FAKEGIT_LATENCY="0.01")
+        output = subprocess.check_output([path, "-C", "a", "status"], env=env)
+        self.assertEqual(output, b"fake-git -C a status\n")
+
+    def test_run_benchmark(self):
+        results = run_benchmark(3, repeat=1, jobs=2)
+        self.assertTrue(all(value >= 0 for value in results.values()))
+        self.assertTrue("call.parallel" in results)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
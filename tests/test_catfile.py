@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+catfile のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.catfile import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def setUp(self):
+        self.path_repo = os.path.realpath(tempfile.mkdtemp())
+        os.mkdir(os.path.join(self.path_repo, "sub"))
+        with open(os.path.join(self.path_repo, "a.txt"), "w") as f:
+            f.write("あ\n")
+        with open(os.path.join(self.path_repo, "sub", "b.bin"), "wb") as f:
+            f.write(b"\0\n" * 10000)
+        self.git("init", "-q")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "first")
+
+    def tearDown(self):
+        shutil.rmtree(self.path_repo)
+
+    def git(self, *args):
+        return subprocess.check_output(["git", "-C", self.path_repo, "-c", "user.name=a",
+                                        "-c", "user.email=a@example.com"] + list(args))
+
+    def test_query(self):
+        with CatFile(self.path_repo) as catfile:
+            objects = catfile.query(["HEAD:a.txt", "HEAD:sub/b.bin", "HEAD:none", "HEAD"])
+            self.assertEqual(objects[0].data, "あ\n".encode("utf-8"))
+            self.assertEqual(objects[0].type, "blob")
+            self.assertEqual(objects[1].data, b"\0\n" * 10000)
+            self.assertEqual((objects[2].oid, objects[2].type), (None, "missing"))
+            self.assertEqual(objects[3].type, "commit")
+
+            # 同じプロセスで続けて取得できる。
+            self.assertEqual(catfile.get("HEAD:a.txt").data, objects[0].data)
+
+    def test_pipeline(self):
+        # パイプのバッファを超える要求と応答でも、止まらずに取得できる。
+        revs = ["HEAD:sub/b.bin", "HEAD:a.txt"] * 2000
+        with CatFile(self.path_repo) as catfile:
+            objects = catfile.query(revs)
+        self.assertEqual(len(objects), len(revs))
+        self.assertEqual(objects[-2].size, 20000)
+
+    def test_check(self):
+        with CatFile(self.path_repo, check=True) as catfile:
+            obj = catfile.get("HEAD:sub/b.bin")
+        self.assertEqual((obj.type, obj.size, obj.data), ("blob", 20000, None))
+        self.assertEqual(format_object(obj), "%s blob 20000\n" % obj.oid)
+
+    def test_format_tree(self):
+        with CatFile(self.path_repo) as catfile:
+            obj = catfile.get("HEAD^{tree}")
+        self.assertEqual(format_object(obj),
+                         self.git("ls-tree", "HEAD").decode("utf-8"))
+
+    def test_pool(self):
+        path_other = tempfile.mkdtemp()
+        try:
+            subprocess.check_call(["git", "init", "-q", path_other])
+            with CatFilePool(max_procs=1) as pool:
+                catfile = pool.get(self.path_repo)
+                self.assertTrue(pool.get(self.path_repo) is catfile)
+
+                # 上限を超えると、古いものから終了する。
+                self.assertEqual(pool.query(path_other, ["HEAD"])[0].type, "missing")
+                self.assertRaises(OSError, catfile.get, "HEAD")
+
+                # 終了していた場合は、起動し直す。
+                pool.get(path_other).close()
+                self.assertEqual(pool.query(path_other, ["HEAD"])[0].type, "missing")
+        finally:
+            shutil.rmtree(path_other)
+
+    def test_cli(self):
+        path_package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=path_package, GITDEEP_NO_DAEMON="1",
+                   GITDEEP_CACHE_DIR=os.path.join(self.path_repo, ".git", "gitdeep-cache"))
+        argv = [sys.executable, "-m", "gitdeep", "--no-size"]
+
+        txt = subprocess.check_output(argv + ["show-file", "a.txt"], cwd=self.path_repo, env=env)
+        self.assertTrue("あ\n" in txt.decode("utf-8"))
+
+        # 改行を含むオブジェクト名は、実行する前にエラーにする。
+        ps = subprocess.run(argv + ["cat", "--", "HEAD\nx"], cwd=self.path_repo, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(ps.returncode, 2)
+        self.assertFalse(b"Traceback" in ps.stderr)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
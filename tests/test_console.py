@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+console のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import io
+import os
+import sys
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.console import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Stream(io.StringIO):
+    """
+    書き込んだ回数を数えるストリーム
+    """
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return io.StringIO.write(self, text)
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def test_buffer(self):
+        stream = Stream()
+        with ConsoleWriter(stream, interval=None) as out:
+            for i in range(1000):
+                out.writeline("line %d" % i)
+            self.assertEqual(stream.getvalue(), "")
+
+        # まとめて1回で書き込む。
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue().splitlines()[-1], "line 999")
+
+    def test_buffer_size(self):
+        stream = Stream()
+        out = ConsoleWriter(stream, interval=None, buffer_size=100)
+        out.write("x" * 60)
+        self.assertEqual(stream.writes, 0)
+        out.write("x" * 60)
+        self.assertEqual(stream.writes, 1)
+        out.close()
+
+    def test_interval(self):
+        stream = Stream()
+        with ConsoleWriter(stream, interval=0.05) as out:
+            out.write("a")
+            time_limit = time.time() + 5
+            while not stream.getvalue() and time.time() < time_limit:
+                time.sleep(0.01)
+            # 書き込みが途絶えても、間隔毎に書き込む。
+            self.assertEqual(stream.getvalue(), "a")
+
+    def test_summary(self):
+        summary = Summary()
+        summary.add("a", "clean\n", 1)
+        summary.add("b", "modified\n", 2)
+        summary.add("c", "clean", 3)
+        summary.add("d", "", 4)
+        summary.add("e", None, 5)
+        summary.add("f", "clean\n", 6)
+
+        self.assertEqual(summary.get_unique(), [("b", 2)])
+        groups = summary.get_groups()
+        self.assertEqual([(txt, len(items)) for txt, items in groups], [("clean", 3), ("", 2)])
+
+    def test_format_group(self):
+        self.assertEqual(format_group("clean", 3), "[3 リポジトリ] clean")
+        self.assertEqual(format_group("", 2), "[2 リポジトリ] (出力なし)")
+        self.assertEqual(format_group("a\nb", 2), "[2 リポジトリ]%sa\nb" % os.linesep)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
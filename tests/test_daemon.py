@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+daemon のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.daemon import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def setUp(self):
+        self.path_root = os.path.realpath(tempfile.mkdtemp())
+        self.path_repos = os.path.join(self.path_root, "repos")
+        self.environ = os.environ.copy()
+        os.environ["GITDEEP_CACHE_DIR"] = os.path.join(self.path_root, "cache")
+        os.environ.pop(ENV_NO_DAEMON, None)
+
+        for name in ("a", os.path.join("b", "c")):
+            self.git_init(name)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.path_root)
+
+    def git_init(self, name):
+        subprocess.check_call(["git", "init", "-q", os.path.join(self.path_repos, name)])
+
+    def wait(self, func, limit=5):
+        time_limit = time.time() + limit
+        while not func() and time.time() < time_limit:
+            time.sleep(0.05)
+        return func()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify")
+    def test_inotify(self):
+        inotify = Inotify()
+        try:
+            inotify.add_watch(self.path_repos)
+            os.mkdir(os.path.join(self.path_repos, "d"))
+            events = []
+            self.assertTrue(self.wait(lambda: events.extend(inotify.read()) or events))
+            path, mask, name = events[0]
+            self.assertEqual((path, name), (self.path_repos, "d"))
+            self.assertTrue(mask & IN_CREATE and mask & IN_ISDIR)
+        finally:
+            inotify.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify")
+    def test_watch(self):
+        daemon = Daemon(self.path_repos)
+        thread = threading.Thread(target=daemon.watch)
+        thread.start()
+        try:
+            self.assertEqual(len(daemon.refresh()), 2)
+
+            # リポジトリの追加と削除を、要求の前に反映する。
+            self.git_init(os.path.join("d", "e"))
+            self.assertTrue(self.wait(lambda: len(daemon.paths) == 3))
+            shutil.rmtree(os.path.join(self.path_repos, "a"))
+            self.assertTrue(self.wait(lambda: len(daemon.paths) == 2))
+        finally:
+            daemon.close()
+            thread.join()
+
+    def test_run(self):
+        messages = []
+        Daemon(self.path_repos).run({"cwd": os.path.join(self.path_repos, "b"), "cmd": "rev-parse",
+                                     "args": ["--is-inside-work-tree"], "jobs": 2}, messages.append)
+
+        # 下位ディレクトリから要求した場合は、その中のリポジトリだけ実行する。
+        self.assertEqual(messages[0], {"repos": 1})
+        self.assertEqual(messages[1]["path"], os.path.join(self.path_repos, "b", "c"))
+        self.assertEqual((messages[1]["returncode"], messages[1]["timed_out"]), (0, False))
+        self.assertEqual(messages[1]["output"].strip(), "true")
+        self.assertEqual(messages[-1], {"done": True})
+
+        messages = []
+        Daemon(self.path_repos).run({"cwd": self.path_repos, "cmd": "status",
+                                     "max_depth": 1}, messages.append)
+        self.assertTrue("error" in messages[0])
+
+        # 除外ディレクトリの中は探索していないため、クライアントで探索させる。
+        self.git_init(os.path.join("node_modules", "d"))
+        messages = []
+        Daemon(self.path_repos).run({"cwd": os.path.join(self.path_repos, "node_modules"),
+                                     "cmd": "status"}, messages.append)
+        self.assertTrue("error" in messages[0])
+
+        # クライアントの環境変数とカレントディレクトリで実行する。
+        messages = []
+        env = dict(os.environ, GIT_CONFIG_COUNT="1", GIT_CONFIG_KEY_0="foo.bar",
+                   GIT_CONFIG_VALUE_0="hello")
+        Daemon(self.path_repos).run({"cwd": os.path.join(self.path_repos, "b"), "cmd": "config",
+                                     "args": ["foo.bar"], "env": env}, messages.append)
+        self.assertEqual(messages[1]["output"], "hello\n")
+        self.assertEqual(messages[1]["argv"][:3], ["git", "-C", os.path.join(self.path_repos, "b", "c")])
+
+    def test_find_socket(self):
+        # ソケットを探すだけでは、キャッシュディレクトリを作成しない。
+        self.assertEqual(find_socket(self.path_repos), None)
+        self.assertFalse(os.path.exists(os.path.join(self.path_root, "cache")))
+
+    def test_serve(self):
+        path_package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=path_package)
+        ps = subprocess.Popen([sys.executable, "-m", "gitdeep", "daemon"], cwd=self.path_repos,
+                              env=env, stderr=subprocess.DEVNULL)
+        try:
+            self.assertTrue(self.wait(lambda: find_socket(self.path_repos)))
+            self.assertEqual(find_socket(os.path.join(self.path_repos, "b")),
+                             find_socket(self.path_repos))
+            self.assertTrue(self.wait(lambda: get_status(find_socket(self.path_repos))))
+
+            messages = run_remote(self.path_repos, "rev-parse", ["--is-inside-work-tree"], jobs=2)
+            results = [message for message in messages if "path" in message]
+            self.assertEqual([result["path"] for result in results],
+                             [os.path.join(self.path_repos, "a"),
+                              os.path.join(self.path_repos, "b", "c")])
+
+            # CLI は、デーモンを使用しても同じ出力になる。
+            argv = [sys.executable, "-m", "gitdeep", "-j", "2", "rev-parse", "--", "--git-dir"]
+            txt = subprocess.check_output(argv, cwd=self.path_repos, env=env)
+            txt_local = subprocess.check_output(argv, cwd=self.path_repos,
+                                                env=dict(env, GITDEEP_NO_DAEMON="1"))
+            self.assertEqual(txt, txt_local)
+
+            # クライアントの環境変数で実行する。
+            argv = [sys.executable, "-m", "gitdeep", "-j", "2", "config", "foo.bar"]
+            env_config = dict(env, GIT_CONFIG_COUNT="1", GIT_CONFIG_KEY_0="foo.bar",
+                              GIT_CONFIG_VALUE_0="hello")
+            txt = subprocess.check_output(argv, cwd=self.path_repos, env=env_config)
+            self.assertEqual(txt.decode("utf-8").count("hello"), 2)
+
+            subprocess.check_call([sys.executable, "-m", "gitdeep", "daemon", "stop"],
+                                  cwd=self.path_repos, env=env)
+            self.assertEqual(ps.wait(10), 0)
+            self.assertEqual(find_socket(self.path_repos), None)
+        finally:
+            if ps.poll() is None:
+                ps.kill()
+                ps.wait()
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
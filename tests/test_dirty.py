@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+dirty のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.dirty import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+    path_cache = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        self.path_cache = tempfile.mkdtemp()
+        os.environ[cachedir.ENV_CACHE_DIR] = self.path_cache
+
+        self.git("init", "-q")
+        self.write("a", b"a")
+        self.write("b/c", b"c")
+        self.git("add", ".")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com",
+                 "commit", "-q", "-m", "test")
+
+        # 更新日時を過去にして、index を更新する。
+        time_old = time.time() - 60
+        for root, dirs, files in os.walk(self.path_root):
+            for name in dirs + files + [""]:
+                os.utime(os.path.join(root, name), (time_old, time_old))
+        self.git("update-index", "--refresh")
+
+    def tearDown(self):
+        os.environ.pop(cachedir.ENV_CACHE_DIR, None)
+        shutil.rmtree(self.path_root)
+        shutil.rmtree(self.path_cache)
+
+    def git(self, *args):
+        return subprocess.check_output(["git", "-C", self.path_root] + list(args))
+
+    def write(self, name, data):
+        path = os.path.join(self.path_root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def test_check(self):
+        checker = DirtyChecker(self.path_root)
+
+        # 初回は git で判定する。
+        result = checker.check(self.path_root)
+        self.assertEqual((result.dirty, result.by), (False, BY_GIT))
+
+        # 変更がなければ、キャッシュで判定する。
+        result = checker.check(self.path_root)
+        self.assertEqual((result.dirty, result.by), (False, BY_CACHE))
+
+        # バイト数が変わったファイルは、stat で判定する。
+        self.write("b/c", b"cc")
+        result = checker.check(self.path_root)
+        self.assertEqual((result.dirty, result.by), (True, BY_STAT))
+
+    def test_untracked(self):
+        checker = DirtyChecker(self.path_root)
+        checker.check(self.path_root)
+
+        # 追加したファイルは、git で判定する。
+        self.write("b/d", b"d")
+        result = checker.check(self.path_root)
+        self.assertEqual((result.dirty, result.by), (True, BY_GIT))
+
+    def test_check_all(self):
+        checker = DirtyChecker(self.path_root, jobs=2)
+        checker.check_all([self.path_root])
+
+        # 保存したキャッシュを使用する。
+        checker = DirtyChecker(self.path_root, jobs=2)
+        results = checker.check_all([self.path_root])
+        self.assertEqual([(result.dirty, result.by) for result in results], [(False, BY_CACHE)])
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
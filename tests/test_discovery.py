@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+discovery のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.discovery import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        for path in ["a/.git/refs", "b/c/.git", "b/c/sub/.git", "node_modules/d/.git", "e/f/g/.git"]:
+            os.makedirs(os.path.join(self.path_root, path))
+
+    def tearDown(self):
+        shutil.rmtree(self.path_root)
+
+    def relpaths(self, paths):
+        return [os.path.relpath(path, self.path_root) for path in paths]
+
+    def test_find_repos(self):
+        results = find_repos(self.path_root)
+        self.assertEqual(self.relpaths(results),
+                         ["a/.git", "b/c/.git", "b/c/sub/.git", "e/f/g/.git"])
+
+    def test_find_repos_max_depth(self):
+        results = find_repos(self.path_root, max_depth=2)
+        self.assertEqual(self.relpaths(results), ["a/.git", "b/c/.git"])
+
+    def test_find_repos_skip_dirs(self):
+        results = find_repos(self.path_root, skip_dirs=())
+        self.assertTrue(os.path.join(self.path_root, "node_modules/d/.git") in results)
+
+    def test_iter_dirs(self):
+        results = sorted(iter_dirs(self.path_root, "^.git$"))
+        self.assertEqual(len(results), 5)
+
+        results = sorted(iter_dirs(self.path_root, "^refs$"))
+        self.assertEqual(self.relpaths(results), ["a/.git/refs"])
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
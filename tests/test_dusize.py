@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+dusize のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.dusize import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+    path_cache = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        self.path_cache = tempfile.mkdtemp()
+        os.environ[cachedir.ENV_CACHE_DIR] = self.path_cache
+
+        for i, path in enumerate(["a", "b/c", "b/d", "e"]):
+            os.makedirs(os.path.join(self.path_root, path))
+            with open(os.path.join(self.path_root, path, "f"), "wb") as f:
+                f.write(b"x" * (i + 1) * 100)
+
+        # 更新日時を過去にする。
+        time_old = time.time() - 60
+        for root, dirs, _files in os.walk(self.path_root):
+            for name in dirs + [""]:
+                os.utime(os.path.join(root, name), (time_old, time_old))
+
+    def tearDown(self):
+        os.environ.pop(cachedir.ENV_CACHE_DIR, None)
+        shutil.rmtree(self.path_root)
+        shutil.rmtree(self.path_cache)
+
+    def test_du(self):
+        self.assertEqual(du(self.path_root), 1000)
+        self.assertEqual(du(self.path_root, jobs=4, cache=False), 1000)
+
+    def test_prefetcher(self):
+        with SizePrefetcher(2, cache=False) as sizes:
+            sizes.submit(self.path_root)
+            sizes.submit(os.path.join(self.path_root, "b"))
+            self.assertEqual(sizes.get(os.path.join(self.path_root, "b")), 500)
+            self.assertEqual(sizes.get(self.path_root), 1000)
+
+    def test_cache(self):
+        du(self.path_root)
+
+        # 更新日時が変わっていないディレクトリは、キャッシュしたファイルの一覧を使用する。
+        _byte, dirs = walk_size(self.path_root)
+        dirs["a"][1] = {}
+        self.assertEqual(walk_size(self.path_root, dirs)[0], 900)
+
+        # ディレクトリの更新日時が変わらない追記も反映される。
+        with open(os.path.join(self.path_root, "a", "f"), "ab") as f:
+            f.write(b"x" * 7)
+        self.assertEqual(du(self.path_root), 1007)
+
+        # 追加したファイルは反映される。
+        with open(os.path.join(self.path_root, "b", "g"), "wb") as f:
+            f.write(b"x" * 5)
+        self.assertEqual(du(self.path_root), 1012)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
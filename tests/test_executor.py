@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+executor のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.executor import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def test_get_jobs(self):
+        self.assertEqual(get_jobs(3), 3)
+        self.assertTrue(get_jobs(None) >= 1)
+        self.assertTrue(get_jobs(0) >= 1)
+
+    def test_map_order(self):
+        executor = Executor(4)
+        results = list(executor.map(
+            lambda i: executor.popen(["sh", "-c", "sleep 0.0%d; echo %d" % (5 - i, i)]), range(5)))
+        self.assertEqual([txt.strip() for _ret, txt, _timed_out in results], [str(i) for i in range(5)])
+
+    def test_cancel(self):
+        executor = Executor(2)
+        results = executor.map(
+            lambda i: executor.popen(["true"] if i == 0 else ["sleep", "10"]), range(4))
+
+        # 最初の結果を取得した後に取り消す。
+        ret, _txt, _timed_out = next(results)
+        self.assertEqual(ret, 0)
+        results.close()
+
+        self.assertTrue(executor.cancelled.is_set())
+        self.assertEqual(executor.popen(["echo", "1"]), (RETURNCODE_CANCELLED, "", False))
+
+    def test_spawn(self):
+        # 空白や記号を含む引数は、そのまま渡される。
+        args = ["a b", "$HOME", "'\"", ";|&"]
+        ps = spawn(["printf", "%s\\n"] + args, stdout=subprocess.PIPE)
+        stdout_data, _stderr_data = ps.communicate()
+        self.assertEqual(stdout_data.decode("utf-8").splitlines(), args)
+
+    def test_timeout(self):
+        executor = Executor(2, timeout=0.2)
+
+        # 孫プロセスを含めて終了し、それまでの出力を返す。
+        time_start = time.monotonic()
+        ret, txt, timed_out = executor.popen(["sh", "-c", "echo 1; sleep 10 & wait"])
+        self.assertEqual((ret, txt.strip(), timed_out), (RETURNCODE_TIMEOUT, "1", True))
+        self.assertTrue(time.monotonic() - time_start < 5)
+
+        self.assertEqual(executor.popen(["echo", "2"]), (0, "2\n", False))
+
+        # 同じ値で終了したコマンドは、タイムアウトにしない。
+        self.assertEqual(executor.popen(["sh", "-c", "exit %d" % RETURNCODE_TIMEOUT]),
+                         (RETURNCODE_TIMEOUT, "", False))
+
+    def test_run(self):
+        executor = Executor(2, timeout=5)
+        result = executor.run(
+            ["sh", "-c", "echo out; echo err >&2; i=0; while [ $i -lt 20000 ]; do i=$((i+1)); done; exit 3"])
+        self.assertEqual((result.returncode, result.stdout, result.stderr), (3, "out\n", "err\n"))
+        self.assertTrue(result.user + result.sys > 0)
+        self.assertTrue(result.wall >= result.user)
+
+        # タイムアウトしても、それまでの出力を返す。
+        executor = Executor(2, timeout=0.2)
+        result = executor.run(["sh", "-c", "echo 1; sleep 10 & wait"])
+        self.assertEqual((result.returncode, result.stdout, result.timed_out),
+                         (RETURNCODE_TIMEOUT, "1\n", True))
+
+    def test_map_unordered(self):
+        executor = Executor(4)
+        results = list(executor.map(
+            lambda i: executor.popen(["sh", "-c", "sleep 0.%d; echo %d" % (3 - i, i)]),
+            range(3), ordered=False))
+        self.assertEqual([txt.strip() for _ret, txt, _timed_out in results], ["2", "1", "0"])
+
+    def test_map_stream(self):
+        executor = Executor(2)
+        pulled = []
+
+        def items():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        # items を全て受け取る前に、終了したジョブの結果を返す。
+        results = executor.map(lambda i: i, items())
+        self.assertEqual(next(results), 0)
+        self.assertTrue(len(pulled) <= 2 * WINDOW + 1)
+        self.assertEqual(list(results), list(range(1, 1000)))
+
+        # 終了した順でも、先読みするのは上限まで。
+        pulled[:] = []
+        results = executor.map(lambda i: time.sleep(0.1 if i == 0 else 0) or i, items(), ordered=False)
+        first = next(results)
+        self.assertTrue(first > 0)
+        self.assertTrue(len(pulled) <= 2 * WINDOW + 1)
+        self.assertEqual(sorted([first] + list(results)), list(range(1000)))
+
+    def test_find_stragglers(self):
+        durations = [("a", 1.0), ("b", 1.2), ("c", 0.8), ("d", 5.0), ("e", 3.5)]
+        self.assertEqual(find_stragglers(durations, 3), (1.2, [("d", 5.0)]))
+        self.assertEqual(find_stragglers(durations, 2)[1], [("d", 5.0), ("e", 3.5)])
+        self.assertEqual(find_stragglers([], 2), (0.0, []))
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
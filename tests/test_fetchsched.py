@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+fetchsched のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import collections
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.fetchsched import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+
+        # file:// のベアリポジトリを2つ作成し、それぞれから複製する。
+        for name in ["r1", "r2"]:
+            path = os.path.join(self.path_root, name + ".git")
+            self.git(self.path_root, "init", "-q", "--bare", path)
+            self.git(self.path_root, "clone", "-q", "file://" + path, name + "-work")
+            self.git(os.path.join(self.path_root, name + "-work"),
+                     "-c", "user.name=test", "-c", "user.email=test@example.com",
+                     "commit", "-q", "--allow-empty", "-m", "test")
+            self.git(os.path.join(self.path_root, name + "-work"), "push", "-q", "origin", "HEAD")
+            for i in range(3):
+                self.git(self.path_root, "clone", "-q", "file://" + path, "%s-%d" % (name, i))
+
+    def tearDown(self):
+        shutil.rmtree(self.path_root)
+
+    def git(self, path_base, *args):
+        return subprocess.check_output(["git", "-C", path_base] + list(args),
+                                       stderr=subprocess.STDOUT)
+
+    def test_get_remote_key(self):
+        self.assertEqual(get_remote_key("https://user@GitHub.com:443/a/b.git"), "github.com")
+        self.assertEqual(get_remote_key("ssh://git@example.com/a/b.git"), "example.com")
+        self.assertEqual(get_remote_key("git@example.com:a/b.git"), "example.com")
+        self.assertEqual(get_remote_key("file:///srv/git/a.git"), "file:///srv/git/a.git")
+        self.assertEqual(get_remote_key("../a.git", "/srv/b"), "file:///srv/a.git")
+
+    def test_get_remote_keys(self):
+        path_base = os.path.join(self.path_root, "r1-0")
+        path_r1 = "file://" + os.path.join(self.path_root, "r1.git")
+        path_r2 = "file://" + os.path.join(self.path_root, "r2.git")
+        self.assertEqual(get_remote_keys(path_base), [path_r1])
+
+        self.git(path_base, "remote", "add", "other", path_r2)
+        self.assertEqual(get_remote_keys(path_base, "fetch", ["other"]), [path_r2])
+        self.assertEqual(get_remote_keys(path_base, "fetch", ["--all"]), [path_r1, path_r2])
+
+        # ローカルのパスは、カレントディレクトリではなくリポジトリからの相対パスで判定する。
+        self.assertEqual(get_remote_keys(path_base, "fetch", [os.path.join("..", "r2.git")]),
+                         [path_r2])
+
+    def test_map(self):
+        # 実行中のジョブ数を、リモート毎に記録する。
+        lock = threading.Lock()
+        running = collections.Counter()
+        peak = collections.Counter()
+        paths = [os.path.join(self.path_root, "%s-%d" % (name, i))
+                 for i in range(3) for name in ["r1", "r2"]]
+        scheduler = FetchScheduler(4, per_remote=1)
+
+        def run(path_base):
+            key = get_remote_keys(path_base)[0]
+            with lock:
+                running[key] += 1
+                peak[key] = max(peak[key], running[key])
+            time.sleep(0.05)
+            ret = scheduler.popen(["git", "-C", path_base, "fetch", "-q"])
+            with lock:
+                running[key] -= 1
+            return (path_base, ret[0])
+
+        results = list(scheduler.map(run, paths, keys=get_remote_keys))
+        self.assertEqual(results, [(path_base, 0) for path_base in paths])
+        self.assertEqual(sorted(peak.values()), [1, 1])
+
+        # 同じインスタンスで、もう一度実行できる。
+        results = list(scheduler.map(run, paths, keys=get_remote_keys))
+        self.assertEqual(results, [(path_base, 0) for path_base in paths])
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+fleet のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gitdeep
+from gitdeep.fleet import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def setUp(self):
+        self.path_root = os.path.realpath(tempfile.mkdtemp())
+        self.environ = os.environ.get("GITDEEP_CACHE_DIR")
+        os.environ["GITDEEP_CACHE_DIR"] = os.path.join(self.path_root, "cache")
+
+        self.paths = []
+        for name in ("a", "b", os.path.join("c", "d")):
+            path = os.path.join(self.path_root, "repos", name)
+            subprocess.check_call(["git", "init", "-q", path])
+            self.paths.append(path)
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop("GITDEEP_CACHE_DIR", None)
+        else:
+            os.environ["GITDEEP_CACHE_DIR"] = self.environ
+        shutil.rmtree(self.path_root)
+
+    def test_export(self):
+        self.assertTrue(gitdeep.Fleet is Fleet)
+        self.assertTrue(gitdeep.RepoResult is RepoResult)
+
+    def test_discover(self):
+        fleet = Fleet(os.path.join(self.path_root, "repos"))
+        self.assertEqual(list(fleet), self.paths)
+        self.assertEqual(len(fleet), 3)
+
+        # 探索し直すまでは、前回の結果を使用する。
+        path = os.path.join(self.path_root, "repos", "e")
+        subprocess.check_call(["git", "init", "-q", path])
+        self.assertEqual(len(fleet), 3)
+        self.assertEqual(fleet.refresh(), self.paths + [path])
+
+    def test_iter_discover(self):
+        path = os.path.join(self.path_root, "repos", "c-e")
+        subprocess.check_call(["git", "init", "-q", path])
+
+        # 探索した順 (名前順の深さ優先) に返し、get_sort_key で discover() の順に並べられる。
+        results = list(iter_discover(os.path.join(self.path_root, "repos")))
+        self.assertEqual(results, self.paths + [path])
+        self.assertEqual(sorted(results, key=get_sort_key),
+                         discover(os.path.join(self.path_root, "repos")))
+        self.assertEqual(discover(os.path.join(self.path_root, "repos"))[2], path)
+
+    def test_run(self):
+        fleet = Fleet(os.path.join(self.path_root, "repos"), jobs=2)
+
+        # 失敗しても終了せずに、全てのリポジトリの結果を返す。
+        for _i in range(2):
+            results = list(fleet.run("rev-parse", ["--show-toplevel"]))
+            self.assertEqual([result.path for result in results], self.paths)
+            for result in results:
+                self.assertTrue(result.ok)
+                self.assertEqual(result.stdout.strip(), result.path)
+                self.assertEqual(result.argv[:4], ["git", "-C", result.path, "rev-parse"])
+
+        results = list(fleet.run("rev-parse", ["HEAD"], ordered=False))
+        self.assertEqual(sorted(result.path for result in results), self.paths)
+        for result in results:
+            self.assertFalse(result.ok)
+            self.assertTrue(result.stderr)
+
+    def test_cat_file(self):
+        path = self.paths[0]
+        with open(os.path.join(path, "a.txt"), "w") as f:
+            f.write("a")
+        subprocess.check_call(["git", "-C", path, "add", "a.txt"])
+        subprocess.check_call(["git", "-C", path, "-c", "user.name=a", "-c", "user.email=a@example.com",
+                               "commit", "-q", "-m", "first"])
+
+        with Fleet(os.path.join(self.path_root, "repos")) as fleet:
+            for _i in range(2):
+                results = dict(fleet.cat_file(["HEAD:a.txt"]))
+                self.assertEqual(results[path][0].data, b"a")
+                self.assertEqual(results[self.paths[1]][0].type, "missing")
+
+    def test_run_paths(self):
+        fleet = Fleet(os.path.join(self.path_root, "repos"))
+        results = list(fleet.run("status", paths=self.paths[1:2]))
+        self.assertEqual([result.path for result in results], self.paths[1:2])
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+gitdeep のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.gitdeep import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+# 起動時に読み込むモジュールの時間の上限 (ミリ秒)
+#   計測値は約 30 ms (遅延読み込みにする前は約 115 ms)。
+IMPORT_BUDGET_MS = 60
+
+# 時間を確認する場合に設定する環境変数 (負荷によって揺らぐため、既定では確認しない)
+ENV_IMPORT_BUDGET = "GITDEEP_TEST_IMPORT_BUDGET"
+
+# 起動時に読み込まないモジュール
+HEAVY_MODULES = ("asyncio", "unittest", "cProfile", "pstats", "inspect", "six",
+                 "logging", "concurrent.futures", "statistics", "hashlib", "tempfile",
+                 "gitdeep.cmdparser", "gitdeep.logwriter")
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def test_lazy_imports(self):
+        modules = self.get_import_times()
+        for name in HEAVY_MODULES:
+            self.assertFalse(name in modules, name)
+
+    @unittest.skipUnless(os.environ.get(ENV_IMPORT_BUDGET), "%s が未設定" % ENV_IMPORT_BUDGET)
+    def test_import_budget(self):
+        # 負荷による揺らぎを除くため、最小値で比較する。
+        elapsed = min(self.get_import_times()["gitdeep.gitdeep"] for _i in range(3))
+        self.assertTrue(elapsed / 1000.0 < IMPORT_BUDGET_MS,
+                        "%.1f ms >= %d ms" % (elapsed / 1000.0, IMPORT_BUDGET_MS))
+
+    def test_import_lazy(self):
+        module = import_lazy("streamer")
+        self.assertTrue(module is import_lazy("streamer"))
+        self.assertTrue(callable(module.Streamer))
+
+    def test_iter_lines(self):
+        path_root = tempfile.mkdtemp()
+        try:
+            git = ["git", "-C", path_root, "-c", "user.name=a", "-c", "user.email=a@example.com"]
+            subprocess.check_call(git + ["init", "-q"])
+            for i in range(3):
+                subprocess.check_call(git + ["commit", "-q", "--allow-empty", "-m", "コミット%d" % i])
+
+            with iter_lines(path_root, "log", ["--format=%s"]) as lines:
+                self.assertEqual(list(lines), ["コミット2", "コミット1", "コミット0"])
+            self.assertEqual(lines.returncode, 0)
+        finally:
+            shutil.rmtree(path_root)
+
+    def test_live_prefix(self):
+        path_root = tempfile.mkdtemp()
+        try:
+            for name in ("a", "b"):
+                subprocess.check_call(["git", "init", "-q", os.path.join(path_root, name, "lib")])
+
+            # 同じ名前のリポジトリは、探索したパスからの相対パスで区別する。
+            path_package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            env = dict(os.environ, PYTHONPATH=path_package, GITDEEP_NO_DAEMON="1",
+                       GITDEEP_CACHE_DIR=os.path.join(path_root, "cache"))
+            txt = subprocess.check_output(
+                [sys.executable, "-m", "gitdeep", "--live", "-j", "2", "rev-parse", "--", "--git-dir"],
+                cwd=path_root, env=env, universal_newlines=True)
+            lines = txt.splitlines()
+            self.assertTrue("[%s] .git" % os.path.join("a", "lib") in lines)
+            self.assertTrue("[%s] .git" % os.path.join("b", "lib") in lines)
+        finally:
+            shutil.rmtree(path_root)
+
+    def test_only_changed_remote(self):
+        # リモートに接続するコマンドは、探索する前にエラーにする。
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        try:
+            self.assertEqual(call("fetch", [], only_changed=True), 2)
+            self.assertTrue("--only-changed" in sys.stderr.getvalue())
+        finally:
+            sys.stderr = stderr
+
+    def test_iter_submit(self):
+        # 直列に実行する場合も、次のリポジトリのバイト数を先に取得し始める。
+        class Sizes(object):
+            def __init__(self):
+                self.submitted = []
+            def submit(self, path_base):
+                self.submitted.append(path_base)
+
+        sizes = Sizes()
+        for path_base in iter_submit(sizes, ["a", "b", "c"]):
+            if path_base != "c":
+                self.assertEqual(sizes.submitted[-1], chr(ord(path_base) + 1))
+        self.assertEqual(sizes.submitted, ["a", "b", "c"])
+
+    def test_sort_results(self):
+        # 出力だけを貯めて、.git ディレクトリのパスの順 (探索し終えた一覧と同じ順) に返す。
+        results = ((path, 0, "", "", 0.0, False) for path in ["/r/a", "/r/c/d", "/r/c-e", "/r/b"])
+        self.assertEqual([result[0] for result in sort_results(results)],
+                         ["/r/a", "/r/b", "/r/c-e", "/r/c/d"])
+
+    def get_import_times(self):
+        """
+        python -X importtime で、gitdeep を読み込んだ時の時間を取得する。
+        :rtype:             dict
+        :return:            {モジュール名: 累積時間 (マイクロ秒)}
+        """
+
+        path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ps = subprocess.run([sys.executable, "-X", "importtime", "-c", "import gitdeep.gitdeep"],
+                            cwd=path_root, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+
+        results = {}
+        for line in ps.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _self, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                results[name.strip()] = int(cumulative)
+
+        return results
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+gitindex のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.gitindex import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        self.git("init", "-q")
+        for name in ["a", "b/c", "b/d/e"]:
+            path = os.path.join(self.path_root, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as f:
+                f.write(name.encode("ascii"))
+        self.git("add", ".")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com",
+                 "commit", "-q", "-m", "test")
+
+    def tearDown(self):
+        shutil.rmtree(self.path_root)
+
+    def git(self, *args):
+        return subprocess.check_output(["git", "-C", self.path_root] + list(args))
+
+    def test_read_index(self):
+        path_git = os.path.join(self.path_root, ".git")
+
+        for version in [2, 4]:
+            self.git("update-index", "--index-version", str(version))
+            index = read_index(path_git)
+            self.assertEqual(index.version, version)
+            self.assertEqual([entry.path for entry in index.entries], [b"a", b"b/c", b"b/d/e"])
+            self.assertEqual(index.entries[1].size, 3)
+
+    def test_read_index_extended(self):
+        path_git = os.path.join(self.path_root, ".git")
+
+        # 拡張フラグを使用すると、バージョン3になる。
+        self.git("update-index", "--index-version", "2")
+        self.git("update-index", "--skip-worktree", "b/c")
+        index = read_index(path_git)
+        self.assertEqual(index.version, 3)
+        self.assertEqual([entry.path for entry in index.entries], [b"a", b"b/c", b"b/d/e"])
+        self.assertTrue(index.entries[1].flags_ext & FLAG_SKIP_WORKTREE)
+        self.assertFalse(index.entries[2].flags_ext & FLAG_SKIP_WORKTREE)
+
+    def test_read_head(self):
+        path_git = os.path.join(self.path_root, ".git")
+        oid = self.git("rev-parse", "HEAD").strip().decode("ascii")
+        ref = self.git("symbolic-ref", "HEAD").strip().decode("ascii")
+
+        self.assertEqual(read_head(path_git), (ref, oid))
+
+        self.git("pack-refs", "--all")
+        self.assertEqual(read_head(path_git), (ref, oid))
+
+        self.git("checkout", "-q", "--detach")
+        self.assertEqual(read_head(path_git), (None, oid))
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+linereader のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import sys
+import time
+import tracemalloc
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.linereader import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def python(self, script):
+        return [sys.executable, "-c", script]
+
+    def test_lines(self):
+        # UTF-8 の文字の途中や行の途中で区切って出力する。
+        script = ("import sys, time\n"
+                  "out = sys.stdout.buffer\n"
+                  "for data in [b'a\\r\\nb', b'\\n\\xe6\\x97', b'\\xa5\\n', b'last']:\n"
+                  "    out.write(data); out.flush(); time.sleep(0.02)\n"
+                  "sys.stderr.write('warning'); sys.exit(3)\n")
+        reader = LineReader(self.python(script))
+        self.assertEqual(list(reader), ["a", "b", "日", "last"])
+        self.assertEqual(reader.returncode, 3)
+        self.assertEqual(reader.stderr, "warning")
+
+    def test_max_line(self):
+        reader = LineReader(self.python("print('x' * 25)"), max_line=10)
+        self.assertEqual(list(reader), ["x" * 10, "x" * 10, "x" * 5])
+
+    def test_bounded_memory(self):
+        # 出力全体 (約 50 MB) より十分少ないメモリで読み込める。
+        script = ("import sys\n"
+                  "line = b'%s\\n' % (b'x' * 99)\n"
+                  "for _i in range(500):\n"
+                  "    sys.stdout.buffer.write(line * 1000)\n")
+        tracemalloc.start()
+        try:
+            count = 0
+            with LineReader(self.python(script)) as reader:
+                for line in reader:
+                    count += 1
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(count, 500 * 1000)
+        self.assertEqual(reader.returncode, 0)
+        self.assertTrue(peak < 4 * 1024 * 1024, peak)
+
+    def test_close(self):
+        # 読み込みをやめると、コマンドを終了する。
+        time_start = time.time()
+        with LineReader(self.python("while True: print('y')")) as reader:
+            self.assertEqual(next(reader), "y")
+        self.assertTrue(reader.returncode != 0)
+        self.assertTrue(time.time() - time_start < 5)
+
+        reader = LineReader(["sleep", "10"])
+        self.assertTrue(reader.close() != 0)
+
+    def test_timeout(self):
+        reader = LineReader(["sh", "-c", "echo 1; sleep 10"], timeout=0.3)
+        self.assertEqual(list(reader), ["1"])
+        self.assertTrue(reader.timed_out)
+        self.assertEqual(reader.returncode, 124)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
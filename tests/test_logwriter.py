@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+logwriter のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.logwriter.logwriter import *
+from gitdeep.logwriter.logwriter import _encodings
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class TestLogWriter(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    filename = "LogWriter.log"
+    logger_conf = {
+        "name": os.path.splitext("TestLogWriter"),
+        "level": logging.DEBUG,
+        }
+    logger = None
+
+    def setUp(self):
+
+        # 変数を初期化します。
+        self.logger = LogWriter(**self.logger_conf)
+
+    def tearDown(self):
+        self.logger = None
+
+    def test_debug(self):
+        sys.stdout.write(os.linesep)
+
+        result = self.logger.debug("デバッグ")
+        self.assertEqual(result, None)
+
+    def test_debug_anchor_start(self):
+        sys.stdout.write(os.linesep)
+
+        # 変数を初期化します。
+        arg = "test"
+
+        result = self.logger.debug_anchor_begin(arg=arg)
+        self.assertEqual(result, None)
+
+    def test_debug_anchor_end(self):
+        sys.stdout.write(os.linesep)
+
+        result = self.logger.debug_anchor_end()
+        self.assertEqual(result, None)
+
+    def test_debug_caller(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        self.logger.addHandler(handler)
+        try:
+            # inspect.stack() を使用せずに、呼び出し元の行番号を取得する。
+            with mock.patch("inspect.stack", side_effect=AssertionError):
+                lineno = sys._getframe().f_lineno + 1
+                self.logger.debug("a")
+                self.logger.debug_anchor_begin(arg="b")
+        finally:
+            self.logger.removeHandler(handler)
+
+        self.assertEqual(records[0].getMessage(), "test_logwriter (%05d) a" % lineno)
+        self.assertEqual(records[1].getMessage(),
+                         "test_logwriter (%05d) anchor begin: test_debug_caller(arg=b)" % (lineno + 1))
+
+class TestQueue(unittest.TestCase):
+    """
+    非同期に出力する場合のテストケース
+    """
+
+    def setUp(self):
+        self.records = []
+        self.released = threading.Event()
+        self.released.set()
+
+    def emit(self, record):
+        self.released.wait()
+        self.records.append((record.getMessage(), threading.current_thread().name))
+
+    def create(self, **kwargs):
+        logger = LogWriter("TestQueue", level=logging.DEBUG, stdout=False, **kwargs)
+        handler = logging.Handler()
+        handler.emit = self.emit
+        logger.addHandler(handler)
+        return logger
+
+    def test_queue(self):
+        logger = self.create(queue_size=100)
+        for i in range(20):
+            logger.info("%d", i)
+        self.assertEqual(logger.stop_queue(), 0)
+
+        # 全て順に、呼び出し元と別のスレッドで出力される。
+        self.assertEqual([message for message, _thread in self.records],
+                         [str(i) for i in range(20)])
+        self.assertFalse(threading.current_thread().name in
+                         set(thread for _message, thread in self.records))
+        self.assertEqual(len(logger.handlers), 1)
+
+    def test_overflow_drop(self):
+        logger = self.create(queue_size=2, overflow="drop")
+        self.released.clear()
+
+        # 出力が止まっていても、呼び出し元は待たない。
+        time_start = time.time()
+        for i in range(10):
+            logger.info("%d", i)
+        self.assertTrue(time.time() - time_start < 1.0)
+
+        self.released.set()
+        dropped = logger.stop_queue()
+        messages = [message for message, _thread in self.records]
+        self.assertEqual(len(messages) - 1 + dropped, 10)
+        self.assertTrue("0" in messages)
+        self.assertFalse("9" in messages)
+        self.assertTrue(str(dropped) in messages[-1])
+
+    def test_overflow_drop_oldest(self):
+        logger = self.create(queue_size=2, overflow="drop_oldest")
+        self.released.clear()
+        for i in range(10):
+            logger.info("%d", i)
+        self.released.set()
+        logger.stop_queue()
+
+        messages = [message for message, _thread in self.records]
+        self.assertTrue("9" in messages)
+
+    def test_overflow_block(self):
+        logger = self.create(queue_size=1, overflow="block")
+        for i in range(10):
+            logger.info("%d", i)
+        self.assertEqual(logger.stop_queue(), 0)
+        self.assertEqual(len(self.records), 10)
+
+    def test_overflow_invalid(self):
+        with self.assertRaises(ValueError):
+            LogWriter("TestQueue", stdout=False, queue_size=1, overflow="wait")
+
+@obsolete
+def obsolete_dummy(*args, **kwargs):
+    return 0
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    logger_conf = {
+        "name": os.path.splitext(os.path.basename(__file__))[0],
+        "level": logging.DEBUG,
+        }
+
+    def setUp(self):
+
+        # 変数を初期化します。
+        global logger
+        logger = LogWriter(**self.logger_conf)
+
+    def tearDown(self):
+        self.logger = None
+
+    def test_getLogger(self):
+        sys.stdout.write(os.linesep)
+        logger = LogWriter(__file__)
+
+        result = getLogger()
+        self.assertTrue(isinstance(result, LogWriter))
+
+        result = getLogger(__file__)
+        self.assertEqual(result.name, __file__)
+
+    def test_obsolete(self):
+        sys.stdout.write(os.linesep)
+
+        result = obsolete_dummy()
+        self.assertEqual(result, 0)
+
+    def test_stack_frame(self):
+        frame, lineno = stack_frame(1), sys._getframe().f_lineno
+        self.assertEqual(os.path.basename(frame.filename), "test_logwriter.py")
+        self.assertEqual(frame.lineno, lineno)
+        self.assertEqual(frame.function, "test_stack_frame")
+
+        # 深いスタックでも、呼び出し元を取得できる。
+        def recurse(depth):
+            if depth:
+                return recurse(depth - 1)
+            return stack_frame(2)
+
+        self.assertEqual(recurse(200).function, "recurse")
+        self.assertEqual(stack_frame(10 ** 6), None)
+
+    def test_decode(self):
+        sys.stdout.write(os.linesep)
+
+        result = decode(b"\xE2\x98\x85")
+        self.assertEqual(result.text, u"★")
+
+    def test_decode_japanese(self):
+        text = u"日本語のテキスト、ｶﾀｶﾅ"
+        for encoding in ("utf_8", "euc_jp", "shift_jis"):
+            self.assertEqual(decode(text.encode(encoding)), (text, encoding))
+        self.assertEqual(decode(u"漢字".encode("iso2022jp")), (u"漢字", "iso2022jp"))
+        self.assertEqual(decode(b"abc"), ("abc", "utf_8"))
+        self.assertEqual(decode(u"漢字"), (u"漢字", None))
+        self.assertEqual(decode(b"\xff\xfe").encoding, "latin_1")
+
+    def test_decode_source(self):
+        raw = u"テスト".encode("shift_jis")
+        decode(raw, "repo")
+        self.assertEqual(_encodings["repo"], "shift_jis")
+
+        # UTF-8 は、記録したエンコーディングより先に試す。
+        self.assertEqual(decode(u"テスト".encode("utf_8"), "repo").encoding, "utf_8")
+        self.assertEqual(_encodings["repo"], "shift_jis")
+        self.assertEqual(decode(raw, "repo"), (u"テスト", "shift_jis"))
+
+    def test_decode_source_fallback(self):
+        # 判定できずに latin_1 で変換したデータの後も、UTF-8 を変換できる。
+        self.assertEqual(decode(b"\xff\xfe\x80abc", "r").encoding, "latin_1")
+        self.assertTrue("r" not in _encodings)
+        self.assertEqual(decode(u"日本語".encode("utf_8"), "r"), (u"日本語", "utf_8"))
+
+    def test_detector(self):
+        text = u"abc 日本語のテキスト、ｶﾀｶﾅ" * 10
+        for encoding in ("utf_8", "euc_jp", "shift_jis"):
+            raw = text.encode(encoding)
+            detector = EncodingDetector()
+            for i in range(len(raw)):
+                detector.feed(raw[i:i + 1])
+            self.assertEqual(detector.close(), encoding)
+            self.assertEqual(detect(raw), encoding)
+        self.assertEqual(detect(b"abc"), "utf_8")
+
+    def test_get_argtext(self):
+        logger = LogWriter(stdout=False)
+        self.assertEqual(logger.get_argtext(1, key=u"値", raw=u"値".encode("euc_jp")),
+                         u"1, key=値, raw=値")
+ 
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestLogWriter)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+
+    # logger for test
+    _logger = logging.getLogger(__name__)
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter("%(asctime)s\t%(name)s\t%(levelname)s\t%(message)s"))
+    _logger.setLevel(logging.DEBUG)
+    _logger.addHandler(handler)
+
+    sys.exit(run_tests())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+repoindex のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.repoindex import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    path_root = None
+    path_cache = None
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        self.path_cache = tempfile.mkdtemp()
+        os.environ[cachedir.ENV_CACHE_DIR] = self.path_cache
+
+        for path in ["a/.git", "b/c/.git", "node_modules/d/.git"]:
+            os.makedirs(os.path.join(self.path_root, path))
+
+    def tearDown(self):
+        os.environ.pop(cachedir.ENV_CACHE_DIR, None)
+        shutil.rmtree(self.path_root)
+        shutil.rmtree(self.path_cache)
+
+    def age(self, path):
+        """
+        更新日時を過去にする。
+        """
+        time_old = time.time() - 60
+        for root, dirs, _files in os.walk(path):
+            for name in dirs + [""]:
+                os.utime(os.path.join(root, name), (time_old, time_old))
+
+    def test_find_repos(self):
+        self.age(self.path_root)
+        results = find_repos(self.path_root)
+        self.assertEqual(results, discovery.find_repos(self.path_root))
+
+        # 保存したインデックスを使用する。
+        index = RepoIndex(self.path_root)
+        index.load()
+        self.assertEqual(index.update(), results)
+        self.assertFalse(index.changed)
+
+    def test_update(self):
+        self.age(self.path_root)
+        find_repos(self.path_root)
+
+        # 追加したリポジトリを探索する。
+        os.makedirs(os.path.join(self.path_root, "b/e/.git"))
+        results = find_repos(self.path_root)
+        self.assertEqual(results, discovery.find_repos(self.path_root))
+
+        # 削除したリポジトリを取り除く。
+        shutil.rmtree(os.path.join(self.path_root, "b"))
+        results = find_repos(self.path_root)
+        self.assertEqual(results, [os.path.join(self.path_root, "a/.git")])
+
+    def test_iter_repos(self):
+        self.age(self.path_root)
+
+        # 探索した順に返し、探索し終えた時にインデックスを保存する。
+        results = list(iter_repos(self.path_root))
+        self.assertEqual(sorted(results), discovery.find_repos(self.path_root))
+        index = RepoIndex(self.path_root)
+        index.load()
+        self.assertEqual(index.update(), sorted(results))
+        self.assertFalse(index.changed)
+
+        # 探索の区間を、専用のレーンに記録する。
+        tracer.start()
+        try:
+            list(iter_repos(self.path_root, rescan=True))
+        finally:
+            events = tracer.stop().events
+        names = set(event["name"] for event in events if event["ph"] == "X")
+        self.assertEqual(names, set(["discovery", "index.update", "index.save"]))
+
+    def test_options(self):
+        find_repos(self.path_root)
+
+        results = find_repos(self.path_root, skip_dirs=())
+        self.assertEqual(len(results), 3)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+resultcache のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep import snapshot
+from gitdeep.resultcache import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def setUp(self):
+        self.path_root = os.path.realpath(tempfile.mkdtemp())
+        self.path_repo = os.path.join(self.path_root, "repo")
+        os.makedirs(os.path.join(self.path_repo, "sub"))
+        with open(os.path.join(self.path_repo, "sub", "a.txt"), "w") as f:
+            f.write("a")
+        self.git("init", "-q")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "first")
+
+        self.environ = os.environ.get("GITDEEP_CACHE_DIR")
+        os.environ["GITDEEP_CACHE_DIR"] = os.path.join(self.path_root, "cache")
+
+        # 直前の更新も保存できるように、変更ありとする時間を無くす。
+        self.racy_ns = snapshot.RACY_NS
+        snapshot.RACY_NS = -10 ** 12
+
+        # 作業ツリーを1時間前に更新したことにして、index を更新する。
+        mtime = time.time() - 3600
+        for path, _dirs, files in os.walk(self.path_repo):
+            if os.sep + ".git" in path + os.sep:
+                continue
+            for name in files:
+                os.utime(os.path.join(path, name), (mtime, mtime))
+            os.utime(path, (mtime, mtime))
+        self.git("status")
+
+    def tearDown(self):
+        snapshot.RACY_NS = self.racy_ns
+        if self.environ is None:
+            os.environ.pop("GITDEEP_CACHE_DIR", None)
+        else:
+            os.environ["GITDEEP_CACHE_DIR"] = self.environ
+        shutil.rmtree(self.path_root)
+
+    def git(self, *args):
+        return subprocess.check_output(["git", "-C", self.path_repo, "-c", "user.name=a",
+                                        "-c", "user.email=a@example.com"] + list(args))
+
+    def store(self, cmd, args=()):
+        cache = ResultCache(cmd, args)
+        cache.put(self.path_repo, 0, "output", time.time_ns())
+        cache.close()
+        return ResultCache(cmd, args)
+
+    def test_is_cacheable(self):
+        self.assertTrue(is_cacheable("status", ["--short"]))
+        self.assertTrue(is_cacheable("log", ["-n", "20"]))
+        self.assertTrue(is_cacheable("branch", ["-vv"]))
+        self.assertTrue(is_cacheable("tag", ["-n5"]))
+        self.assertTrue(is_cacheable("remote", ["-v"]))
+
+        self.assertFalse(is_cacheable("fetch", []))
+        self.assertFalse(is_cacheable("branch", ["topic"]))
+        self.assertFalse(is_cacheable("branch", ["-D", "topic"]))
+        self.assertFalse(is_cacheable("remote", ["add", "origin", "url"]))
+        self.assertFalse(is_cacheable("log", ["--output=log.txt"]))
+
+        # 現在の時刻によって結果が変わるオプション
+        self.assertTrue(is_cacheable("log", ["--date=iso", "--format=%h %ad"]))
+        self.assertFalse(is_cacheable("log", ["--since=2.weeks"]))
+        self.assertFalse(is_cacheable("log", ["--until", "yesterday"]))
+        self.assertFalse(is_cacheable("log", ["--after=1.day.ago", "--before=now"]))
+        self.assertFalse(is_cacheable("log", ["--date=relative"]))
+        self.assertFalse(is_cacheable("log", ["--date", "relative"]))
+        self.assertFalse(is_cacheable("log", ["--relative-date"]))
+        self.assertFalse(is_cacheable("log", ["--format=%h %cr"]))
+        self.assertFalse(is_cacheable("branch", ["--format=%(committerdate:relative)"]))
+
+    def test_hit(self):
+        cache = self.store("status")
+        self.assertEqual(cache.get(self.path_repo), (0, "output"))
+        self.assertEqual(cache.hits, 1)
+
+        # 引数毎に保存する。
+        self.assertEqual(ResultCache("status", ["--short"]).get(self.path_repo), None)
+
+    def test_failure(self):
+        cache = ResultCache("status")
+        cache.put(self.path_repo, 1, "error", time.time_ns())
+        self.assertEqual(cache.get(self.path_repo), None)
+
+    def test_worktree(self):
+        cache = self.store("status")
+        with open(os.path.join(self.path_repo, "sub", "a.txt"), "w") as f:
+            f.write("changed")
+        self.assertEqual(cache.get(self.path_repo), None)
+
+    def test_untracked(self):
+        cache = self.store("status")
+        with open(os.path.join(self.path_repo, "sub", "b.txt"), "w") as f:
+            f.write("b")
+        self.assertEqual(cache.get(self.path_repo), None)
+
+    def test_commit(self):
+        cache = self.store("log")
+
+        # 作業ツリーの変更は、log には影響しない。
+        with open(os.path.join(self.path_repo, "sub", "a.txt"), "w") as f:
+            f.write("changed")
+        self.assertEqual(cache.get(self.path_repo), (0, "output"))
+
+        self.git("commit", "-q", "-a", "-m", "second")
+        self.assertEqual(cache.get(self.path_repo), None)
+
+    def test_racy(self):
+        # 実行を開始した時刻に近い更新があった場合は、保存しない。
+        snapshot.RACY_NS = 10 ** 12
+        cache = self.store("log")
+        self.assertEqual(cache.get(self.path_repo), None)
+
+    def test_evict(self):
+        for i in range(5):
+            cache = ResultCache("log", ["-n", str(i)], max_entries=3)
+            cache.put(self.path_repo, 0, "output", time.time_ns())
+            os.utime(cache.get_path(self.path_repo), ns=(i, i))
+            cache.close()
+
+        # 最後に使用した日時の新しい3件が残る。
+        self.assertEqual(sorted(os.listdir(cache.dir)),
+                         sorted(os.path.basename(ResultCache("log", ["-n", str(i)]).get_path(self.path_repo))
+                                for i in range(2, 5)))
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+snapshot のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep import snapshot
+from gitdeep.snapshot import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def setUp(self):
+        self.path_root = tempfile.mkdtemp()
+        self.path_repo = os.path.join(self.path_root, "repo")
+        self.git("init", "-q", self.path_repo)
+        self.git("-C", self.path_repo, "commit", "-q", "--allow-empty", "-m", "first")
+
+        self.environ = os.environ.get("GITDEEP_CACHE_DIR")
+        os.environ["GITDEEP_CACHE_DIR"] = os.path.join(self.path_root, "cache")
+
+        # 直前の更新も記録できるように、変更ありとする時間を無くす。
+        self.racy_ns = snapshot.RACY_NS
+        snapshot.RACY_NS = -10 ** 12
+
+    def tearDown(self):
+        snapshot.RACY_NS = self.racy_ns
+        if self.environ is None:
+            os.environ.pop("GITDEEP_CACHE_DIR", None)
+        else:
+            os.environ["GITDEEP_CACHE_DIR"] = self.environ
+        shutil.rmtree(self.path_root)
+
+    def git(self, *args):
+        subprocess.check_call(["git", "-c", "user.name=a", "-c", "user.email=a@example.com"]
+                              + list(args))
+
+    def record(self):
+        snapshots = Snapshots(self.path_root, "gc")
+        snapshots.update([self.path_repo])
+        snapshots.save()
+
+    def get_changed(self, cmd="gc"):
+        return Snapshots(self.path_root, cmd).filter([self.path_repo])
+
+    def test_unchanged(self):
+        self.assertEqual(self.get_changed(), [self.path_repo])
+        self.record()
+        self.assertEqual(self.get_changed(), [])
+
+        # コマンド毎に記録する。
+        self.assertEqual(self.get_changed("status"), [self.path_repo])
+
+    def test_commit(self):
+        self.record()
+        self.git("-C", self.path_repo, "commit", "-q", "--allow-empty", "-m", "second")
+        self.assertEqual(self.get_changed(), [self.path_repo])
+
+    def test_index(self):
+        self.record()
+        with open(os.path.join(self.path_repo, "a.txt"), "w") as f:
+            f.write("a")
+        self.assertEqual(self.get_changed(), [self.path_repo])
+
+        self.git("-C", self.path_repo, "add", "a.txt")
+        self.record()
+        self.git("-C", self.path_repo, "rm", "-q", "--cached", "a.txt")
+        self.assertEqual(self.get_changed(), [self.path_repo])
+
+    def test_racy(self):
+        # 記録した時刻に近い更新日時は、次回も変更ありとする。
+        snapshot.RACY_NS = 10 ** 12
+        self.record()
+        self.assertEqual(self.get_changed(), [self.path_repo])
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
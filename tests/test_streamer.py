@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+streamer のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import io
+import os
+import sys
+import time
+import unittest
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.streamer import *
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def test_run(self):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        streamer = Streamer(2, stdout=stdout, stderr=stderr)
+
+        results = streamer.run([("a", ["sh", "-c", "echo 1; echo 2"]),
+                                ("b", ["sh", "-c", "echo 3 >&2; exit 3"])])
+        self.assertEqual(results, [0, 3])
+
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue("[a] 1" in lines)
+        self.assertTrue("[a] 2" in lines)
+        self.assertEqual(stderr.getvalue().splitlines(), ["[b] 3"])
+
+    def test_empty(self):
+        streamer = Streamer(2, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(streamer.run([]), [])
+
+    def test_partial_line(self):
+        stdout = io.StringIO()
+        streamer = Streamer(stdout=stdout, stderr=io.StringIO())
+
+        streamer.run([("a", ["printf", "abc"])])
+        self.assertEqual(stdout.getvalue().splitlines()[-1], "[a] abc")
+
+    def test_per_key(self):
+        stdout = io.StringIO()
+        streamer = Streamer(4, stdout=stdout, stderr=io.StringIO(), per_key=1)
+
+        # 同じキーのコマンドは、1つずつ実行される。
+        cmd = ["sh", "-c", "echo start; sleep 0.05; echo end"]
+        streamer.run([("a", cmd, ["x"]), ("a", cmd, ["x"]), ("b", cmd, ["y"])])
+        lines = [line for line in stdout.getvalue().splitlines()
+                 if line.startswith("[a] ") and not line.startswith("[a] $")]
+        self.assertEqual(lines, ["[a] start", "[a] end", "[a] start", "[a] end"])
+
+    def test_stream(self):
+        stdout = io.StringIO()
+        streamer = Streamer(2, stdout=stdout, stderr=io.StringIO())
+
+        # 全て受け取る前に実行を始め、後のタスクを待つ間も出力を表示する。
+        def iter_tasks():
+            yield ("a", ["echo", "1"])
+            time_limit = time.monotonic() + 5
+            while "[a] 1" not in stdout.getvalue() and time.monotonic() < time_limit:
+                time.sleep(0.01)
+            self.assertTrue("[a] 1" in stdout.getvalue())
+            yield ("b", ["echo", "2"])
+
+        self.assertEqual(streamer.run(iter_tasks()), [0, 0])
+        self.assertEqual(len(streamer.durations), 2)
+
+    def test_timeout(self):
+        stderr = io.StringIO()
+        streamer = Streamer(2, stdout=io.StringIO(), stderr=stderr, timeout=0.2)
+
+        # タイムアウトしても、他のコマンドは続けて実行する。
+        results = streamer.run([("a", ["sh", "-c", "sleep 10 & wait"]), ("b", ["true"]),
+                                ("c", ["sh", "-c", "exit %d" % executor.RETURNCODE_TIMEOUT])])
+        self.assertEqual(results, [executor.RETURNCODE_TIMEOUT, 0, executor.RETURNCODE_TIMEOUT])
+        # 同じ値で終了したコマンドは、タイムアウトにしない。
+        self.assertEqual(streamer.timed_out, [True, False, False])
+        self.assertTrue(stderr.getvalue().startswith("[a] "))
+        self.assertTrue(streamer.durations[0] < 5)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+tracer のテストを行います。
+"""
+
+# Compatible module
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# Buitin module
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from concurrent import futures
+
+# Local module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gitdeep.tracer import *
+from gitdeep.tracer import _NULL_SPAN
+
+# Global variable
+__author__ = "Kazuyuki OHMI"
+__version__ = "1.0.0"
+__date__    = "2026/10/18"
+__license__ = 'MIT'
+
+class Test(unittest.TestCase):
+    """
+    テストケース
+    """
+
+    def tearDown(self):
+        stop()
+
+    def test_disabled(self):
+        self.assertTrue(span("a") is _NULL_SPAN)
+
+    def test_span(self):
+        path_root = tempfile.mkdtemp()
+        try:
+            start()
+            with span("call", "phase"):
+                with futures.ThreadPoolExecutor(max_workers=2) as pool:
+                    for job in [pool.submit(self.work, i) for i in range(4)]:
+                        job.result()
+                with span("live", "repo", lane="live-1"):
+                    pass
+
+            path = os.path.join(path_root, "trace.json")
+            stop(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        finally:
+            shutil.rmtree(path_root)
+
+        spans = [event for event in events if event["ph"] == "X"]
+        names = dict((event["tid"], event["args"]["name"])
+                     for event in events if event["name"] == "thread_name")
+
+        self.assertEqual(sorted(event["name"] for event in spans),
+                         ["call", "live"] + ["repo"] * 4)
+        self.assertEqual(names[spans[-1]["tid"]], "main")
+        self.assertTrue("live-1" in names.values())
+        self.assertTrue(len(set(event["tid"] for event in spans)) >= 3)
+
+        # 区間は入れ子になる。
+        call = spans[-1]
+        for event in spans[:-1]:
+            self.assertTrue(call["ts"] <= event["ts"])
+            self.assertTrue(event["ts"] + event["dur"] <= call["ts"] + call["dur"])
+
+    def work(self, i):
+        with span("repo", "repo", path=str(i)):
+            time.sleep(0.01)
+
+def run_tests(*args, **kwargs):
+    """
+    test entry point
+    """
+    # 単体テストを実行します。
+    suite = unittest.TestLoader().loadTestsFromTestCase(Test)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+    return 0
+
+if __name__ == "__main__":
+    """
+    self entry point
+    """
+    sys.exit(run_tests())